@@ -1,5 +1,6 @@
 """Host implementation for message-based communication protocol."""
 from lhrhost.messaging.messaging import (
     MessagingStack,
+    BoardMessageReceiver, BoardTagger, MultiBoardMessagingStack,
     add_argparser_transport_selector, parse_argparser_transport_selector
 )
@@ -71,14 +71,21 @@ class Dispatcher(MessageReceiver):
     # Implement MessageReceiver
 
     async def on_message(self, message: Message) -> None:
-        """Handle received message."""
+        """Handle received message.
+
+        Prefix receivers are looked up by each prefix of the message's channel,
+        rather than by scanning every registered prefix.
+        """
+        channel = message.channel
         tasks = []
-        for receiver in self.__receivers[message.channel]:
+        for receiver in self.__receivers.get(channel, ()):
             tasks.append(receiver.on_message(message))
-        for receiver in self.__receivers[None]:
+        for receiver in self.__receivers.get(None, ()):
             tasks.append(receiver.on_message(message))
-        for (prefix, receivers) in self.__prefix_receivers.items():
-            if message.channel.startswith(prefix):
-                for receiver in receivers:
+        if self.__prefix_receivers:
+            for prefix_length in range(len(channel) + 1):
+                for receiver in self.__prefix_receivers.get(
+                    channel[:prefix_length], ()
+                ):
                     tasks.append(receiver.on_message(message))
         await asyncio.gather(*tasks)
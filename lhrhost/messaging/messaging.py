@@ -1,32 +1,70 @@
 """Support for the host-peripheral messaging protocol."""
 
+# Standard imports
+import asyncio
+from abc import abstractmethod
+from typing import Dict, Iterable, List, Optional
+
 # Local package imports
-from lhrhost.messaging.presentation import BasicTranslator
-from lhrhost.messaging.transport.actors import ResponseReceiver, TransportManager
+from lhrhost.messaging.presentation import BasicTranslator, Message, MessageReceiver
+from lhrhost.messaging.transport.actors import (
+    InProcessTransportManager, ResponseReceiver, TransportManager
+)
+from lhrhost.messaging.transport.recording import INBOUND, OUTBOUND, TrafficLog
+from lhrhost.util.interfaces import InterfaceClass
 
 # External imports
 from pulsar.api import arbiter
 
 
 class MessagingStack(object):
-    """Abstraction layer for the messaging protocol stack."""
+    """Abstraction layer for the messaging protocol stack.
+
+    Args:
+        transport_loop: the transport-layer asynchronous actor loop to run.
+        in_process: whether to run the transport loop in the arbiter's own event
+            loop, connected directly to the translator, instead of in a separate
+            actor process. This avoids two inter-process actor commands per
+            command round trip. Default: run the transport loop in an actor.
+        ring_buffer_capacity: if the transport loop runs in an actor, the size
+            in bytes of a shared-memory ring buffer through which to pass
+            received messages from the actor. Default: pass each received
+            message with an actor command.
+        shared_arbiter: an arbiter which starts and stops the messaging stack
+            itself, e.g. one shared by the messaging stacks of several boards.
+            Default: create an arbiter for this messaging stack.
 
-    def __init__(self, transport_loop):
+    """
+
+    def __init__(
+        self, transport_loop, in_process: bool=False,
+        ring_buffer_capacity: Optional[int]=None, shared_arbiter=None
+    ):
         """Initialize member variables."""
-        self.arbiter = arbiter(start=self._start, stopping=self._stop)
+        if shared_arbiter is not None:
+            self.arbiter = shared_arbiter
+        else:
+            self.arbiter = arbiter(start=self._start, stopping=self._stop)
         self.translator = BasicTranslator()
         self.response_receiver = ResponseReceiver(
             response_receivers=[self.translator]
         )
-        self.transport_manager = TransportManager(
-            self.arbiter, transport_loop, response_receiver=self.response_receiver
-        )
+        if in_process:
+            self.transport_manager = InProcessTransportManager(
+                self.arbiter, transport_loop, response_receiver=self.response_receiver
+            )
+        else:
+            self.transport_manager = TransportManager(
+                self.arbiter, transport_loop, response_receiver=self.response_receiver,
+                ring_buffer_capacity=ring_buffer_capacity
+            )
         self.translator.serialized_message_receivers.append(
             self.transport_manager.command_sender
         )
         self.command_sender = self.transport_manager.command_sender
         self.connection_synchronizer = self.transport_manager.connection_synchronizer
         self.execution_managers = []
+        self.traffic_logs: List[TrafficLog] = []
 
     def register_command_senders(self, *command_senders):
         """Register the messaging stack as a command receiver of the given object."""
@@ -42,6 +80,22 @@ class MessagingStack(object):
         """Register an execution manager which can be started or stopped."""
         self.execution_managers.append(execution_manager)
 
+    def record_traffic(self, path: str) -> TrafficLog:
+        """Record all messages sent and received to a traffic log.
+
+        The traffic log is closed when the messaging stack is stopped, and it can
+        be replayed with :mod:`lhrhost.messaging.transport.replay`.
+        """
+        traffic_log = TrafficLog(path)
+        self.response_receiver.response_receivers.append(
+            traffic_log.recorder(INBOUND)
+        )
+        self.translator.serialized_message_receivers.append(
+            traffic_log.recorder(OUTBOUND)
+        )
+        self.traffic_logs.append(traffic_log)
+        return traffic_log
+
     def run(self):
         """Run the messaging stack, blocking the caller's thread."""
         self.arbiter.start()
@@ -57,12 +111,145 @@ class MessagingStack(object):
         self.transport_manager.stop()
         for execution_manager in self.execution_managers:
             execution_manager.stop()
+        for traffic_log in self.traffic_logs:
+            traffic_log.close()
+
+
+# Multiple boards
+
+class BoardMessageReceiver(object, metaclass=InterfaceClass):
+    """Interface for a class which receives messages tagged with their board."""
+
+    @abstractmethod
+    async def on_board_message(self, board_id: str, message: Message) -> None:
+        """Receive and handle a message from the specified board."""
+        pass
+
+
+class BoardTagger(MessageReceiver):
+    """Forwards messages from a board to receivers, tagged with the board's ID."""
+
+    def __init__(
+        self, board_id: str,
+        board_message_receivers: Optional[Iterable[BoardMessageReceiver]]=None
+    ):
+        """Initialize member variables."""
+        self.board_id = board_id
+        self.board_message_receivers: List[BoardMessageReceiver] = []
+        if board_message_receivers:
+            self.board_message_receivers = [
+                receiver for receiver in board_message_receivers
+            ]
+
+    # Implement MessageReceiver
+
+    async def on_message(self, message: Message) -> None:
+        """Forward the message with the board's ID."""
+        await asyncio.gather(*[
+            receiver.on_board_message(self.board_id, message)
+            for receiver in self.board_message_receivers
+        ])
+
+
+class MultiBoardMessagingStack(object):
+    """Abstraction layer for the messaging protocol stacks of several boards.
+
+    Each board has its own :class:`MessagingStack`, and all of them share a
+    single arbiter. Commands are routed to a board by its board ID, and
+    responses from each board are tagged with its board ID for receivers
+    registered with :meth:`register_board_message_receivers`.
+
+    Args:
+        transport_loops: the transport-layer asynchronous actor loop of each
+            board, keyed by board ID. For example, the ASCII transport loop with
+            `port` bound to the serial port of the board.
+        in_process: whether to run the transport loops of all boards in the
+            arbiter's own event loop, instead of in a separate actor process per
+            board. Default: run all boards in the arbiter's event loop. Actor
+            processes are limited to a single board, because transport actors
+            send their responses and connection events to the arbiter without
+            identifying their board.
+
+    Raises:
+        ValueError: actor processes were requested for more than one board.
+
+    Attributes:
+        boards (Dict[str, MessagingStack]): the messaging stack of each board,
+            keyed by board ID.
+
+    """
+
+    def __init__(self, transport_loops: Dict[str, object], in_process: bool=True):
+        """Initialize member variables."""
+        if not in_process and len(transport_loops) > 1:
+            raise ValueError(
+                'Only one board may run its transport loop in an actor, but {} '
+                'boards were given without in_process!'.format(len(transport_loops))
+            )
+        self.arbiter = arbiter(start=self._start, stopping=self._stop)
+        self.boards: Dict[str, MessagingStack] = {
+            board_id: MessagingStack(
+                transport_loop, in_process=in_process, shared_arbiter=self.arbiter
+            )
+            for (board_id, transport_loop) in transport_loops.items()
+        }
+        self.board_taggers: Dict[str, BoardTagger] = {}
+        for (board_id, board) in self.boards.items():
+            self.board_taggers[board_id] = BoardTagger(board_id)
+            board.register_response_receivers(self.board_taggers[board_id])
+        self.execution_managers = []
+
+    def register_command_senders(self, board_id: str, *command_senders):
+        """Register the specified board's stack as a command receiver of the objects."""
+        self.boards[board_id].register_command_senders(*command_senders)
+
+    def register_response_receivers(self, board_id: str, *response_receivers):
+        """Register message receivers to receive responses from the specified board."""
+        self.boards[board_id].register_response_receivers(*response_receivers)
+
+    def register_board_message_receivers(self, *board_message_receivers):
+        """Register receivers of responses from every board, tagged by board ID."""
+        for board_tagger in self.board_taggers.values():
+            board_tagger.board_message_receivers.extend(board_message_receivers)
+
+    def register_execution_manager(self, execution_manager):
+        """Register an execution manager which can be started or stopped."""
+        self.execution_managers.append(execution_manager)
+
+    async def send_message(self, board_id: str, message: Message) -> None:
+        """Send a message to the specified board."""
+        await self.boards[board_id].translator.on_message(message)
+
+    async def wait_connected(self) -> None:
+        """Block until every board is connected."""
+        await asyncio.gather(*[
+            board.connection_synchronizer.wait_connected()
+            for board in self.boards.values()
+        ])
+
+    def run(self):
+        """Run the messaging stacks, blocking the caller's thread."""
+        self.arbiter.start()
+
+    def _start(self, arbiter):
+        """Start the messaging stacks and execution managers."""
+        for board in self.boards.values():
+            board._start(arbiter)
+        for execution_manager in self.execution_managers:
+            execution_manager.start()
+
+    def _stop(self, arbiter):
+        """Stop the messaging stacks and execution managers."""
+        for board in self.boards.values():
+            board._stop(arbiter)
+        for execution_manager in self.execution_managers:
+            execution_manager.stop()
 
 
 def add_argparser_transport_selector(parser):
     """Add a transport-layer implementation selector to an argparse parser."""
     parser.add_argument(
-        'transport', choices=['ascii', 'firmata'],
+        'transport', choices=['ascii', 'firmata', 'virtual'],
         help='Transport-layer implementation'
     )
 
@@ -73,6 +260,8 @@ def parse_argparser_transport_selector(args):
         from lhrhost.messaging.transport.ascii import transport_loop
     elif args.transport == 'firmata':
         from lhrhost.messaging.transport.firmata import transport_loop
+    elif args.transport == 'virtual':
+        from lhrhost.messaging.transport.virtual import transport_loop
     else:
         raise NotImplementedError(
             'Unknown transport-layer implementation: {}'.format(args.transport)
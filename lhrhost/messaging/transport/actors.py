@@ -9,6 +9,7 @@ from typing import Iterable, List, Optional
 from lhrhost.messaging.transport import SerializedMessageReceiver
 from lhrhost.util import batch, cli
 from lhrhost.util.concurrency import Concurrent
+from lhrhost.util.ring_buffer import SharedRingBuffer
 
 # External imports
 import pulsar.api as ps
@@ -41,6 +42,12 @@ async def send_serialized_message(request, serialized_message):
     return serialized_message
 
 
+@ps.command()
+async def drain_serialized_messages(request):
+    """Notify an actor that serialized messages are waiting in its ring buffer."""
+    request.actor.ring_buffer_receiver.on_doorbell()
+
+
 @ps.command()
 async def transport_connected(request):
     """Notify an actor that the transport layer connection has been established."""
@@ -92,6 +99,31 @@ class CommandSender(SerializedMessageReceiver):
         ])
 
 
+class DirectCommandSender(SerializedMessageReceiver):
+    """Sends serialized messages directly to a transport in the same process.
+
+    get_serialized_message_sender is a callable function returning the transport
+    which is currently connected, or None if no transport is connected.
+    """
+
+    def __init__(self, get_serialized_message_sender):
+        """Initialize member variables."""
+        self.__get_serialized_message_sender = get_serialized_message_sender
+
+    # Implement SerializedMessageReceiver
+
+    async def on_serialized_message(self, serialized_message: str) -> None:
+        """Send the serialized message over the transport."""
+        serialized_message_sender = self.__get_serialized_message_sender()
+        if serialized_message_sender is None:
+            logger.warning((
+                'Error: serialized message "{}" not sent, because there is no '
+                'transport-layer connection!'
+            ).format(serialized_message))
+            return
+        await serialized_message_sender.send_serialized_message(serialized_message)
+
+
 class ResponseReceiver(SerializedMessageReceiver):
     """Forwards received serialized messages to receivers.
 
@@ -116,6 +148,95 @@ class ResponseReceiver(SerializedMessageReceiver):
             for receiver in self.response_receivers
         ])
 
+    async def on_serialized_messages(self, serialized_messages: List[str]) -> None:
+        """Receive a batch of serialized messages and forward them in order."""
+        for serialized_message in serialized_messages:
+            await self.on_serialized_message(serialized_message)
+
+
+class RingBufferSender(SerializedMessageReceiver):
+    """Sends serialized messages to the arbiter over a shared-memory ring buffer.
+
+    Intended for use in the transport actor, to bypass an actor command for
+    every received message: the arbiter is only sent a drain_serialized_messages
+    actor command when a message is written to an empty ring buffer. When the
+    ring buffer is full, sending blocks until the arbiter makes room.
+    """
+
+    def __init__(
+        self, ring_buffer: SharedRingBuffer, overflow_retry_interval: float=0.001
+    ):
+        """Initialize member variables."""
+        self.ring_buffer = ring_buffer
+        self.overflow_retry_interval = overflow_retry_interval
+
+    # Implement SerializedMessageReceiver
+
+    async def on_serialized_message(self, serialized_message: str) -> None:
+        """Write the serialized message to the ring buffer."""
+        record = serialized_message.encode('utf-8')
+        was_empty = self.ring_buffer.size == 0
+        while not self.ring_buffer.write(record):
+            await asyncio.sleep(self.overflow_retry_interval)
+            was_empty = True
+        if was_empty:
+            await ps.send('arbiter', 'drain_serialized_messages')
+
+
+class RingBufferReceiver(Concurrent):
+    """Drains serialized messages from a shared-memory ring buffer in batches.
+
+    Intended for use in the arbiter, to forward messages written by a
+    :class:`RingBufferSender` in the transport actor to a response receiver.
+    The ring buffer is drained whenever the sender rings the doorbell, and also
+    every `poll_interval` seconds in case a doorbell is missed.
+    """
+
+    def __init__(
+        self, ring_buffer: SharedRingBuffer, response_receiver: ResponseReceiver,
+        poll_interval: float=0.01
+    ):
+        """Initialize member variables."""
+        self.ring_buffer = ring_buffer
+        self.response_receiver = response_receiver
+        self.poll_interval = poll_interval
+        self._loop = asyncio.get_event_loop()
+        self._doorbell = asyncio.Event()
+        self._drain_task = None
+
+    def on_doorbell(self) -> None:
+        """Wake the drain task."""
+        self._doorbell.set()
+
+    async def _drain(self) -> None:
+        """Endlessly drain the ring buffer."""
+        while True:
+            self._doorbell.clear()
+            records = self.ring_buffer.read_all()
+            if records:
+                await self.response_receiver.on_serialized_messages(
+                    [record.decode('utf-8') for record in records]
+                )
+                continue
+            try:
+                await asyncio.wait_for(self._doorbell.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # Implement Concurrent
+
+    def start(self):
+        """Start the associated asynchronous tasks."""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+        self._drain_task = self._loop.create_task(self._drain())
+
+    def stop(self):
+        """Stop the associated asynchronous tasks."""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+
 
 class ConnectionSynchronizer():
     """Facilitates synchronization of connction/disconnection events."""
@@ -125,11 +246,13 @@ class ConnectionSynchronizer():
         self.connected = asyncio.Event()
         self.disconnected = asyncio.Event()
         self.disconnected.set()
+        self.connections: int = 0
 
     def on_connected(self):
         """Set event flags to notify waiters of connection."""
         if not self.connected.is_set():
             logger.info('Connected!')
+            self.connections += 1
         else:
             logger.warning('Already connected!')
         self.connected.set()
@@ -167,12 +290,16 @@ class TransportManager(Concurrent):
     an asynchronous monitor in the parent thread which restarts the actor if it dies.
 
     Overrides the transport's serialized_message_receivers to only send messages
-    to the arbiter, because this is the only way it reliably works.
+    to the arbiter, because this is the only way it reliably works. If
+    `ring_buffer_capacity` is given, received messages are passed to the arbiter
+    through a shared-memory ring buffer of that many bytes, drained in batches,
+    instead of through one actor command per message.
     """
 
     def __init__(
         self, arbiter, transport_loop, response_receiver: ResponseReceiver,
-        monitor_poll_interval: float=2.0, **transport_connection_manager_kwargs
+        monitor_poll_interval: float=2.0, ring_buffer_capacity: Optional[int]=None,
+        **transport_connection_manager_kwargs
     ):
         """Initialize member variables."""
         self.arbiter = arbiter
@@ -188,11 +315,22 @@ class TransportManager(Concurrent):
         self._transport_connection_manager_kwargs = transport_connection_manager_kwargs
         if 'transport_kwargs' not in self._transport_connection_manager_kwargs:
             self._transport_connection_manager_kwargs['transport_kwargs'] = {}
+        self.ring_buffer = None
+        self.ring_buffer_receiver = None
+        if ring_buffer_capacity is not None:
+            self.ring_buffer = SharedRingBuffer(capacity=ring_buffer_capacity)
+            self.ring_buffer_receiver = RingBufferReceiver(
+                self.ring_buffer, response_receiver
+            )
+            self.arbiter.ring_buffer_receiver = self.ring_buffer_receiver
+            actor_response_sender = RingBufferSender(self.ring_buffer)
+        else:
+            actor_response_sender = CommandSender(['arbiter'])
         self._transport_connection_manager_kwargs[
             'transport_kwargs'
         ][
             'serialized_message_receivers'
-        ] = [CommandSender(['arbiter'])]
+        ] = [actor_response_sender]
         # Transport actor monitor
         self._monitor_task = None
         self._monitor_poll_interval = monitor_poll_interval
@@ -204,6 +342,8 @@ class TransportManager(Concurrent):
 
     def start(self):
         """Start the associated asynchronous tasks."""
+        if self.ring_buffer_receiver is not None:
+            self.ring_buffer_receiver.start()
         self._start_actor_task()
         self._start_monitor_task()
 
@@ -213,6 +353,9 @@ class TransportManager(Concurrent):
             self._actor_task.cancel()
         if self._monitor_task is not None:
             self._monitor_task.cancel()
+        if self.ring_buffer_receiver is not None:
+            self.ring_buffer_receiver.stop()
+            self.ring_buffer.close()
 
     # Transport actor
 
@@ -255,6 +398,89 @@ class TransportManager(Concurrent):
         self._monitor_task = self._loop.create_task(self._monitor_transport_actor())
 
 
+class InProcessTransportManager(Concurrent):
+    """Manages a transport-layer asynchronous loop in the arbiter's own process.
+
+    Runs the transport layer as a task in the arbiter's event loop, and restarts
+    the task if it dies. Commands are sent directly to the transport, and the
+    transport forwards responses directly to the response receiver, so that no
+    inter-process actor commands are needed for either.
+    """
+
+    def __init__(
+        self, arbiter, transport_loop, response_receiver: ResponseReceiver,
+        restart_interval: float=2.0, **transport_connection_manager_kwargs
+    ):
+        """Initialize member variables."""
+        self.arbiter = arbiter
+        self.arbiter.transport_manager = self
+        self.connection_synchronizer = ConnectionSynchronizer()
+        self._loop = asyncio.get_event_loop()
+        # Transport loop
+        self.serialized_message_sender = None
+        self._transport_task = None
+        self._transport_loop = transport_loop
+        self._restart_interval = restart_interval
+        self._transport_connection_manager_kwargs = transport_connection_manager_kwargs
+        if 'transport_kwargs' not in self._transport_connection_manager_kwargs:
+            self._transport_connection_manager_kwargs['transport_kwargs'] = {}
+        self._transport_connection_manager_kwargs[
+            'transport_kwargs'
+        ][
+            'serialized_message_receivers'
+        ] = [response_receiver]
+        # Messaging
+        self.response_receiver = response_receiver
+        self.command_sender = DirectCommandSender(
+            lambda: self.serialized_message_sender
+        )
+
+    # Implement Concurrent
+
+    def start(self):
+        """Start the associated asynchronous tasks."""
+        if self._transport_task is not None:
+            self._transport_task.cancel()
+        self._transport_task = self._loop.create_task(self._run_transport_loop())
+
+    def stop(self):
+        """Stop the associated asynchronous tasks."""
+        if self._transport_task is not None:
+            self._transport_task.cancel()
+            self._transport_task = None
+
+    # Transport loop
+
+    async def _on_transport_connected(
+        self, actor, transport_connection_manager, transport_connection
+    ):
+        """Notify waiters that the transport connection has been established."""
+        self.connection_synchronizer.on_connected()
+
+    async def _on_transport_disconnected(self, actor, transport_connection_manager):
+        """Notify waiters that the transport connection has been lost."""
+        self.serialized_message_sender = None
+        self.connection_synchronizer.on_disconnected()
+
+    async def _run_transport_loop(self):
+        """Run the transport loop, restarting it whenever it dies."""
+        logger.debug('Started in-process transport loop!')
+        while True:
+            try:
+                await self._transport_loop(
+                    self,
+                    on_connection=self._on_transport_connected,
+                    on_disconnection=self._on_transport_disconnected,
+                    **self._transport_connection_manager_kwargs
+                )
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Transport loop died! Restarting...')
+                await asyncio.sleep(self._restart_interval)
+
+
 class ConsoleManager(cli.ConsoleManager):
     """Class to pass console input as send_serialized_message actor commands.
 
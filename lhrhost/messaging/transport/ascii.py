@@ -8,11 +8,12 @@ protocol selected for the device board.
 # Standard imports
 import asyncio
 import logging
-from asyncio import StreamReader, StreamWriter
-from typing import Any, Dict, Iterable, Optional, Tuple
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
 
 # Local package imports
 import lhrhost.messaging.transport as transport
+from lhrhost.messaging.transport.framing import BINARY_FRAMING_REQUEST, BinaryFraming
 
 # External imports
 from serial import SerialException
@@ -31,6 +32,7 @@ _SerializedMessageReceivers = Iterable[transport.SerializedMessageReceiver]
 # Protocol parameters
 MESSAGE_LINE_PREFIX = ''
 MESSAGE_LINE_SUFFIX = '\n'
+MESSAGE_LINE_SUFFIX_BYTES = str.encode(MESSAGE_LINE_SUFFIX)
 
 
 PORT_WHITELIST_PREFIXES = (
@@ -38,6 +40,169 @@ PORT_WHITELIST_PREFIXES = (
 )
 
 
+def find_ports(
+    port_whitelist_prefixes: Tuple[str]=PORT_WHITELIST_PREFIXES
+) -> List[str]:
+    """Return the available serial ports, preferring whitelisted ports.
+
+    If multiple ports are available, only ports whose names start with one of
+    the whitelisted prefixes are returned. Each board connected to the host has
+    its own port, so this can be used to assign a port to each board.
+    """
+    ports = [port.device for port in comports()]
+    if len(ports) > 1:
+        logger.info(
+            'Multiple ports found: {}!'.format(ports)
+        )
+        if port_whitelist_prefixes:
+            ports = [
+                port for port in ports
+                if port.startswith(port_whitelist_prefixes)
+            ]
+            logger.info(
+                'Only considering whitelisted ports: {}!'.format(ports)
+            )
+    return ports
+
+
+# Datalink-layer receipt
+
+class LineProtocol(asyncio.Protocol):
+    """Buffered protocol which frames data received over serial into lines.
+
+    Every complete line in each chunk of received data is split out, decoded,
+    and queued as a single batch, so that reading of data from the serial
+    connection never waits for the handling of previously-received lines.
+    Incomplete lines are buffered until the rest of the line is received.
+    Flow control of writes by the serial connection is exposed through
+    :meth:`wait_writable`.
+
+    Once binary framing is negotiated with :meth:`request_binary_framing`,
+    received data is instead split into binary frames by :attr:`binary_framing`.
+
+    Attributes:
+        serial_transport (serial_asyncio.SerialTransport): the serial connection.
+        binary_framing (BinaryFraming): the binary framing of messages, or `None`
+            if messages are framed as ASCII lines.
+
+    """
+
+    def __init__(self):
+        """Initialize member variables."""
+        self.serial_transport = None
+        self.binary_framing: Optional[BinaryFraming] = None
+        self._binary_framing_requested: bool = False
+        self._buffer: bytearray = bytearray()
+        self._batches: asyncio.Queue = asyncio.Queue()
+        self._pending_lines: Deque[str] = deque()
+        self._connected: asyncio.Event = asyncio.Event()
+        self._writable: asyncio.Event = asyncio.Event()
+        self._writable.set()
+
+    def request_binary_framing(self) -> None:
+        """Switch to binary framing if the peripheral accepts the request for it.
+
+        The request itself must be sent to the peripheral separately.
+        """
+        self._binary_framing_requested = True
+
+    def _receive_framing_response(self) -> None:
+        """Queue received lines up to the peripheral's response to a framing request.
+
+        Switches to binary framing if the peripheral accepts it.
+        """
+        lines = []
+        while self._binary_framing_requested:
+            end = self._buffer.find(MESSAGE_LINE_SUFFIX_BYTES)
+            if end < 0:
+                break
+            line = self._buffer[:end].strip().decode()
+            del self._buffer[:end + 1]
+            lines.append(line)
+            if line == BINARY_FRAMING_REQUEST:
+                self.binary_framing = BinaryFraming()
+                self._binary_framing_requested = False
+            elif not line:
+                self._binary_framing_requested = False
+        if lines:
+            self._batches.put_nowait(lines)
+
+    async def wait_connected(self) -> None:
+        """Block until the serial connection is made."""
+        await self._connected.wait()
+
+    @property
+    def writable(self) -> bool:
+        """Return whether the serial connection's write buffer has room."""
+        return self._writable.is_set()
+
+    async def wait_writable(self) -> None:
+        """Block until the serial connection's write buffer has room."""
+        await self._writable.wait()
+
+    async def read_batch(self) -> List[str]:
+        """Return the next batch of received lines.
+
+        Blocks until at least one line is available. Raises ConnectionAbortedError
+        if the serial connection was lost.
+        """
+        if self._pending_lines:
+            batch = list(self._pending_lines)
+            self._pending_lines.clear()
+            return batch
+        batch = await self._batches.get()
+        if batch is None:
+            raise ConnectionAbortedError
+        return batch
+
+    async def read_line(self) -> str:
+        """Return the next received line.
+
+        Blocks until a line is available. Raises ConnectionAbortedError if the
+        serial connection was lost.
+        """
+        while not self._pending_lines:
+            self._pending_lines.extend(await self.read_batch())
+        return self._pending_lines.popleft()
+
+    # Implement asyncio.Protocol
+
+    def connection_made(self, serial_transport) -> None:
+        """Store the serial connection."""
+        self.serial_transport = serial_transport
+        self._connected.set()
+
+    def data_received(self, data: bytes) -> None:
+        """Queue every complete line or frame in the received data as one batch."""
+        self._buffer.extend(data)
+        if self._binary_framing_requested:
+            self._receive_framing_response()
+        if self.binary_framing is not None:
+            batch = self.binary_framing.decode(self._buffer)
+            if batch:
+                self._batches.put_nowait(batch)
+            return
+        if MESSAGE_LINE_SUFFIX_BYTES not in self._buffer:
+            return
+        lines = self._buffer.split(MESSAGE_LINE_SUFFIX_BYTES)
+        self._buffer = lines.pop()
+        self._batches.put_nowait([line.strip().decode() for line in lines])
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Wake any readers with notice of the lost connection."""
+        self.serial_transport = None
+        self._batches.put_nowait(None)
+        self._writable.set()
+
+    def pause_writing(self) -> None:
+        """Block writers until the write buffer drains below its low watermark."""
+        self._writable.clear()
+
+    def resume_writing(self) -> None:
+        """Unblock writers."""
+        self._writable.set()
+
+
 # Transport-layer implementation
 
 class Transport(transport.Transport):
@@ -45,17 +210,77 @@ class Transport(transport.Transport):
 
     Provides functionality to transmit strings and lines to the device, and to
     receive lines from the device.
+
+    Messages sent during the same iteration of the event loop are coalesced
+    into a single write to the serial connection. Senders are blocked whenever
+    the serial connection's write buffer exceeds its high watermark, until it
+    drains below its low watermark.
+
+    Args:
+        write_buffer_high_watermark: size in bytes of the serial connection's
+            write buffer above which senders are blocked.
+        write_buffer_low_watermark: size in bytes of the serial connection's
+            write buffer below which blocked senders are unblocked.
+
+    Attributes:
+        messages_sent (int): number of messages written to the serial connection.
+        writes (int): number of writes made to the serial connection.
+        peak_queue_depth (int): largest number of messages coalesced into a write.
+        backpressure_waits (int): number of sends which were blocked by a full
+            write buffer.
+
     """
 
-    def __init__(self, ser_reader: StreamReader, ser_writer: StreamWriter, loop=None, **kwargs):
+    def __init__(
+        self, ser_protocol: LineProtocol, loop=None,
+        write_buffer_high_watermark: int=4096, write_buffer_low_watermark: int=1024,
+        **kwargs
+    ):
         """Initialize member variables."""
         super().__init__(**kwargs)
-        self.ser_reader: StreamReader = ser_reader
-        self.ser_writer: StreamWriter = ser_writer
+        self.ser_protocol: LineProtocol = ser_protocol
+        self.ser_protocol.serial_transport.set_write_buffer_limits(
+            high=write_buffer_high_watermark, low=write_buffer_low_watermark
+        )
         self.loop: asyncio.AbstractEventLoop = (
             loop if loop is not None else asyncio.get_event_loop()
         )
         self.task_receive_packets = None
+        self._send_queue: List[bytes] = []
+        self._send_flush_scheduled: bool = False
+        # Metrics
+        self.messages_sent: int = 0
+        self.writes: int = 0
+        self.peak_queue_depth: int = 0
+        self.backpressure_waits: int = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of messages waiting to be written."""
+        return len(self._send_queue)
+
+    @property
+    def write_buffer_size(self) -> int:
+        """Return the number of bytes waiting in the serial connection's write buffer."""
+        if self.ser_protocol is None or self.ser_protocol.serial_transport is None:
+            return 0
+        return self.ser_protocol.serial_transport.get_write_buffer_size()
+
+    def _flush_send_queue(self) -> None:
+        """Write all queued messages to the serial connection in a single write."""
+        self._send_flush_scheduled = False
+        if not self._send_queue:
+            return
+        (send_queue, self._send_queue) = (self._send_queue, [])
+        if self.ser_protocol is None or self.ser_protocol.serial_transport is None:
+            logger.warning(
+                'Dropped {} messages queued for a closed connection!'
+                .format(len(send_queue))
+            )
+            return
+        self.ser_protocol.serial_transport.write(b''.join(send_queue))
+        self.messages_sent += len(send_queue)
+        self.writes += 1
 
     # Implement transport.Transport
 
@@ -68,16 +293,11 @@ class Transport(transport.Transport):
 
     async def _receive_packets(self) -> None:
         """Endlessly receive serialized messages from the connection and handle them."""
-        handshake_message = str.encode(transport.HANDSHAKE_RX_CHAR)
-        message_line_suffix = str.encode(MESSAGE_LINE_SUFFIX)
         while True:
-            try:
-                line = await self.ser_reader.readuntil(message_line_suffix)
-            except SerialException:
-                raise ConnectionAbortedError
-            if line.strip() == handshake_message:
-                raise ConnectionResetError
-            await self.on_serialized_message(line.strip().decode())
+            for line in await self.ser_protocol.read_batch():
+                if line == transport.HANDSHAKE_RX_CHAR:
+                    raise ConnectionResetError
+                await self.on_serialized_message(line)
 
     async def close(self) -> None:
         """Close the transport-layer connection to the device.
@@ -87,23 +307,35 @@ class Transport(transport.Transport):
         if self.task_receive_packets is not None:
             self.task_receive_packets.cancel()
             self.task_receive_packets = None
-        self.ser_reader = None
-        self.ser_writer.close()
-        self.ser_writer = None
+        self._flush_send_queue()
+        if self.ser_protocol.serial_transport is not None:
+            self.ser_protocol.serial_transport.close()
+        self.ser_protocol = None
 
     async def send_serialized_message(self, serialized_message: str) -> None:
         """Send the serialized message to the peripheral.
 
-        Blocks until the line is fully written.
-
-        Args:
-            line: a line which can be passed into a string format.
-            end: a string or character to add to the end of the line. Default:
-                newline character.
+        The message is queued to be written together with any other messages sent
+        in the same iteration of the event loop. Blocks while the serial
+        connection's write buffer is above its high watermark. The message is
+        sent as a binary frame if binary framing was negotiated.
         """
-        self.ser_writer.write(('{}{}{}'.format(
-            MESSAGE_LINE_PREFIX, serialized_message, MESSAGE_LINE_SUFFIX
-        )).encode('utf-8'))
+        if not self.ser_protocol.writable:
+            self.backpressure_waits += 1
+            await self.ser_protocol.wait_writable()
+        if self.ser_protocol.serial_transport is None:
+            raise ConnectionAbortedError
+        binary_framing = self.ser_protocol.binary_framing
+        if binary_framing is not None:
+            self._send_queue.append(binary_framing.encode(serialized_message))
+        else:
+            self._send_queue.append(('{}{}{}'.format(
+                MESSAGE_LINE_PREFIX, serialized_message, MESSAGE_LINE_SUFFIX
+            )).encode('utf-8'))
+        self.peak_queue_depth = max(self.peak_queue_depth, len(self._send_queue))
+        if not self._send_flush_scheduled:
+            self._send_flush_scheduled = True
+            self.loop.call_soon(self._flush_send_queue)
 
 
 class TransportConnectionManager(transport.TransportConnectionManager):
@@ -120,10 +352,14 @@ class TransportConnectionManager(transport.TransportConnectionManager):
         handshake_attempt_interval: interval in milliseconds to wait after
             receiving a non-handshake character before trying again.
             Default: 200 ms.
+        binary_framing: whether to request binary framing of messages during
+            the handshake, falling back to ASCII lines if the peripheral does
+            not support it. See :mod:`lhrhost.messaging.transport.framing`.
 
     Attributes:
         handshake_attempt_interval (int): interval in milliseconds to wait after
             receiving a non-handshake character before trying again.
+        binary_framing (bool): whether to request binary framing of messages.
 
     """
 
@@ -131,37 +367,25 @@ class TransportConnectionManager(transport.TransportConnectionManager):
         self, handshake_attempt_interval: float=0.2,
         port: Optional[str]=None, baudrate: int=115200,
         transport_kwargs: Optional[_Kwargs]=None,
-        port_whitelist_prefixes: Tuple[str]=PORT_WHITELIST_PREFIXES
+        port_whitelist_prefixes: Tuple[str]=PORT_WHITELIST_PREFIXES,
+        binary_framing: bool=False
     ):
         """Initialize member variables."""
         super().__init__(transport_kwargs=transport_kwargs)
         # Serial port
         if port is None:
             try:
-                ports = [port.device for port in comports()]
-                if len(ports) > 1:
-                    logger.info(
-                        'Multiple ports found: {}!'.format(ports)
-                    )
-                    if port_whitelist_prefixes:
-                        ports = [
-                            port for port in ports
-                            if port.startswith(port_whitelist_prefixes)
-                        ]
-                        logger.info(
-                            'Only considering whitelisted ports: {}!'.format(ports)
-                        )
-                port = ports[0]
+                port = find_ports(port_whitelist_prefixes)[0]
                 logger.info('Using port {}.'.format(port))
             except IndexError:
                 logger.error('Could not find any available serial ports!')
                 raise
         self._port: str = port
         self._baudrate: int = baudrate
-        self._ser_reader: Optional[StreamReader] = None
-        self._ser_writer: Optional[StreamWriter] = None
+        self._ser_protocol: Optional[LineProtocol] = None
         # Mutual handshake parameters
         self.handshake_attempt_interval: float = handshake_attempt_interval
+        self.binary_framing: bool = binary_framing
         # State
         self.loop = asyncio.get_event_loop()
 
@@ -179,13 +403,10 @@ class TransportConnectionManager(transport.TransportConnectionManager):
         # Connect the board and establish mutual handshake
         await self._connect_datalink()
         self.transport = Transport(
-            self._ser_reader, self._ser_writer, self.loop, **self.transport_kwargs
+            self._ser_protocol, self.loop, **self.transport_kwargs
         )
         await self._establish_handshake()
         # Set up event handling
-        self.transport = Transport(
-            self._ser_reader, self._ser_writer, **self.transport_kwargs
-        )
         self.transport.start_receiving_serialized_messages()
         logger.info('Established transport-layer connection!')
         return self.transport
@@ -195,11 +416,10 @@ class TransportConnectionManager(transport.TransportConnectionManager):
         logger.info('Please plug in the device now...')
         while True:
             try:
-                (
-                    self._ser_reader, self._ser_writer
-                ) = await serial_asyncio.open_serial_connection(
-                    url=self._port, baudrate=self._baudrate, loop=self.loop
+                (_, self._ser_protocol) = await serial_asyncio.create_serial_connection(
+                    self.loop, LineProtocol, self._port, baudrate=self._baudrate
                 )
+                await self._ser_protocol.wait_connected()
                 break
             except SerialException:
                 await asyncio.sleep(self.handshake_attempt_interval)
@@ -209,22 +429,29 @@ class TransportConnectionManager(transport.TransportConnectionManager):
         """Establish the transport-layer connection."""
         logger.debug('Initiating handshake for transport-layer connection...')
         # Wait for handshake char (peripheral initiates handshake)
-        message_line_suffix = str.encode(MESSAGE_LINE_SUFFIX)
         while self.transport is not None:
-            try:
-                line = await self._ser_reader.readuntil(message_line_suffix)
-            except SerialException:
-                raise ConnectionAbortedError
-            if line.strip().decode() == transport.HANDSHAKE_RX_CHAR:
+            line = await self._ser_protocol.read_line()
+            if line == transport.HANDSHAKE_RX_CHAR:
                 logger.debug('Handshake started!')
                 break
             await asyncio.sleep(self.handshake_attempt_interval)
-        # Respond with empty message (host acknowledges handshake)
-        await self.transport.send_serialized_message('')
-        # Wait for empty response (peripheral confirms handshake established)
+        # Respond with empty message (host acknowledges handshake), or with a
+        # request for binary framing
+        if self.binary_framing:
+            self._ser_protocol.request_binary_framing()
+            await self.transport.send_serialized_message(BINARY_FRAMING_REQUEST)
+        else:
+            await self.transport.send_serialized_message('')
+        # Wait for empty response (peripheral confirms handshake established),
+        # or for acceptance of binary framing
         while self.transport is not None:
-            line = await self._ser_reader.readuntil(message_line_suffix)
-            if not line.strip():
+            line = await self._ser_protocol.read_line()
+            if not line:
+                if self.binary_framing:
+                    logger.info('Binary framing is unsupported, using ASCII lines.')
+                break
+            if self.binary_framing and line == BINARY_FRAMING_REQUEST:
+                logger.info('Using binary framing of messages.')
                 break
         logger.debug('Completed handshake!')
 
@@ -0,0 +1,219 @@
+"""Compact binary framing of serialized messages.
+
+Binary framing is an optional alternative to newline-delimited ASCII lines for
+sending messages over a serial connection, and it is negotiated during the
+ASCII transport handshake: instead of acknowledging the peripheral's handshake
+with an empty line, the host sends :data:`BINARY_FRAMING_REQUEST`. A peripheral
+which supports binary framing responds with :data:`BINARY_FRAMING_REQUEST` and
+then switches to binary framing in both directions; a peripheral which does not
+support it responds with an empty line as usual, and ASCII framing is kept.
+The firmware's ASCII transport (src/Messaging/ASCIIIO.h) accepts the request
+only in sketches which define DISABLE_LOGGING, since log output would corrupt
+the frames.
+
+Each message is sent as a frame of the form::
+
+    length | channel ID | [channel name] | [payload] | CRC
+
+where:
+
+* `length` is a single byte counting the bytes between it and the CRC.
+* `channel ID` is a varint index into :data:`CHANNELS`, shifted by one;
+  channel ID 0 is followed by `channel name`, a single length byte and the
+  ASCII channel name, for channels not in :data:`CHANNELS`.
+* `payload` is the zigzag-encoded varint payload, omitted if the message has
+  no payload.
+* `CRC` is the CRC-8 (polynomial 0x07) of the bytes between the length byte
+  and the CRC.
+
+For example, the notification `<pfpd>(123)`, which takes 12 bytes as an ASCII
+line, takes 5 bytes as a frame.
+
+A length byte above :data:`MAX_FRAME_LENGTH` is treated as corruption, except
+that a length byte equal to the handshake character signals that the
+peripheral has reset and is restarting the handshake in ASCII.
+"""
+
+# Standard imports
+import logging
+from typing import List, Optional, Tuple
+
+# Local package imports
+from lhrhost.messaging.presentation import (
+    BasicTranslator, InvalidSerializationError, Message
+)
+from lhrhost.messaging.transport.transport import HANDSHAKE_RX_CHAR
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Protocol parameters
+BINARY_FRAMING_REQUEST = 'b1'
+HANDSHAKE_BYTE = ord(HANDSHAKE_RX_CHAR)
+CHANNEL_MAX_LENGTH = 8
+MAX_FRAME_LENGTH = 2 + 1 + CHANNEL_MAX_LENGTH + 5
+LITERAL_CHANNEL_ID = 0
+
+
+def _axis_channels(axis: str) -> List[str]:
+    """Return the channels of a linear actuator axis."""
+    return [axis + suffix for suffix in (
+        '', 'p', 'pn', 'pni', 'pnc', 'pnn', 's',
+        'm', 'mn', 'mni', 'mnc', 'mnn', 'ms', 'mt', 'mp',
+        'f', 'fc', 'flpl', 'flph', 'flmfh', 'flmfl', 'flmbl', 'flmbh',
+        'fpp', 'fpd', 'fpi', 'fps'
+    )]
+
+
+CHANNELS: Tuple[str, ...] = tuple(
+    ['e', 'r', 'v', 'v0', 'v1', 'v2'] +
+    [channel for axis in 'pzyx' for channel in _axis_channels(axis)]
+)
+CHANNEL_IDS = {channel: index + 1 for (index, channel) in enumerate(CHANNELS)}
+
+
+def _crc8_table(polynomial: int=0x07) -> List[int]:
+    """Return the lookup table for a CRC-8 with the given polynomial."""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) if crc & 0x80 else (crc << 1)
+        table.append(crc & 0xff)
+    return table
+
+
+CRC8_TABLE = _crc8_table()
+
+
+def crc8(data: bytes) -> int:
+    """Return the CRC-8 of the data."""
+    crc = 0
+    for byte in data:
+        crc = CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode a non-negative integer as a little-endian base-128 varint."""
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def decode_varint(data: bytes, start: int=0) -> Tuple[int, int]:
+    """Decode a varint in the data, returning its value and the index after it.
+
+    Raises:
+        IndexError: the data ends before the varint does.
+
+    """
+    value = 0
+    shift = 0
+    index = start
+    while True:
+        byte = data[index]
+        index += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return (value, index)
+        shift += 7
+
+
+def zigzag_encode(value: int) -> int:
+    """Map a signed integer to a non-negative integer with a small magnitude."""
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def zigzag_decode(value: int) -> int:
+    """Invert :func:`zigzag_encode`."""
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+
+class BinaryFraming(object):
+    """Converter between serialized messages and binary frames.
+
+    Attributes:
+        crc_errors (int): number of received bytes discarded as corrupted.
+
+    """
+
+    def __init__(self):
+        """Initialize member variables."""
+        self.translator = BasicTranslator()
+        self.crc_errors: int = 0
+
+    def encode_message(self, message: Message) -> bytes:
+        """Return the frame for a message."""
+        channel_id = CHANNEL_IDS.get(message.channel, LITERAL_CHANNEL_ID)
+        body = bytearray(encode_varint(channel_id))
+        if channel_id == LITERAL_CHANNEL_ID:
+            channel = message.channel.encode('ascii')
+            body.append(len(channel))
+            body.extend(channel)
+        if message.payload is not None:
+            body.extend(encode_varint(zigzag_encode(message.payload)))
+        if len(body) > MAX_FRAME_LENGTH:
+            raise InvalidSerializationError(
+                'Message {} is too long to frame'.format(message)
+            )
+        return bytes([len(body)]) + bytes(body) + bytes([crc8(body)])
+
+    def encode(self, serialized_message: str) -> bytes:
+        """Return the frame for a serialized message."""
+        return self.encode_message(self.translator.deserialize(serialized_message))
+
+    def decode_message(self, body: bytes) -> Message:
+        """Return the message in the body of a frame."""
+        (channel_id, index) = decode_varint(body)
+        if channel_id == LITERAL_CHANNEL_ID:
+            channel_end = index + 1 + body[index]
+            channel = body[index + 1:channel_end].decode('ascii')
+            index = channel_end
+        else:
+            channel = CHANNELS[channel_id - 1]
+        payload: Optional[int] = None
+        if index < len(body):
+            (payload, index) = decode_varint(body, index)
+            payload = zigzag_decode(payload)
+        return Message(channel, payload)
+
+    def decode(self, buffer: bytearray) -> List[str]:
+        """Remove all complete frames from the buffer, returning their messages.
+
+        Frames with a bad CRC are skipped. A handshake from the peripheral is
+        returned as :data:`HANDSHAKE_RX_CHAR` in place of a serialized message.
+        """
+        serialized_messages = []
+        start = 0
+        while start < len(buffer):
+            length = buffer[start]
+            if length == HANDSHAKE_BYTE:
+                serialized_messages.append(HANDSHAKE_RX_CHAR)
+                start = len(buffer)
+                break
+            end = start + 1 + length
+            if end >= len(buffer) and length <= MAX_FRAME_LENGTH:
+                break
+            body = bytes(buffer[start + 1:end])
+            if (
+                length == 0 or length > MAX_FRAME_LENGTH or
+                crc8(body) != buffer[end]
+            ):
+                self.crc_errors += 1
+                logger.warning('Discarding a corrupted byte of a binary frame!')
+                start += 1
+                continue
+            try:
+                serialized_messages.append(
+                    self.translator.serialize(self.decode_message(body))
+                )
+            except (IndexError, UnicodeDecodeError):
+                logger.warning('Discarding a malformed binary frame!')
+            start = end + 1
+        del buffer[:start]
+        return serialized_messages
@@ -0,0 +1,127 @@
+"""Recording of serialized message traffic to a binary log.
+
+A traffic log is an append-only file which starts with :data:`LOG_MAGIC`,
+followed by one record per serialized message::
+
+    timestamp | direction | length | serialized message
+
+where `timestamp` is an unsigned 64-bit count of microseconds since the log was
+opened, on a monotonic clock; `direction` is a byte which is either
+:data:`INBOUND` or :data:`OUTBOUND`; `length` is an unsigned 16-bit count of
+bytes in the UTF-8 serialized message. All integers are little-endian.
+"""
+
+# Standard imports
+import logging
+import os
+import struct
+import time
+from typing import Iterator, NamedTuple
+
+# Local package imports
+from lhrhost.messaging.transport.transport import SerializedMessageReceiver
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Log format
+LOG_MAGIC = b'LHRTRAF1'
+RECORD_HEADER = struct.Struct('<QBH')
+INBOUND = 0  # from the peripheral to the host
+OUTBOUND = 1  # from the host to the peripheral
+
+
+class TrafficRecord(NamedTuple):
+    """A serialized message in a traffic log."""
+
+    timestamp: float  # seconds since the log was opened
+    direction: int
+    serialized_message: str
+
+
+class TrafficLog(object):
+    """Append-only binary log of serialized messages.
+
+    Args:
+        path: the path of the log file. If the file already exists, new records
+            are appended to it, with timestamps continuing from its last record.
+
+    """
+
+    def __init__(self, path: str):
+        """Initialize member variables."""
+        self.path = path
+        time_offset = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            for record in read_traffic_log(path):
+                time_offset = record.timestamp
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(LOG_MAGIC)
+        self._start_time = time.monotonic() - time_offset
+        self.records: int = 0
+
+    def write(self, direction: int, serialized_message: str) -> None:
+        """Append a record of the serialized message at the current time."""
+        encoded = serialized_message.encode('utf-8')
+        timestamp = int((time.monotonic() - self._start_time) * 1e6)
+        self._file.write(RECORD_HEADER.pack(timestamp, direction, len(encoded)))
+        self._file.write(encoded)
+        self.records += 1
+
+    def flush(self) -> None:
+        """Flush written records to the file."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush written records and close the file."""
+        if self._file.closed:
+            return
+        self._file.close()
+
+    def recorder(self, direction: int) -> 'TrafficRecorder':
+        """Return a receiver which records messages in the given direction."""
+        return TrafficRecorder(self, direction)
+
+
+class TrafficRecorder(SerializedMessageReceiver):
+    """Records every received serialized message in a traffic log.
+
+    Register one recorder with direction :data:`INBOUND` as a receiver of
+    responses from the transport, and another with direction :data:`OUTBOUND`
+    as a receiver of commands from the translator.
+    """
+
+    def __init__(self, traffic_log: TrafficLog, direction: int=INBOUND):
+        """Initialize member variables."""
+        self.traffic_log = traffic_log
+        self.direction = direction
+
+    # Implement SerializedMessageReceiver
+
+    async def on_serialized_message(self, serialized_message: str) -> None:
+        """Record the serialized message."""
+        self.traffic_log.write(self.direction, serialized_message)
+
+
+def read_traffic_log(path: str) -> Iterator[TrafficRecord]:
+    """Iterate over the records of a traffic log, in the order they were written.
+
+    Raises:
+        ValueError: the file is not a traffic log.
+
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(LOG_MAGIC)) != LOG_MAGIC:
+            raise ValueError('{} is not a traffic log!'.format(path))
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            (timestamp, direction, length) = RECORD_HEADER.unpack(header)
+            encoded = f.read(length)
+            if len(encoded) < length:
+                logger.warning('Traffic log {} ends with a truncated record!'.format(path))
+                return
+            yield TrafficRecord(timestamp / 1e6, direction, encoded.decode('utf-8'))
@@ -0,0 +1,148 @@
+"""Transport layer which replays recorded traffic from a peripheral.
+
+This module implements a transport layer which feeds the inbound messages of a
+traffic log recorded by :mod:`lhrhost.messaging.transport.recording` to its
+receivers with their recorded timing, optionally sped up, so that a recorded
+session can be reproduced without any connected hardware.
+"""
+
+# Standard imports
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+# Local package imports
+import lhrhost.messaging.transport as transport
+from lhrhost.messaging.transport.recording import INBOUND, read_traffic_log
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Type-checking names
+_Kwargs = Dict[str, Any]
+
+
+# Transport-layer implementation
+
+class Transport(transport.Transport):
+    """Transport layer which replays the inbound messages of a traffic log.
+
+    Messages sent to the peripheral are discarded.
+
+    Args:
+        path: the path of the traffic log.
+        speed: the factor by which to speed up replay relative to the recorded
+            timing. A speed of 1 replays in real time; a speed of 0 replays as
+            fast as possible.
+
+    """
+
+    def __init__(self, path: str, speed: float=1.0, loop=None, **kwargs):
+        """Initialize member variables."""
+        super().__init__(**kwargs)
+        self.path = path
+        self.speed = speed
+        self.loop: asyncio.AbstractEventLoop = (
+            loop if loop is not None else asyncio.get_event_loop()
+        )
+        self.task_receive_packets = None
+        self.messages_replayed: int = 0
+
+    async def _replay(self) -> None:
+        """Feed the recorded inbound messages to the receivers."""
+        start_time = time.monotonic()
+        first_timestamp = None
+        for record in read_traffic_log(self.path):
+            if record.direction != INBOUND:
+                continue
+            if first_timestamp is None:
+                first_timestamp = record.timestamp
+            if self.speed:
+                delay = (
+                    (record.timestamp - first_timestamp) / self.speed -
+                    (time.monotonic() - start_time)
+                )
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self.on_serialized_message(record.serialized_message)
+            self.messages_replayed += 1
+        logger.info('Replayed {} messages from {}.'.format(
+            self.messages_replayed, self.path
+        ))
+
+    # Implement transport.Transport
+
+    def start_receiving_serialized_messages(self) -> None:
+        """Start replaying the traffic log.
+
+        Receiving of data is asynchronous, and the associated event loop must be run.
+        The task stops when the whole traffic log has been replayed.
+        """
+        self.task_receive_packets = self.loop.create_task(self._replay())
+
+    async def close(self) -> None:
+        """Stop replaying the traffic log."""
+        if self.task_receive_packets is not None:
+            self.task_receive_packets.cancel()
+            self.task_receive_packets = None
+
+    async def send_serialized_message(self, serialized_message: str) -> None:
+        """Discard the serialized message."""
+        logger.debug('Discarding sent message {}'.format(serialized_message))
+
+
+class TransportConnectionManager(transport.TransportConnectionManager):
+    """Replay transport connection manager.
+
+    Args:
+        path: the path of the traffic log to replay.
+        speed: the factor by which to speed up replay; 0 replays as fast as
+            possible.
+
+    """
+
+    def __init__(
+        self, path: str, speed: float=1.0, transport_kwargs: Optional[_Kwargs]=None
+    ):
+        """Initialize member variables."""
+        super().__init__(transport_kwargs=transport_kwargs)
+        self.path = path
+        self.speed = speed
+        self.loop = asyncio.get_event_loop()
+
+    # Implement transport.TransportConnectionManager
+
+    async def open(self) -> Transport:
+        """Start replaying the traffic log as a transport-layer connection."""
+        self.transport = Transport(
+            self.path, self.speed, self.loop, **self.transport_kwargs
+        )
+        self.transport.start_receiving_serialized_messages()
+        logger.info('Replaying traffic log {}!'.format(self.path))
+        return self.transport
+
+
+# Actors
+
+async def transport_loop(actor, on_connection=None, on_disconnection=None, **kwargs):
+    """Run the transport layer as an asynchonous actor loop.
+
+    Stops once the whole traffic log has been replayed.
+    """
+    logger.debug('Started transport loop!')
+    transport_connection_manager = TransportConnectionManager(**kwargs)
+    try:
+        async with transport_connection_manager.connection as transport_connection:
+            actor.serialized_message_sender = transport_connection
+            if callable(on_connection):
+                await on_connection(
+                    actor, transport_connection_manager, transport_connection
+                )
+            await transport_connection.task_receive_packets
+    except KeyboardInterrupt:
+        logger.info('Quitting...')
+    finally:
+        if callable(on_disconnection):
+            await on_disconnection(actor, transport_connection_manager)
@@ -0,0 +1,128 @@
+"""Transport layer to a simulated peripheral in the same process.
+
+This module implements an in-memory transport layer connected to a
+:class:`lhrhost.virtual.VirtualPeripheral`, so that the rest of the host stack
+can be run without any connected hardware.
+"""
+
+# Standard imports
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+# Local package imports
+import lhrhost.messaging.transport as transport
+from lhrhost.virtual import VirtualPeripheral
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Type-checking names
+_Kwargs = Dict[str, Any]
+_SerializedMessageReceivers = Iterable[transport.SerializedMessageReceiver]
+
+
+# Transport-layer implementation
+
+class Transport(transport.Transport):
+    """In-memory transport layer with an established connection."""
+
+    def __init__(self, peripheral: VirtualPeripheral, loop=None, **kwargs):
+        """Initialize member variables."""
+        super().__init__(**kwargs)
+        self.peripheral: VirtualPeripheral = peripheral
+        self.loop: asyncio.AbstractEventLoop = (
+            loop if loop is not None else asyncio.get_event_loop()
+        )
+        self.task_receive_packets = None
+
+    # Implement transport.Transport
+
+    def start_receiving_serialized_messages(self) -> None:
+        """Start endlessly receiving and handling message data from the connection.
+
+        Receiving of data is asynchronous, and the associated event loop must be run.
+        The task stops with a ConnectionResetError when the peripheral is reset.
+        """
+        self.task_receive_packets = self.loop.create_task(self.peripheral.run())
+
+    async def close(self) -> None:
+        """Close the transport-layer connection to the device.
+
+        Blocks until the connection is closed.
+        """
+        if self.task_receive_packets is not None:
+            self.task_receive_packets.cancel()
+            self.task_receive_packets = None
+        self.peripheral.serialized_message_receivers = []
+
+    async def send_serialized_message(self, serialized_message: str) -> None:
+        """Send the serialized message to the peripheral."""
+        await self.peripheral.on_serialized_message(serialized_message)
+
+
+class TransportConnectionManager(transport.TransportConnectionManager):
+    """In-memory transport connection manager.
+
+    Args:
+        peripheral: the simulated peripheral to connect to. Default: a new
+            :class:`lhrhost.virtual.VirtualPeripheral` constructed from
+            `peripheral_kwargs`.
+
+    """
+
+    def __init__(
+        self, peripheral: Optional[VirtualPeripheral]=None,
+        transport_kwargs: Optional[_Kwargs]=None, **peripheral_kwargs
+    ):
+        """Initialize member variables."""
+        super().__init__(transport_kwargs=transport_kwargs)
+        self.peripheral: VirtualPeripheral = (
+            peripheral if peripheral is not None
+            else VirtualPeripheral(**peripheral_kwargs)
+        )
+        self.loop = asyncio.get_event_loop()
+
+    # Implement transport.TransportConnectionManager
+
+    async def open(self) -> Transport:
+        """Establish and return a transport-layer connection to the device.
+
+        The simulated peripheral needs no handshake, so the connection is
+        established immediately.
+        """
+        self.transport = Transport(self.peripheral, self.loop, **self.transport_kwargs)
+        self.peripheral.serialized_message_receivers = [self.transport]
+        self.peripheral.connect()
+        self.transport.start_receiving_serialized_messages()
+        logger.info('Established transport-layer connection to virtual peripheral!')
+        return self.transport
+
+
+# Actors
+
+async def transport_loop(actor, on_connection=None, on_disconnection=None, **kwargs):
+    """Run the transport layer as an asynchonous actor loop.
+
+    Restarts the layer whenever the simulated peripheral is reset.
+    """
+    logger.debug('Started transport loop!')
+    transport_connection_manager = TransportConnectionManager(**kwargs)
+    while True:
+        try:
+            async with transport_connection_manager.connection as transport_connection:
+                actor.serialized_message_sender = transport_connection
+                if callable(on_connection):
+                    await on_connection(
+                        actor, transport_connection_manager, transport_connection
+                    )
+                await transport_connection.task_receive_packets  # only stops upon exception
+        except ConnectionResetError:
+            logger.warning('Connection was reset! Reconnecting...')
+        except KeyboardInterrupt:
+            logger.info('Quitting...')
+            break
+        finally:
+            if callable(on_disconnection):
+                await on_disconnection(actor, transport_connection_manager)
@@ -3,6 +3,6 @@
 This implements the set of commands and responses the host will handle.
 """
 from lhrhost.protocol.protocol import (
-    Command, CommandIssuer,
+    Command, CommandIssuer, CommandPipeline, ParameterCache, StateSynchronizer,
     ChannelTreeNode, ChannelHandlerTreeNode, ProtocolHandlerNode
 )
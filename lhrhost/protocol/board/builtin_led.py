@@ -98,6 +98,8 @@ class Printer(Receiver, Printer):
 class BlinkHighIntervalProtocol(ProtocolHandlerNode):
     """Notifies on the Built-in LED blinker's HIGH interval."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('HighInterval', 'h', **kwargs)
@@ -121,6 +123,8 @@ class BlinkHighIntervalProtocol(ProtocolHandlerNode):
 class BlinkLowIntervalProtocol(ProtocolHandlerNode):
     """Notifies on the Built-in LED blinker's LOW interval."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('LowInterval', 'l', **kwargs)
@@ -3,5 +3,5 @@
 This implements the set of commands and responses the host will handle.
 """
 from lhrhost.protocol.linear_actuator.linear_actuator import (
-    Receiver, Printer, Protocol
+    Receiver, Printer, Protocol, NotificationStream, STREAMED_SIGNALS
 )
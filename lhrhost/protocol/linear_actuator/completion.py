@@ -0,0 +1,187 @@
+"""Host-side detection of the completion of linear actuator moves.
+
+The peripheral only reports that a move has finished once its convergence,
+stall, or timer timeout has elapsed after the actuator settles. Early
+completion instead watches position notifications during the move and declares
+the move complete as soon as the actuator is within a tolerance of its target
+and has stayed nearly still over the last few notifications.
+"""
+
+# Standard imports
+import asyncio
+import logging
+from typing import Awaitable, Optional
+
+# Local package imports
+from lhrhost.protocol import CommandPipeline
+from lhrhost.util.concurrency import DROP_OLDEST
+from lhrhost.util.telemetry import TelemetryBuffer
+
+# External imports
+import numpy as np
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Notifier states
+NOTIFIER_SILENT = 0
+NOTIFIER_TIME_INTERVALS = 2
+
+
+class EarlyCompletion(object):
+    """Criterion for declaring a move complete from position notifications.
+
+    Args:
+        tolerance: the maximum distance, in sensor units, of each of the last
+            `samples` positions from the target position. Ignored for moves
+            without a target position, which instead must have started moving.
+        max_speed: the maximum rate of change of the last `samples` positions,
+            in sensor units per second.
+        samples: the number of consecutive position notifications over which
+            the criterion must hold.
+        notify_interval: the interval in milliseconds between position
+            notifications, if notifications need to be enabled for the move.
+        preempt: whether to stop the actuator once the criterion holds, instead
+            of letting the peripheral finish the move in the background.
+        telemetry: a TelemetryStore, e.g. the robot's, whose position buffers
+            are read for the recent positions of the actuators it records.
+            Default: record the positions of each move in a buffer of its own.
+
+    """
+
+    def __init__(
+        self, tolerance: int=5, max_speed: float=20.0, samples: int=3,
+        notify_interval: int=20, preempt: bool=False, telemetry=None
+    ):
+        """Initialize member variables."""
+        if samples < 2:
+            raise ValueError('Early completion needs at least 2 samples!')
+        self.tolerance = tolerance
+        self.max_speed = max_speed
+        self.samples = samples
+        self.notify_interval = notify_interval
+        self.preempt = preempt
+        self.telemetry = telemetry
+
+    def holds(self, positions: TelemetryBuffer, target: Optional[int]=None) -> bool:
+        """Return whether the recent positions satisfy the criterion."""
+        if len(positions) < self.samples:
+            return False
+        speed = positions.slope(self.samples)
+        if speed is None or abs(speed) > self.max_speed:
+            return False
+        if target is None:
+            return True
+        (_, values) = positions.last(self.samples)
+        return bool(np.abs(values - target).max() <= self.tolerance)
+
+    async def wait(
+        self, linear_actuator, command: Awaitable, target: Optional[int]=None
+    ) -> bool:
+        """Wait for a move command to complete, or for the criterion to hold.
+
+        The linear actuator is the protocol whose positions are watched. Returns
+        whether the move was declared complete before the command completed.
+        Position notifications are sent regardless of whether the position
+        changed during the move, since the criterion needs notifications while
+        the actuator is still; the notifier's settings are restored afterwards.
+        """
+        notify = linear_actuator.position.notify
+        enable_notifications = notify.last_response_payload in (None, NOTIFIER_SILENT)
+        positions = self._shared_positions(linear_actuator)
+        stream = linear_actuator.stream(
+            'position', max_size=self.samples, overflow=DROP_OLDEST
+        )
+        command_task = None
+        detector_task = None
+        previous_settings = []
+        try:
+            previous_settings = await self._change_notifier_settings(
+                notify, enable_notifications
+            )
+            if enable_notifications:
+                await notify.request(NOTIFIER_TIME_INTERVALS)
+            command_task = asyncio.ensure_future(command)
+            detector_task = asyncio.ensure_future(
+                self._detect(stream, target, positions)
+            )
+            await asyncio.wait(
+                [command_task, detector_task], return_when=asyncio.FIRST_COMPLETED
+            )
+            if command_task.done():
+                command_task.result()
+                return False
+            logger.debug('Move of {} completed early at position {}.'.format(
+                linear_actuator.name_path, linear_actuator.position.last_response_payload
+            ))
+            if self.preempt:
+                await linear_actuator.motor.request(0)
+            return True
+        finally:
+            if command_task is None and asyncio.iscoroutine(command):
+                command.close()
+            for task in (command_task, detector_task):
+                if task is not None and not task.done():
+                    task.cancel()
+            stream.close()
+            if enable_notifications:
+                await notify.request(NOTIFIER_SILENT)
+            async with CommandPipeline() as pipeline:
+                for (setting, previous) in previous_settings:
+                    pipeline.add(setting.request(previous))
+
+    async def _change_notifier_settings(self, notify, enable_notifications: bool):
+        """Turn off change-only notifications, and set the interval if enabling them.
+
+        Returns the changed settings with their previous values.
+        """
+        settings = [(notify.change_only, 0)]
+        if enable_notifications:
+            settings.append((notify.interval, self.notify_interval))
+        async with CommandPipeline() as pipeline:
+            for (setting, _) in settings:
+                if setting.last_response_payload is None:
+                    pipeline.add(setting.request())
+        previous_settings = []
+        async with CommandPipeline() as pipeline:
+            for (setting, value) in settings:
+                previous = setting.last_response_payload
+                if previous is not None and previous != value:
+                    previous_settings.append((setting, previous))
+                    pipeline.add(setting.request(value))
+        return previous_settings
+
+    def _shared_positions(self, linear_actuator) -> Optional[TelemetryBuffer]:
+        """Return the telemetry store's position buffer for the actuator, if any."""
+        if (
+            self.telemetry is None or
+            linear_actuator.node_name not in self.telemetry.recorders
+        ):
+            return None
+        return self.telemetry[(linear_actuator.node_name, 'position')]
+
+    async def _detect(
+        self, stream, target: Optional[int],
+        positions: Optional[TelemetryBuffer]=None
+    ) -> None:
+        """Return once the criterion holds for the positions notified during the move.
+
+        If a shared buffer of positions is given, the stream only signals new
+        notifications, and the positions are read from the buffer.
+        """
+        record = positions is None
+        if record:
+            positions = TelemetryBuffer(self.samples)
+        start_count = positions.count
+        moved = target is not None
+        async for (timestamp, position) in stream:
+            if record:
+                positions.append(timestamp, position)
+            move_samples = min(positions.count - start_count, self.samples)
+            if not moved:
+                speed = positions.slope(move_samples)
+                moved = speed is not None and abs(speed) > self.max_speed
+                continue
+            if move_samples == self.samples and self.holds(positions, target):
+                return
@@ -16,6 +16,8 @@ logger.addHandler(logging.NullHandler())
 class LimitsPositionLimitProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator feedback controller's PID coefficient."""
 
+    cached_parameter = True
+
     def __init__(self, channel, channel_name, **kwargs):
         """Initialize member variables."""
         super().__init__(channel, channel_name, **kwargs)
@@ -67,6 +69,8 @@ class LimitsPositionProtocol(ProtocolHandlerNode):
 class LimitsMotorLimitProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator feedback controller's PID coefficient."""
 
+    cached_parameter = True
+
     def __init__(self, channel, channel_name, **kwargs):
         """Initialize member variables."""
         super().__init__(channel, channel_name, **kwargs)
@@ -174,6 +178,8 @@ class LimitsProtocol(ProtocolHandlerNode):
 class PIDCoefficientProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator feedback controller's PID coefficient."""
 
+    cached_parameter = True
+
     def __init__(self, channel, channel_name, **kwargs):
         """Initialize member variables."""
         super().__init__(channel, channel_name, **kwargs)
@@ -208,6 +214,8 @@ class PIDCoefficientProtocol(ProtocolHandlerNode):
 class SampleIntervalProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator feedback controller's PID sample interval."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('SampleInterval', 's', **kwargs)
@@ -251,6 +259,8 @@ class PIDProtocol(ProtocolHandlerNode):
 class ConvergenceTimeoutProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator feedback controller's convergence detector timeout."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('ConvergenceTimeout', 'c', **kwargs)
@@ -291,8 +301,15 @@ class Protocol(ProtocolHandlerNode):
         message = Message(self.name_path, position)
         await self.issue_command(Command(message))
 
-    async def request_complete(self, position: Optional[int]=None):
-        """Send a LA/FC request command to message receivers."""
+    async def request_complete(
+        self, position: Optional[int]=None, early_completion=None
+    ):
+        """Send a LA/FC request command to message receivers.
+
+        If an EarlyCompletion criterion is given, the move may be declared
+        complete from position notifications before the peripheral reports
+        that it has finished.
+        """
         # TODO: validate the state
         message = Message(self.name_path, position)
         wait_channels = [
@@ -305,7 +322,18 @@ class Protocol(ProtocolHandlerNode):
             self.parent.name_path
         ]
         logger.debug('Starting feedback control...')
-        await self.issue_command(Command(message, wait_channels))
+        command = self.issue_command(Command(message, wait_channels))
+        if early_completion is None or position is None:
+            await command
+        else:
+            low = self.limits.position.low.last_response_payload
+            high = self.limits.position.high.last_response_payload
+            target = position
+            if low is not None:
+                target = max(target, low)
+            if high is not None:
+                target = min(target, high)
+            await early_completion.wait(self.parent, command, target)
         logger.debug('Finished feedback control!')
 
     # Implement ProtocolHandlerNode
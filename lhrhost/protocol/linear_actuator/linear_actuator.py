@@ -2,6 +2,7 @@
 
 # Standard imports
 import logging
+import time
 from typing import Iterable, List, Optional
 
 # Local package imports
@@ -13,6 +14,7 @@ from lhrhost.protocol.linear_actuator.smoothed_position import Protocol as \
     SmoothedPositionProtocol
 from lhrhost.protocol.linear_actuator.feedback_controller import Protocol as \
     FeedbackControllerProtocol
+from lhrhost.util.concurrency import BoundedStream, DROP_OLDEST
 from lhrhost.util.interfaces import InterfaceClass
 from lhrhost.util.printing import Printer
 
@@ -485,6 +487,57 @@ class Printer(Receiver, Printer):
         ))
 
 
+# Streaming of notifications
+
+STREAMED_SIGNALS = ('position', 'smoothed_position', 'motor')
+
+
+class NotificationStream(Receiver, BoundedStream):
+    """Bounded asynchronous iterator of a linear actuator signal's notifications.
+
+    Each item is a tuple of the time (from time.time) when the notification was
+    received and the notified value. Items are queued without waiting for the
+    consumer, unless the overflow policy is BLOCK, so that a slow consumer does
+    not stall dispatch of other messages.
+
+    Args:
+        protocol: the linear actuator protocol whose signal is streamed.
+        signal: one of STREAMED_SIGNALS.
+
+    """
+
+    def __init__(self, protocol: 'Protocol', signal: str, **kwargs):
+        """Initialize member variables."""
+        if signal not in STREAMED_SIGNALS:
+            raise ValueError('Cannot stream notifications of {}!'.format(signal))
+        super().__init__(**kwargs)
+        self.protocol = protocol
+        self.signal = signal
+
+    def close(self) -> None:
+        """Stop receiving notifications."""
+        if self in self.protocol.response_receivers:
+            self.protocol.response_receivers.remove(self)
+        super().close()
+
+    # Implement Receiver
+
+    async def on_linear_actuator_position(self, position: int) -> None:
+        """Receive and handle a LinearActuator/Position response."""
+        if self.signal == 'position':
+            await self.put((time.time(), position))
+
+    async def on_linear_actuator_smoothed_position(self, position: int) -> None:
+        """Receive and handle a LinearActuator/SmoothedPosition response."""
+        if self.signal == 'smoothed_position':
+            await self.put((time.time(), position))
+
+    async def on_linear_actuator_motor(self, duty: int) -> None:
+        """Receive and handle a LinearActuator/Motor response."""
+        if self.signal == 'motor':
+            await self.put((time.time(), duty))
+
+
 class Protocol(ProtocolHandlerNode):
     """Notifies on the linear actuator's state."""
 
@@ -505,6 +558,21 @@ class Protocol(ProtocolHandlerNode):
         self.motor = MotorProtocol(parent=self, **kwargs)
         self.feedback_controller = FeedbackControllerProtocol(parent=self, **kwargs)
 
+    def stream(
+        self, signal: str='position', max_size: int=256, overflow: str=DROP_OLDEST
+    ) -> NotificationStream:
+        """Return a bounded asynchronous iterator of a signal's notifications.
+
+        The signal is one of STREAMED_SIGNALS, and the overflow policy is one of
+        the policies of lhrhost.util.concurrency.BoundedStream. The stream
+        receives notifications until it is closed.
+        """
+        notification_stream = NotificationStream(
+            self, signal, max_size=max_size, overflow=overflow
+        )
+        self.response_receivers.append(notification_stream)
+        return notification_stream
+
     # Commands
 
     async def request(self, state: Optional[int]=None):
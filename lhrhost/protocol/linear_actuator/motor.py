@@ -17,6 +17,8 @@ logger.addHandler(logging.NullHandler())
 class StallProtectorTimeoutProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator motor's stall protector timeout."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('StallProtectorTimeout', 's', **kwargs)
@@ -40,6 +42,8 @@ class StallProtectorTimeoutProtocol(ProtocolHandlerNode):
 class TimerTimeoutProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator motor's stall protector timeout."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('TimerTimeout', 't', **kwargs)
@@ -63,6 +67,8 @@ class TimerTimeoutProtocol(ProtocolHandlerNode):
 class MotorPolarityProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator motor's polarity."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('MotorPolarity', 'p', **kwargs)
@@ -104,8 +110,13 @@ class Protocol(ProtocolHandlerNode):
         message = Message(self.name_path, duty)
         await self.issue_command(Command(message))
 
-    async def request_complete(self, duty: Optional[int]=None):
-        """Send a LA/Motor request command to message receivers."""
+    async def request_complete(self, duty: Optional[int]=None, early_completion=None):
+        """Send a LA/Motor request command to message receivers.
+
+        If an EarlyCompletion criterion is given, the move may be declared
+        complete from position notifications once the actuator has started
+        moving and then stopped, before the peripheral reports a stall.
+        """
         # TODO: validate the state
         if duty == 0:
             await self.request(0)
@@ -121,7 +132,11 @@ class Protocol(ProtocolHandlerNode):
             self.parent.name_path
         ]
         logger.debug('Starting motor direct duty control...')
-        await self.issue_command(Command(message, wait_channels))
+        command = self.issue_command(Command(message, wait_channels))
+        if early_completion is None:
+            await command
+        else:
+            await early_completion.wait(self.parent, command)
         logger.debug('Finished motor direct duty control!')
 
     # Implement ProtocolHandlerNode
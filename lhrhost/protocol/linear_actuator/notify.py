@@ -16,6 +16,8 @@ logger.addHandler(logging.NullHandler())
 class IntervalProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator signal notifier's notification interval."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('Interval', 'i', **kwargs)
@@ -50,6 +52,8 @@ class IntervalProtocol(ProtocolHandlerNode):
 class ChangeOnlyProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator signal notifier's notification behavior."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('ChangeOnly', 'c', **kwargs)
@@ -18,6 +18,8 @@ logger.addHandler(logging.NullHandler())
 class SnapMultiplierProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator position smoother's snap multiplier."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('SnapMultiplier', 's', **kwargs)
@@ -41,6 +43,8 @@ class SnapMultiplierProtocol(ProtocolHandlerNode):
 class RangeLowProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator position smoother's minimum position."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('RangeLow', 'l', **kwargs)
@@ -64,6 +68,8 @@ class RangeLowProtocol(ProtocolHandlerNode):
 class RangeHighProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator position smoother's minimum position."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('RangeHigh', 'h', **kwargs)
@@ -87,6 +93,8 @@ class RangeHighProtocol(ProtocolHandlerNode):
 class ActivityThresholdProtocol(ProtocolHandlerNode):
     """Notifies on the linear actuator position smoother's minimum position."""
 
+    cached_parameter = True
+
     def __init__(self, **kwargs):
         """Initialize member variables."""
         super().__init__('ActivityThreshold', 't', **kwargs)
@@ -0,0 +1,90 @@
+"""Recording of linear actuator notifications into shared telemetry buffers."""
+
+# Standard imports
+import logging
+import time
+from typing import Dict, Iterable, Tuple
+
+# Local package imports
+from lhrhost.protocol.linear_actuator.linear_actuator import (
+    Protocol, Receiver, STREAMED_SIGNALS
+)
+from lhrhost.util.telemetry import TelemetryBuffer
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class TelemetryRecorder(Receiver):
+    """Records a linear actuator's notified signals into telemetry buffers.
+
+    Args:
+        buffers: the telemetry buffer for each of STREAMED_SIGNALS.
+
+    """
+
+    def __init__(self, buffers: Dict[str, TelemetryBuffer]):
+        """Initialize member variables."""
+        self.buffers = buffers
+        self._position = buffers['position']
+        self._smoothed_position = buffers['smoothed_position']
+        self._motor = buffers['motor']
+
+    # Implement Receiver
+
+    async def on_linear_actuator_position(self, position: int) -> None:
+        """Receive and handle a LinearActuator/Position response."""
+        self._position.append(time.time(), position)
+
+    async def on_linear_actuator_smoothed_position(self, position: int) -> None:
+        """Receive and handle a LinearActuator/SmoothedPosition response."""
+        self._smoothed_position.append(time.time(), position)
+
+    async def on_linear_actuator_motor(self, duty: int) -> None:
+        """Receive and handle a LinearActuator/Motor response."""
+        self._motor.append(time.time(), duty)
+
+
+class TelemetryStore(object):
+    """Preallocated telemetry buffers for the notified signals of linear actuators.
+
+    Buffers are keyed by the node name of each registered linear actuator
+    protocol (e.g. 'z') and the signal, one of STREAMED_SIGNALS.
+
+    Args:
+        capacity: the number of samples kept in each buffer.
+        protocols: linear actuator protocols to register.
+
+    """
+
+    def __init__(self, capacity: int=4096, protocols: Iterable[Protocol]=()):
+        """Initialize member variables."""
+        self.capacity = capacity
+        self.buffers: Dict[Tuple[str, str], TelemetryBuffer] = {}
+        self.recorders: Dict[str, TelemetryRecorder] = {}
+        for protocol in protocols:
+            self.register(protocol)
+
+    def register(self, protocol: Protocol) -> TelemetryRecorder:
+        """Start recording the notified signals of a linear actuator protocol."""
+        axis = protocol.node_name
+        if axis in self.recorders:
+            return self.recorders[axis]
+        buffers = {}
+        for signal in STREAMED_SIGNALS:
+            buffers[signal] = TelemetryBuffer(self.capacity)
+            self.buffers[(axis, signal)] = buffers[signal]
+        recorder = TelemetryRecorder(buffers)
+        self.recorders[axis] = recorder
+        protocol.response_receivers.append(recorder)
+        return recorder
+
+    def __getitem__(self, key: Tuple[str, str]) -> TelemetryBuffer:
+        """Return the telemetry buffer for an (axis, signal) key."""
+        return self.buffers[key]
+
+    def clear(self) -> None:
+        """Discard all samples in all buffers."""
+        for buffer in self.buffers.values():
+            buffer.clear()
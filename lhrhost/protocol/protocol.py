@@ -2,17 +2,17 @@
 
 # Standard imports
 import asyncio
+import functools
 import logging
+import time
 from abc import abstractmethod
-from typing import Any, Dict, Iterable, List, Optional
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
 # Local package imports
 from lhrhost.messaging.presentation import Message, MessageReceiver
 from lhrhost.util.interfaces import InterfaceClass, cached_property
 
-# External imports
-from multidict import MultiDict
-
 # Logging
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -20,6 +20,9 @@ logger.addHandler(logging.NullHandler())
 # Type-checking names
 _MessageReceivers = Iterable[MessageReceiver]
 
+# Pipelining parameters
+DEFAULT_PIPELINE_WINDOW = 4  # ASCII commands which fit in the Arduino serial buffer
+
 
 # Remote-procedure call commands
 
@@ -27,6 +30,14 @@ class Command(object):
     """An asynchronous command.
 
     If response_channels is None, it is set to be the channel of the message.
+    The command completes once it has received one response for each entry of
+    response_channels, in any order, and once all additional events are set.
+
+    Attributes:
+        future (asyncio.Future): resolved with the message when the command
+            completes, or cancelled when the command is cancelled. None until
+            the command is started.
+
     """
 
     def __init__(
@@ -35,40 +46,101 @@ class Command(object):
     ):
         """Initialize member variables."""
         self.message: Message = message
-        self.wait_task: Optional[asyncio.Future] = None
-        self._responses_received = MultiDict()
+        self.future: Optional[asyncio.Future] = None
         if response_channels is None:
             response_channels = [message.channel]
-        self._responses_received = MultiDict(
-            (channel, asyncio.Event()) for channel in response_channels
-        )
-        self._additional_events: Optional[Iterable[asyncio.Event]] = []
+        self._responses_remaining: Dict[str, int] = OrderedDict()
+        self._num_responses_remaining = 0
+        for channel in response_channels:
+            self._responses_remaining[channel] = (
+                self._responses_remaining.get(channel, 0) + 1
+            )
+            self._num_responses_remaining += 1
+        self._additional_events: List[asyncio.Event] = []
         if additional_events:
             self._additional_events = [event for event in additional_events]
+        self._additional_events_task: Optional[asyncio.Future] = None
+
+    @property
+    def response_channels(self) -> List[str]:
+        """Return the distinct channels of the expected responses."""
+        return list(self._responses_remaining.keys())
+
+    @property
+    def done(self) -> bool:
+        """Return whether the command has completed or been cancelled."""
+        return self.future is not None and self.future.done()
 
     def on_response(self, channel):
         """Handle a potential response if it matches the right channel."""
-        if channel not in self._responses_received:
+        remaining = self._responses_remaining.get(channel)
+        if not remaining:
             return
-        for event in self._responses_received.getall(channel):
-            if not event.is_set():
-                event.set()
-                break
-
-    def start_wait_task(self, **kwargs):
-        """Start the task to wait for responses to the command."""
-        self.wait_task = asyncio.wait(
-            (
-                [event.wait() for event in self._responses_received.values()] +
-                [event.wait() for event in self._additional_events]
-            ),
-            **kwargs
+        self._responses_remaining[channel] = remaining - 1
+        self._num_responses_remaining -= 1
+        self._check_completed()
+
+    @property
+    def is_read(self) -> bool:
+        """Return whether the command only requests a value, without setting it."""
+        return self.message.payload is None and not self._additional_events
+
+    def coalesces_with(self, command: 'Command') -> bool:
+        """Return whether the command can share the response of an in-flight command.
+
+        Only equivalent read commands can be coalesced, since they are idempotent.
+        """
+        return (
+            self.is_read and command.is_read and not command.done and
+            command.message.channel == self.message.channel and
+            command.response_channels == self.response_channels
         )
 
+    def start(self) -> asyncio.Future:
+        """Start waiting for responses to the command, and return its future."""
+        loop = asyncio.get_event_loop()
+        self.future = loop.create_future()
+        waited_events = [
+            event for event in self._additional_events if not event.is_set()
+        ]
+        if waited_events:
+            self._additional_events_task = asyncio.gather(*[
+                event.wait() for event in waited_events
+            ])
+            self._additional_events_task.add_done_callback(
+                lambda task: self._check_completed()
+            )
+        self.future.add_done_callback(self._on_done)
+        self._check_completed()
+        return self.future
+
+    def cancel(self) -> None:
+        """Stop waiting for responses to the command."""
+        if self.future is not None:
+            self.future.cancel()
+
+    def _check_completed(self) -> None:
+        """Complete the command if everything it waits for has happened."""
+        if self.future is None or self.future.done():
+            return
+        if self._num_responses_remaining > 0:
+            return
+        if (
+            self._additional_events_task is not None and
+            not self._additional_events_task.done()
+        ):
+            return
+        self.future.set_result(self.message)
+
+    def _on_done(self, future: asyncio.Future) -> None:
+        """Clean up after the command completes or is cancelled."""
+        if self._additional_events_task is not None:
+            self._additional_events_task.cancel()
+
     def __repr__(self):
         """Represent the command."""
         return 'Command({}, response channels: {})'.format(
-            self.message, list(self._responses_received.keys())
+            self.message, self.response_channels
         )
 
 
@@ -81,12 +153,37 @@ class CommandIssuer():
         if command_receivers:
             self.command_receivers = [receiver for receiver in command_receivers]
         self.__issued_commands: Dict[str, Command] = {}
+        self.__response_waiters: Dict[str, List[Command]] = {}
+        self.coalesced_commands: int = 0
+
+    @property
+    def has_issued_commands(self) -> bool:
+        """Return whether any issued commands are waiting for responses."""
+        return bool(self.__issued_commands)
 
     def on_response(self, response_channel: str) -> None:
-        """Handle a potential response for any issued commands."""
-        for (command_channel, command) in self.__issued_commands.items():
+        """Handle a potential response for the issued commands expecting it."""
+        for command in self.__response_waiters.get(response_channel, ()):
             command.on_response(response_channel)
 
+    def __register_command(self, command: Command) -> None:
+        """Index an issued command by its channel and its response channels."""
+        self.__issued_commands[command.message.channel] = command
+        for response_channel in command.response_channels:
+            self.__response_waiters.setdefault(response_channel, []).append(command)
+
+    def __unregister_command(self, command: Command) -> None:
+        """Remove an issued command from the indices."""
+        if self.__issued_commands.get(command.message.channel) is command:
+            del self.__issued_commands[command.message.channel]
+        for response_channel in command.response_channels:
+            waiters = self.__response_waiters.get(response_channel)
+            if waiters is None or command not in waiters:
+                continue
+            waiters.remove(command)
+            if not waiters:
+                del self.__response_waiters[response_channel]
+
     async def notify_command_receivers(self, command: Command) -> None:
         """Pass the stored version to all registered version receivers.
 
@@ -97,25 +194,260 @@ class CommandIssuer():
             for receiver in self.command_receivers
         ])
 
-    async def issue_command(self, command: Command, cancel_previous=True, **kwargs) -> None:
+    async def issue_command(
+        self, command: Command, cancel_previous=True, timeout: Optional[float]=None
+    ) -> None:
         """Issue a command and wait for it to complete.
 
-        If there was previously an issued command which has not yet returned,
-        wait for it to finish first or cancel it first.
+        If an equivalent read command (one without a payload) is already in
+        flight on the same channel, the command is not sent, and it instead
+        completes with the response to the in-flight command.
+        Otherwise, if there was previously an issued command on the same channel
+        which has not yet returned, wait for it to finish first or cancel it
+        first; a cancelled command raises asyncio.CancelledError to its issuer.
+        Raises asyncio.TimeoutError if the command does not complete within the
+        timeout, in seconds.
         """
-        if command.message.channel in self.__issued_commands:
-            prev_command = self.__issued_commands[command.message.channel]
-            if prev_command.wait_task is not None:
-                if cancel_previous:
-                    prev_command.wait_task.cancel()
-                else:
-                    await self.__issued_commands[command.message.channel].wait_task
-        self.__issued_commands[command.message.channel] = command
-        # FIXME: there's a potential race condition here
-        command.start_wait_task(**kwargs)
-        await self.notify_command_receivers(command)
-        await command.wait_task
-        del self.__issued_commands[command.message.channel]
+        channel = command.message.channel
+        prev_command = self.__issued_commands.get(channel)
+        if prev_command is not None and command.coalesces_with(prev_command):
+            self.coalesced_commands += 1
+            (done, pending) = await asyncio.wait([prev_command.future], timeout=timeout)
+            if pending:
+                raise asyncio.TimeoutError
+            if not prev_command.future.cancelled():
+                return
+            # The in-flight command was cancelled by its issuer, so send our own
+        while channel in self.__issued_commands:
+            prev_command = self.__issued_commands[channel]
+            if cancel_previous:
+                prev_command.cancel()
+                self.__unregister_command(prev_command)
+            else:
+                await asyncio.wait([prev_command.future])
+        # Register and start the command before sending it, with no await in
+        # between, so that no response to it can be missed
+        self.__register_command(command)
+        command.start()
+        try:
+            await self.notify_command_receivers(command)
+            await asyncio.wait_for(command.future, timeout)
+        finally:
+            command.cancel()
+            self.__unregister_command(command)
+
+
+class CommandPipeline(object):
+    """Issues requests on independent channels concurrently.
+
+    Requests are added as not-yet-awaited coroutines, e.g. the result of
+    `protocol.feedback_controller.pid.kp.request(100)`, and are issued together
+    by :meth:`run`, so that their messages are sent in one burst and their
+    responses are awaited together. At most `window` requests are in flight at
+    any time, so that the peripheral's receive buffer is not overrun.
+
+    Requests in one pipeline must be on different channels, since a new
+    command on a channel cancels the previous command on that channel.
+
+    The pipeline can also be used as an asynchronous context manager, which
+    runs all added requests on exit.
+
+    Args:
+        window: the maximum number of requests in flight.
+
+    """
+
+    def __init__(self, window: int=DEFAULT_PIPELINE_WINDOW):
+        """Initialize member variables."""
+        if window < 1:
+            raise ValueError('Pipeline window must be at least 1!')
+        self.window = window
+        self._requests: List[Awaitable] = []
+
+    def add(self, request: Awaitable) -> None:
+        """Add a request to be issued when the pipeline is run."""
+        self._requests.append(request)
+
+    def __len__(self):
+        """Return the number of requests waiting to be issued."""
+        return len(self._requests)
+
+    async def run(self) -> List[Any]:
+        """Issue all added requests and wait for all of them to complete.
+
+        Returns the results of the requests, in the order they were added.
+        """
+        requests = self._requests
+        self._requests = []
+        if not requests:
+            return []
+        window = asyncio.Semaphore(self.window)
+
+        async def issue(request):
+            async with window:
+                return await request
+
+        return await asyncio.gather(*[issue(request) for request in requests])
+
+    def discard(self) -> None:
+        """Discard all added requests without issuing them."""
+        for request in self._requests:
+            if asyncio.iscoroutine(request):
+                request.close()
+        self._requests = []
+
+    async def __aenter__(self) -> 'CommandPipeline':
+        """Start adding requests to the pipeline."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Run the pipeline, or discard its requests if an exception was raised."""
+        if exc_type is None:
+            await self.run()
+        else:
+            self.discard()
+
+
+class StateSynchronizer(object):
+    """Requests the values of all channels of protocol trees concurrently.
+
+    Every node of every tree with a request method is requested with an empty
+    payload, as by :meth:`ProtocolHandlerNode.request_all`, but all trees share
+    one window of in-flight requests, since they share the peripheral's
+    receive buffer. If a request fails, the remaining requests are cancelled.
+
+    Args:
+        window: the maximum number of requests in flight.
+        progress: an optional callback called with the number of completed
+            requests and the total number of requests after each request.
+
+    Attributes:
+        completed (int): the number of completed requests of the last run.
+        total (int): the number of requests of the last run.
+        durations (Dict[str, float]): the time in seconds from the start of the
+            last run until all requests of each tree had completed, keyed by
+            the node name of the tree's root.
+
+    """
+
+    def __init__(
+        self, window: int=DEFAULT_PIPELINE_WINDOW,
+        progress: Optional[Callable[[int, int], None]]=None
+    ):
+        """Initialize member variables."""
+        if window < 1:
+            raise ValueError('Synchronizer window must be at least 1!')
+        self.window = window
+        self.progress = progress
+        self.completed: int = 0
+        self.total: int = 0
+        self.durations: Dict[str, float] = OrderedDict()
+
+    async def run(self, *protocols: 'ProtocolHandlerNode') -> Dict[str, float]:
+        """Request the values of all channels of the protocols.
+
+        Returns the time taken to synchronize each protocol, keyed by node name.
+        """
+        requests = [
+            (protocol.node_name, node)
+            for protocol in protocols for node in protocol.requestable_nodes
+        ]
+        remaining = OrderedDict((protocol.node_name, 0) for protocol in protocols)
+        for (name, _) in requests:
+            remaining[name] += 1
+        self.completed = 0
+        self.total = len(requests)
+        self.durations = OrderedDict()
+        window = asyncio.Semaphore(self.window)
+        start_time = time.time()
+        for (name, count) in remaining.items():
+            if not count:
+                self.durations[name] = 0.0
+
+        async def request(name, node):
+            async with window:
+                await node.request()
+            self.completed += 1
+            remaining[name] -= 1
+            if not remaining[name]:
+                self.durations[name] = time.time() - start_time
+                logger.debug('Synchronized {} in {:.3f} s.'.format(
+                    name, self.durations[name]
+                ))
+            if self.progress is not None:
+                self.progress(self.completed, self.total)
+
+        tasks = [
+            asyncio.ensure_future(request(name, node)) for (name, node) in requests
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return self.durations
+
+
+class ParameterCache(object):
+    """Write-through cache of the values of settable peripheral parameters.
+
+    The cache holds the last value reported by the peripheral on each channel
+    of a settable parameter, so that a request to set a parameter to the value
+    it already has can skip the round trip to the peripheral. The peripheral
+    loses its parameters when it resets, so the cache is cleared whenever the
+    connection synchronizer, if given, is disconnected or reconnected, and
+    whenever :meth:`on_reset` is called; register the cache as a response
+    receiver of the core Reset protocol to clear it on resets.
+
+    Attributes:
+        hits (int): number of requests skipped because the cached value matched.
+        misses (int): number of requests sent because the cached value was
+            unknown or different.
+
+    """
+
+    def __init__(self, connection_synchronizer=None):
+        """Initialize member variables."""
+        self.connection_synchronizer = connection_synchronizer
+        self.hits: int = 0
+        self.misses: int = 0
+        self._values: Dict[str, Any] = {}
+        self._connections: Optional[int] = None
+
+    def _check_connection(self) -> None:
+        """Clear the cache if the connection has been lost since it was filled."""
+        if self.connection_synchronizer is None:
+            return
+        connections = (
+            self.connection_synchronizer.connections
+            if self.connection_synchronizer.is_connected else None
+        )
+        if connections is None or connections != self._connections:
+            self._values.clear()
+            self._connections = connections
+
+    def lookup(self, channel: str, payload: Any) -> bool:
+        """Return whether the parameter on the channel is known to have the value."""
+        self._check_connection()
+        if channel in self._values and self._values[channel] == payload:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def update(self, channel: str, payload: Any) -> None:
+        """Store a value reported by the peripheral for the parameter on the channel."""
+        self._check_connection()
+        self._values[channel] = payload
+
+    def invalidate(self) -> None:
+        """Forget all cached values."""
+        self._values.clear()
+
+    async def on_reset(self) -> None:
+        """Forget all cached values when the peripheral resets."""
+        self.invalidate()
 
 
 # Hierarchical channels
@@ -161,12 +493,26 @@ class ChannelTreeNode(metaclass=InterfaceClass):
 
 
 class ChannelHandlerTreeNode(ChannelTreeNode, MessageReceiver, metaclass=InterfaceClass):
-    """Mixin for a command handler in a hierarchical handler tree."""
+    """Mixin for a command handler in a hierarchical handler tree.
+
+    Messages received by the root node of a tree are routed by a
+    :class:`ChannelRouter` to only the nodes on the path of their channels.
+    """
 
     async def on_any_message(self, message):
         """Handle any message whether or not it is recognized as by the node."""
         pass
 
+    @property
+    def handles_any_message(self) -> bool:
+        """Return whether on_any_message currently needs to be called."""
+        return type(self).on_any_message is not ChannelHandlerTreeNode.on_any_message
+
+    @cached_property
+    def channel_router(self) -> 'ChannelRouter':
+        """Return the router of messages through the tree below the node."""
+        return ChannelRouter(self)
+
     async def on_received_message(self, channel_name_remainder, message):
         """Handle a message recognized as being handled by the node."""
         pass
@@ -185,6 +531,9 @@ class ChannelHandlerTreeNode(ChannelTreeNode, MessageReceiver, metaclass=Interfa
 
     async def on_message(self, message):
         """Receive and handle a message by dispatching it to the appropriate handler."""
+        if self.parent is None:
+            await self.channel_router.on_message(message)
+            return
         channel_name = message.channel
         await self.on_any_message(message)
         if not channel_name.startswith(self.name_path):
@@ -207,22 +556,118 @@ class ChannelHandlerTreeNode(ChannelTreeNode, MessageReceiver, metaclass=Interfa
         await asyncio.gather(*tasks)
 
 
+class ChannelRouter(MessageReceiver):
+    """Routes messages through a channel handler tree along their channel paths.
+
+    Makes the same handler calls as :meth:`ChannelHandlerTreeNode.on_message`
+    would recursively make, but the route of handlers for each channel name is
+    computed once and cached in a flat dict keyed by channel name. Each message
+    then only visits the handlers of nodes on its channel path, plus the
+    on_any_message handlers of those nodes and their children when they need it.
+    """
+
+    def __init__(self, root: ChannelHandlerTreeNode):
+        """Initialize member variables."""
+        self.root = root
+        self._routes: Dict[
+            str, Tuple[List[ChannelHandlerTreeNode], List[Callable]]
+        ] = {}
+
+    def route(self, channel_name: str):
+        """Return the nodes to notify of and the handlers to call for a channel."""
+        try:
+            return self._routes[channel_name]
+        except KeyError:
+            pass
+        observers = [self.root]
+        handlers = []
+        self._add_route(self.root, channel_name, observers, handlers)
+        self._routes[channel_name] = (observers, handlers)
+        return (observers, handlers)
+
+    def _add_route(self, node, channel_name, observers, handlers):
+        """Recursively add the handlers of a node and its children to a route."""
+        if not channel_name.startswith(node.name_path):
+            return
+        channel_name_remainder = channel_name[len(node.name_path):]
+        handlers.append(
+            functools.partial(node.on_received_message, channel_name_remainder)
+        )
+        child_handler = node.child_handlers.get(channel_name_remainder)
+        if child_handler is not None:
+            handlers.append(functools.partial(child_handler, channel_name_remainder))
+        for (prefix, handler) in node.child_prefix_handlers.items():
+            if channel_name_remainder.startswith(prefix):
+                handlers.append(functools.partial(handler, channel_name_remainder))
+        for child in node.children.values():
+            observers.append(child)
+            self._add_route(child, channel_name, observers, handlers)
+
+    # Implement MessageReceiver
+
+    async def on_message(self, message):
+        """Receive and handle a message by calling the handlers on its route."""
+        (observers, handlers) = self.route(message.channel)
+        for node in observers:
+            if node.handles_any_message:
+                await node.on_any_message(message)
+        for handler in handlers:
+            await handler(message)
+
+
 class ProtocolHandlerNode(ChannelHandlerTreeNode, CommandIssuer):
-    """Mixin for a non-root command handler in a hierarchical handler tree."""
+    """Mixin for a non-root command handler in a hierarchical handler tree.
+
+    Nodes for settable peripheral parameters set cached_parameter, so that
+    if a ParameterCache is given to the tree, requests to set the parameter to
+    its cached value are skipped.
+    """
 
     # TODO:implement feedbackcontroller nodes
 
-    def __init__(self, node_channel, node_name, parent=None, **kwargs):
+    cached_parameter: bool = False
+
+    def __init__(
+        self, node_channel, node_name, parent=None,
+        parameter_cache: Optional[ParameterCache]=None, **kwargs
+    ):
         """Initialize member variables."""
         super().__init__(**kwargs)
         self._parent = parent
         self._node_channel = node_channel
         self._node_name = node_name
+        self._parameter_cache = parameter_cache
         self.last_response_payload = None
         self.initialized = asyncio.Event()
         if self.parent is not None:
             self.command_receivers = self.parent.command_receivers
 
+    @property
+    def parameter_cache(self) -> Optional[ParameterCache]:
+        """Return the parameter cache of the node, or else of its nearest ancestor."""
+        if self._parameter_cache is not None or self.parent is None:
+            return self._parameter_cache
+        return self.parent.parameter_cache
+
+    @parameter_cache.setter
+    def parameter_cache(self, parameter_cache: Optional[ParameterCache]) -> None:
+        """Set the parameter cache of the node and its descendants."""
+        self._parameter_cache = parameter_cache
+
+    async def issue_command(self, command: Command, **kwargs) -> None:
+        """Issue a command, unless it sets the parameter to its cached value."""
+        if (
+            self.cached_parameter and not command.is_read and
+            command.message.channel == self.name_path and
+            not self.has_issued_commands
+        ):
+            parameter_cache = self.parameter_cache
+            if parameter_cache is not None and parameter_cache.lookup(
+                command.message.channel, command.message.payload
+            ):
+                return
+        await super().issue_command(command, **kwargs)
+
     async def notify_response_receivers(self, payload: Any) -> None:
         """Validate the payload and notify the response receivers."""
         if payload is None:
@@ -261,12 +706,20 @@ class ProtocolHandlerNode(ChannelHandlerTreeNode, CommandIssuer):
         """Return a list of child nodes."""
         return []
 
-    async def request_all(self):
-        """Recursively attempt to call the request method with an empty payload."""
-        if callable(getattr(self, 'request', None)):
-            await self.request()
+    @property
+    def requestable_nodes(self) -> List['ProtocolHandlerNode']:
+        """Return the node and its descendants which have a request method, in tree order."""
+        nodes = [self] if callable(getattr(self, 'request', None)) else []
         for child in self.children_list:
-            await child.request_all()
+            nodes.extend(child.requestable_nodes)
+        return nodes
+
+    async def request_all(self, window: int=DEFAULT_PIPELINE_WINDOW):
+        """Recursively attempt to call the request method with an empty payload.
+
+        Requests are issued concurrently, with at most window requests in flight.
+        """
+        await StateSynchronizer(window=window).run(self)
 
     # Implement ChannelTreeNode
 
@@ -296,6 +749,11 @@ class ProtocolHandlerNode(ChannelHandlerTreeNode, CommandIssuer):
             return
         self.on_response(message.channel)
 
+    @property
+    def handles_any_message(self) -> bool:
+        """Return whether on_any_message currently needs to be called."""
+        return self.has_issued_commands
+
     async def on_received_message(self, channel_name_remainder, message) -> None:
         """Handle received message."""
         if message.payload is None:
@@ -303,5 +761,7 @@ class ProtocolHandlerNode(ChannelHandlerTreeNode, CommandIssuer):
         if message.channel == self.name_path:
             if message.payload is not None:
                 self.last_response_payload = message.payload
+                if self.cached_parameter and self.parameter_cache is not None:
+                    self.parameter_cache.update(message.channel, message.payload)
             await self.notify_response_receivers(message.payload)
             self.initialized.set()
@@ -2,24 +2,59 @@
 
 # Standard imports
 import logging
+import time
 from abc import abstractmethod
+from collections import deque
 
 # Local package imiports
+from lhrhost.protocol import CommandPipeline
 from lhrhost.protocol.linear_actuator import Receiver as LinearActuatorReceiver
+from lhrhost.robot.calibration import CALIBRATION_MODELS, LinearCalibration
+from lhrhost.robot.presets import PresetTable
+from lhrhost.robot.scheduling import AxisTimeModel
+from lhrhost.robot.tunings import TuningIndex, TuningState
 from lhrhost.util.containers import add_to_tree, get_from_tree
 from lhrhost.util.files import load_from_json, save_to_json
 from lhrhost.util.interfaces import InterfaceClass
 
 # External imports
-import scipy.stats as stats
+import numpy as np
 
 # Logging
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 
+def _index_to_number(index):
+    """Convert a letter index of an indexed module position to a number."""
+    if isinstance(index, str) and len(index) == 1:
+        return ord(index)
+    return index
+
+
 class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
-    """High-level controller mixin interface for axes with physical position units."""
+    """High-level controller mixin interface for axes with physical position units.
+
+    If early_completion is set to an EarlyCompletion criterion, moves are
+    declared complete by the host as soon as the criterion holds.
+
+    The sensor distance and duration of recent moves are recorded, to fit a
+    model of the axis's travel time. While dry_run is set to a DryRun, moves
+    are recorded by it instead of being sent to the peripheral.
+    """
+
+    early_completion = None
+    dry_run = None
+    max_move_durations = 256
+
+    def __init__(self):
+        """Initialize member variables."""
+        super().__init__()
+        self.move_durations = deque(maxlen=self.max_move_durations)
+        self.default_tuning = None
+        self.target_position_tunings = []
+        self.tuning_index = TuningIndex()
+        self.tuning_state = TuningState(self)
 
     @property
     @abstractmethod
@@ -47,15 +82,48 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
         """Load localized controller tunings from the provided JSON file path.
 
         Default path: 'calibrations/{}_tunings.json' where {} is replaced with
-        the axis name.
+        the axis name. Raises ValueError if the target position ranges of any
+        tunings overlap.
         """
         if json_path is None:
             json_path = 'calibrations/{}_tunings.json'.format(self.name)
         trees = load_from_json(json_path)
         self.default_tuning = trees['default']
         self.target_position_tunings = trees['target positions']
+        self.compile_tunings()
         return trees
 
+    def compile_tunings(self):
+        """Index the localized controller tunings by target position range.
+
+        Must be called after target_position_tunings is modified.
+        """
+        self.tuning_index = TuningIndex(self.target_position_tunings)
+
+    def get_tuning(self, sensor_position):
+        """Return the localized controller tuning for a target sensor position."""
+        tuning = self.tuning_index.lookup(sensor_position)
+        if tuning is None:
+            logger.debug(
+                'PID tunings for sensor position {} unspecified, using defaults.'
+                .format(int(sensor_position))
+            )
+            return self.default_tuning
+        return tuning
+
+    def tuning(self, tuning=None):
+        """Return an async context manager which keeps tunings applied across moves.
+
+        Moves in the block only switch tunings when their targets need a
+        different tuning, and the tuning from before the block is restored when
+        it exits. If a tuning is given, it is used for all moves in the block.
+        """
+        return self.tuning_state.scope(tuning)
+
+    async def restore_tuning(self):
+        """Restore the controller tuning from before the first move's tuning."""
+        await self.tuning_state.restore()
+
     def save_tunings_json(self, json_path=None):
         """Save a localized controller tunings tree to the provided JSON file path."""
         if json_path is None:
@@ -66,59 +134,71 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
         }, json_path)
 
     async def go_to_sensor_position(
-        self, sensor_position, apply_tunings=True, restore_tunings=True
+        self, sensor_position, apply_tunings=True, restore_tunings=False
     ):
         """Go to the specified sensor position.
 
+        The tuning for the target stays applied after the move, so that the next
+        move sends nothing if it needs the same tuning; restore_tuning restores
+        the previous tuning. If restore_tunings is set, the previous tuning is
+        instead restored after the move, unless the move is in a tuning scope.
         Returns the final sensor position.
         """
+        if self.dry_run is not None:
+            return await self.dry_run.move(self, int(sensor_position))
+        start_position = self.last_sensor_position
+        start_time = time.time()
         if apply_tunings:
-            current_tuning = self.default_tuning
-            for tuning in self.target_position_tunings:
-                if sensor_position >= tuning['min'] and sensor_position < tuning['max']:
-                    current_tuning = tuning
-            else:
-                logger.debug(
-                    'PID tunings for sensor position {} unspecified, using defaults.'
-                    .format(int(sensor_position))
-                )
-            kp = current_tuning['pid']['kp']
-            kd = current_tuning['pid']['kd']
-            motor_limits = current_tuning['limits']['motor']
-            duty_forwards_max = motor_limits['forwards']['max']
-            duty_forwards_min = motor_limits['forwards']['min']
-            duty_backwards_max = motor_limits['backwards']['max']
-            duty_backwards_min = motor_limits['backwards']['min']
-            (prev_kp, prev_kd, prev_ki) = await self.set_pid_gains(kp=kp, kd=kd)
-            (
-                prev_duty_forwards_max, prev_duty_forwards_min,
-                prev_duty_backwards_max, prev_duty_backwards_min
-            ) = await self.set_motor_limits(
-                forwards_max=duty_forwards_max, forwards_min=duty_forwards_min,
-                backwards_max=duty_backwards_max, backwards_min=duty_backwards_min
-            )
+            tuning = self.tuning_state.pinned
+            if tuning is None:
+                tuning = self.get_tuning(sensor_position)
+            await self.tuning_state.apply(tuning)
         await self.protocol.feedback_controller.request_complete(
-            int(sensor_position)
+            int(sensor_position), early_completion=self.early_completion
         )
-        if apply_tunings and restore_tunings:
-            await self.set_pid_gains(kp=prev_kp, kd=prev_kd, ki=prev_ki)
-            await self.set_motor_limits(
-                forwards_max=duty_forwards_max, forwards_min=duty_forwards_min,
-                backwards_max=duty_backwards_max, backwards_min=duty_backwards_min
+        if apply_tunings and restore_tunings and not self.tuning_state.scopes:
+            await self.tuning_state.restore()
+        if start_position is not None:
+            self.move_durations.append(
+                (int(sensor_position) - start_position, time.time() - start_time)
             )
         return self.protocol.position.last_response_payload
 
+    def fit_time_model(self, default=None):
+        """Fit a travel time model to the recorded moves of the axis.
+
+        Returns the default model if too few moves have been recorded. If no
+        default is given, the default model's overhead is the convergence
+        timeout of the feedback controller, if known.
+        """
+        if default is None:
+            convergence_timeout = (
+                self.protocol.feedback_controller.convergence_timeout
+                .last_response_payload
+            )
+            default = AxisTimeModel()
+            if convergence_timeout is not None:
+                default.overhead = convergence_timeout / 1000
+        return AxisTimeModel.fit(self.move_durations, default=default)
+
     async def go_to_low_end_position(self, speed=None):
         """Go to the lowest possible sensor position at the maximum allowed speed.
 
         Speed must be given as a signed motor duty cycle.
         """
+        if self.dry_run is not None:
+            (low_position, _) = self.last_position_limits
+            return await self.dry_run.move(
+                self, low_position if low_position is not None else 0
+            )
         if speed is None:
             speed = (
                 self.protocol.feedback_controller.limits.motor
                 .backwards.high.last_response_payload
             )
-        await self.protocol.motor.request_complete(speed)
+        await self.protocol.motor.request_complete(
+            speed, early_completion=self.early_completion
+        )
         await self.protocol.position.request()
         return self.protocol.position.last_response_payload
 
@@ -127,12 +207,19 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
 
         Speed must be given as a signed motor duty cycle.
         """
+        if self.dry_run is not None:
+            (_, high_position) = self.last_position_limits
+            return await self.dry_run.move(
+                self, high_position if high_position is not None else 1023
+            )
         if speed is None:
             speed = (
                 self.protocol.feedback_controller.limits.motor
                 .forwards.high.last_response_payload
             )
-        await self.protocol.motor.request_complete(speed)
+        await self.protocol.motor.request_complete(
+            speed, early_completion=self.early_completion
+        )
         await self.protocol.position.request()
         return self.protocol.position.last_response_payload
 
@@ -191,18 +278,25 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
     @property
     async def sensor_position(self):
         """Get the current sensor position of the axis."""
-        await self.protocol.position.request()
+        if self.dry_run is None:
+            await self.protocol.position.request()
         return self.last_sensor_position
 
     @property
     def last_sensor_position(self):
-        """Get the last received sensor position of the axis."""
+        """Get the last received sensor position of the axis.
+
+        During a dry run, this is instead the simulated sensor position.
+        """
+        if self.dry_run is not None:
+            return self.dry_run.positions[self.name]
         return self.protocol.position.last_response_payload
 
     @property
     async def physical_position(self):
         """Get the current physical position of the axis."""
-        await self.protocol.position.request()
+        if self.dry_run is None:
+            await self.protocol.position.request()
         return self.last_physical_position
 
     @property
@@ -210,21 +304,28 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
         """Get the last received physical position of the axis."""
         return self.sensor_to_physical(self.last_sensor_position)
 
-    async def set_pid_gains(self, kp=None, kd=None, ki=None, floating_point=True):
+    async def set_pid_gains(
+        self, kp=None, kd=None, ki=None, floating_point=True, pipeline=None
+    ):
         """Set values for the PID gains whose values are specified.
 
+        The gains are requested concurrently. If a CommandPipeline is given, the
+        requests are instead added to it, to be issued when it is run.
         Returns the previous values of the gains.
         """
         pid_protocol = self.protocol.feedback_controller.pid
         prev_kp = pid_protocol.kp.last_response_payload
         prev_kd = pid_protocol.kd.last_response_payload
         prev_ki = pid_protocol.ki.last_response_payload
+        requests = CommandPipeline() if pipeline is None else pipeline
         if kp is not None and prev_kp != int(kp * 100 if floating_point else kp):
-            await pid_protocol.kp.request(int(kp * 100 if floating_point else kp))
-        if kd is not None and prev_kd != int(kd * 100 if floating_point else kp):
-            await pid_protocol.kd.request(int(kd * 100 if floating_point else kp))
-        if ki is not None and prev_ki != int(ki * 100 if floating_point else kp):
-            await pid_protocol.ki.request(int(ki * 100 if floating_point else kp))
+            requests.add(pid_protocol.kp.request(int(kp * 100 if floating_point else kp)))
+        if kd is not None and prev_kd != int(kd * 100 if floating_point else kd):
+            requests.add(pid_protocol.kd.request(int(kd * 100 if floating_point else kd)))
+        if ki is not None and prev_ki != int(ki * 100 if floating_point else ki):
+            requests.add(pid_protocol.ki.request(int(ki * 100 if floating_point else ki)))
+        if pipeline is None:
+            await requests.run()
         return (
             prev_kp / 100 if floating_point else prev_kp,
             prev_kd / 100 if floating_point else prev_kd,
@@ -232,10 +333,13 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
         )
 
     async def set_motor_limits(
-        self, forwards_max=None, forwards_min=None, backwards_max=None, backwards_min=None
+        self, forwards_max=None, forwards_min=None,
+        backwards_max=None, backwards_min=None, pipeline=None
     ):
         """Set values for the motor duty cycle limits where specified.
 
+        The limits are requested concurrently. If a CommandPipeline is given, the
+        requests are instead added to it, to be issued when it is run.
         Returns the previous values of the limits.
         """
         limits_protocol = self.protocol.feedback_controller.limits.motor
@@ -243,14 +347,17 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
         prev_forwards_min = limits_protocol.forwards.low.last_response_payload
         prev_backwards_max = -limits_protocol.backwards.high.last_response_payload
         prev_backwards_min = -limits_protocol.backwards.low.last_response_payload
+        requests = CommandPipeline() if pipeline is None else pipeline
         if forwards_max is not None and prev_forwards_max != int(forwards_max):
-            await limits_protocol.forwards.high.request(int(forwards_max))
+            requests.add(limits_protocol.forwards.high.request(int(forwards_max)))
         if forwards_min is not None and prev_forwards_min != int(forwards_min):
-            await limits_protocol.forwards.high.request(int(forwards_min))
+            requests.add(limits_protocol.forwards.low.request(int(forwards_min)))
         if backwards_max is not None and prev_backwards_max != int(backwards_max):
-            await limits_protocol.backwards.high.request(int(-backwards_max))
+            requests.add(limits_protocol.backwards.high.request(int(-backwards_max)))
         if backwards_min is not None and prev_backwards_min != int(backwards_min):
-            await limits_protocol.backwards.high.request(int(-backwards_min))
+            requests.add(limits_protocol.backwards.low.request(int(-backwards_min)))
+        if pipeline is None:
+            await requests.run()
         return (
             prev_forwards_max, prev_forwards_min,
             prev_backwards_max, prev_backwards_min
@@ -260,24 +367,38 @@ class RobotAxis(LinearActuatorReceiver, metaclass=InterfaceClass):
 class ContinuousRobotAxis(RobotAxis):
     """High-level controller mixin interface for axes with continuous positions.
 
-    Assumes a linear transformation exists between sensor and physical positions.
+    Sensor and physical positions are related by a calibration model fitted to
+    calibration samples, which is linear unless another model is chosen.
+    Conversions between sensor and physical positions accept NumPy arrays.
     """
 
     def __init__(self):
         """Initialize member variables."""
         super().__init__()
         self._calibration_samples = []
-        self.linear_regression = None
+        self.calibration_model = LinearCalibration()
 
     def clear_calibration_samples(self):
         """Discard the stored calibration data."""
         self._calibration_samples = []
-        self.linear_regression = None
+        self.calibration_model.clear()
 
     def add_calibration_sample(self, sensor_position, physical_position):
         """Add a (sensor, physical) position pair for calibration."""
-        self.linear_regression = None
         self._calibration_samples.append((sensor_position, physical_position))
+        self.calibration_model.clear()
+
+    def fit_calibration(self, calibration_model=None):
+        """Fit a calibration model to the calibration data and store it.
+
+        Default: refit the current calibration model. Returns the fitted
+        model's parameters.
+        """
+        if calibration_model is None:
+            calibration_model = self.calibration_model
+        parameters = calibration_model.fit(self._calibration_samples)
+        self.calibration_model = calibration_model
+        return parameters
 
     def fit_calibration_linear(self):
         """Perform a linear regression on the calibration data and store results.
@@ -285,23 +406,21 @@ class ContinuousRobotAxis(RobotAxis):
         Returns the regression slope, intercept, R-value, and standard error.
         The regression is for physical_position = slope * sensor_position + intercept.
         """
-        linear_regression = stats.linregress(self._calibration_samples)
-        self.linear_regression = [
-            linear_regression[0], linear_regression[1],
-            linear_regression[2], linear_regression[4]
-        ]
+        self.fit_calibration(LinearCalibration())
         return self.linear_regression
 
+    @property
+    def linear_regression(self):
+        """Return the slope, intercept, R-value, and standard error of the fit."""
+        model = self._linear_calibration_model()
+        return [model.slope, model.intercept, model.rvalue, model.stderr]
+
     @property
     def calibration_data(self):
         """Return a JSON-exportable structure of calibration data."""
         calibration_data = {
-            'parameters': {
-                'slope': self.linear_regression[0],
-                'intercept': self.linear_regression[1],
-                'rsquared': self.linear_regression[2],
-                'stderr': self.linear_regression[3]
-            },
+            'model': self.calibration_model.name,
+            'parameters': self.calibration_model.parameters,
             'physical unit': self.physical_unit,
             'samples': [
                 {
@@ -314,12 +433,19 @@ class ContinuousRobotAxis(RobotAxis):
         return calibration_data
 
     def load_calibration(self, calibration_data):
-        """Load a calibration from the provided calibration data structure."""
+        """Load a calibration from the provided calibration data structure.
+
+        The calibration model is refitted to the samples; calibrations without a
+        model are linear.
+        """
         self._calibration_samples = [
             (calibration_sample['sensor'], calibration_sample['physical'])
             for calibration_sample in calibration_data['samples']
         ]
-        self.fit_calibration_linear()
+        model_class = CALIBRATION_MODELS[calibration_data.get('model', 'linear')]
+        self.fit_calibration(model_class.from_parameters(
+            calibration_data.get('parameters', {})
+        ))
 
     def load_calibration_json(self, json_path=None):
         """Load a calibration from a provided JSON file path.
@@ -344,42 +470,61 @@ class ContinuousRobotAxis(RobotAxis):
     @property
     def sensor_to_physical_scaling(self):
         """Return the scaling factor from sensor to physical positions."""
-        if self.linear_regression is None:
-            self._fit_calibration_linear()
-        return self.linear_regression[0]
+        return self._linear_calibration_model().slope
 
     @property
     def sensor_to_physical_offset(self):
         """Return the post-scaling offset from sensor to physical positions."""
-        if self.linear_regression is None:
-            self._fit_calibration_linear()
-        return self.linear_regression[1]
+        return self._linear_calibration_model().intercept
+
+    def _ensure_calibration_fitted(self):
+        """Fit the calibration model to the calibration data if it is not fitted."""
+        if not self.calibration_model.fitted:
+            self.fit_calibration()
+
+    def _linear_calibration_model(self):
+        """Return the fitted calibration model, which must be linear.
+
+        Raises:
+            TypeError: the calibration model is not linear.
+
+        """
+        if not isinstance(self.calibration_model, LinearCalibration):
+            raise TypeError(
+                'The {} axis has a {} calibration, which has no linear regression!'
+                .format(self.name, self.calibration_model.name)
+            )
+        self._ensure_calibration_fitted()
+        return self.calibration_model
 
     # Implement RobotAxis
 
     def physical_to_sensor(self, physical_position):
-        """Convert a position in physical units to a unitless integer sensor position."""
-        return (
-            (physical_position - self.sensor_to_physical_offset) /
-            self.sensor_to_physical_scaling
-        )
+        """Convert physical positions to unitless sensor positions."""
+        self._ensure_calibration_fitted()
+        return self.calibration_model.physical_to_sensor(physical_position)
 
     def sensor_to_physical(self, sensor_position):
-        """Convert a unitless sensor position to a position in physical units."""
-        return (
-            self.sensor_to_physical_scaling * sensor_position +
-            self.sensor_to_physical_offset
-        )
+        """Convert unitless sensor positions to positions in physical units."""
+        self._ensure_calibration_fitted()
+        return self.calibration_model.sensor_to_physical(sensor_position)
 
 
 class PresetRobotAxis(RobotAxis):
-    """High-level controller mixin for axes with preset positions."""
+    """High-level controller mixin for axes with preset positions.
+
+    Preset position trees are compiled into flat lookup tables whenever they
+    are loaded or changed, so that invalid preset positions are reported then
+    and each preset position lookup is a single table lookup.
+    """
 
     def __init__(self):
         """Initialize member variables."""
         super().__init__()
         self.preset_sensor_position_tree = {}
         self.preset_physical_position_tree = {}
+        self.preset_sensor_position_table = PresetTable()
+        self.preset_physical_position_table = PresetTable()
         self.current_preset_position = None
 
     def set_preset_sensor_position(self, preset_position, sensor_position):
@@ -399,6 +544,7 @@ class PresetRobotAxis(RobotAxis):
             self.preset_sensor_position_tree, preset_position,
             sensor_position
         )
+        self.compile_presets()
 
     def set_preset_physical_position(self, preset_position, physical_position):
         """Associate a preset position with a physical position."""
@@ -417,6 +563,7 @@ class PresetRobotAxis(RobotAxis):
             self.preset_physical_position_tree, preset_position,
             physical_position
         )
+        self.compile_presets()
 
     def get_preset_position(self, presets_tree, preset_position):
         """Get an actual position from a preset position tree node."""
@@ -447,29 +594,72 @@ class PresetRobotAxis(RobotAxis):
 
     def preset_to_sensor(self, preset_position, use_physical_if_needed=True):
         """Convert a preset position to a sensor position."""
-        try:
-            return self.get_preset_position(
-                self.preset_sensor_position_tree, preset_position
-            )
-        except KeyError:
-            if use_physical_if_needed:
-                physical_position = self.preset_to_physical(preset_position, False)
-                return self.physical_to_sensor(physical_position)
-            else:
-                raise
+        sensor_position = self.preset_sensor_position_table.get(preset_position)
+        if sensor_position is not None:
+            return sensor_position
+        if (
+            use_physical_if_needed and
+            preset_position not in self.preset_sensor_position_table
+        ):
+            physical_position = self.preset_to_physical(preset_position, False)
+            return self.physical_to_sensor(physical_position)
+        return self.preset_sensor_position_table.lookup(preset_position)
 
     def preset_to_physical(self, preset_position, use_sensor_if_needed=True):
         """Convert a preset position to a physical position."""
-        try:
-            return self.get_preset_position(
-                self.preset_physical_position_tree, preset_position
+        physical_position = self.preset_physical_position_table.get(preset_position)
+        if physical_position is not None:
+            return physical_position
+        if (
+            use_sensor_if_needed and
+            preset_position not in self.preset_physical_position_table
+        ):
+            sensor_position = self.preset_to_sensor(preset_position, False)
+            return self.sensor_to_physical(sensor_position)
+        return self.preset_physical_position_table.lookup(preset_position)
+
+    def compile_presets(self):
+        """Compile the preset position trees into lookup tables.
+
+        Raises an error for any invalid preset position in the trees.
+        """
+        self.preset_sensor_position_table = self.compile_preset_tree(
+            self.preset_sensor_position_tree
+        )
+        self.preset_physical_position_table = self.compile_preset_tree(
+            self.preset_physical_position_tree
+        )
+
+    def compile_preset_tree(self, presets_tree):
+        """Compile a preset position tree into a lookup table."""
+        table = PresetTable()
+        for (name, node) in presets_tree.items():
+            self.compile_preset_node(table, presets_tree, (name,), node)
+        return table
+
+    def compile_preset_node(self, table, presets_tree, key, node):
+        """Add the preset positions of a preset position tree node to a lookup table."""
+        if not isinstance(node, dict):
+            table.add_position(key, node)
+            return
+        type = node.get('type')
+        if type is None:
+            table.add_unusable(key, 'Type-less preset position {}!')
+            for (name, child) in node.items():
+                self.compile_preset_node(table, presets_tree, key + (name,), child)
+        elif type == 'implicit':
+            table.add_unusable(key, 'Cannot use implicit preset position {}!')
+        elif type == 'constants':
+            table.add_unusable(key, 'Cannot use partially-specified preset position {}!')
+            for (name, child) in node.items():
+                if name != 'type':
+                    self.compile_preset_node(table, presets_tree, key + (name,), child)
+        elif type == 'constant':
+            table.add_position(key, node['value'])
+        else:
+            raise NotImplementedError(
+                'Unknown type {} for preset position {}!'.format(type, key)
             )
-        except KeyError:
-            if use_sensor_if_needed:
-                sensor_position = self.preset_to_sensor(preset_position, False)
-                return self.sensor_to_physical(sensor_position)
-            else:
-                raise
 
     async def go_to_preset_position(self, preset_position, force_go=False):
         """Go to the specified preset position.
@@ -495,9 +685,14 @@ class PresetRobotAxis(RobotAxis):
         if json_path is None:
             json_path = 'calibrations/{}_preset.json'.format(self.name)
         trees = load_from_json(json_path)
+        self.load_preset_trees(trees)
+        self.compile_presets()
+        return trees
+
+    def load_preset_trees(self, trees):
+        """Use the preset position trees loaded from a JSON file."""
         self.preset_physical_position_tree = trees['physical']
         self.preset_sensor_position_tree = trees['sensor']
-        return trees
 
     def save_preset_json(self, json_path=None):
         """Save a preset positions tree to the provided JSON file path.
@@ -573,7 +768,8 @@ class ManuallyAlignedRobotAxis(AlignedRobotAxis, ContinuousRobotAxis):
     async def set_alignment(self):
         """Update the physical calibration to align against the current position."""
         position = await self.sensor_position
-        self.linear_regression[1] = -self.linear_regression[0] * position
+        self._ensure_calibration_fitted()
+        self.calibration_model.align(position)
 
 
 class ModularRobotAxis(PresetRobotAxis):
@@ -595,14 +791,10 @@ class ModularRobotAxis(PresetRobotAxis):
 
     def get_indexed_offset(self, module_params, index, origin_index_key='origin index'):
         """Return the physical offset for the provided module indexed preset position."""
-        def to_num(index):
-            if isinstance(index, str) and len(index) == 1:
-                return ord(index)
-            return index
-        index = to_num(index)
-        min_index = to_num(module_params['min index'])
-        max_index = to_num(module_params['max index'])
-        origin_index = to_num(module_params[origin_index_key])
+        index = _index_to_number(index)
+        min_index = _index_to_number(module_params['min index'])
+        max_index = _index_to_number(module_params['max index'])
+        origin_index = _index_to_number(module_params[origin_index_key])
         if (index < min_index) or (max_index is not None and index > max_index):
             raise IndexError(
                 'Index {} is out of the range ({}, {})!'
@@ -610,6 +802,20 @@ class ModularRobotAxis(PresetRobotAxis):
             )
         return (index - origin_index) * module_params['increment']
 
+    def get_indexed_offsets(self, module_params, origin_index_key='origin index'):
+        """Return the indices and physical offsets of all module indexed positions."""
+        min_index = _index_to_number(module_params['min index'])
+        max_index = _index_to_number(module_params['max index'])
+        origin_index = _index_to_number(module_params[origin_index_key])
+        if max_index is None:
+            raise ValueError('Indexed module positions need a max index!')
+        indices = np.arange(min_index, max_index + 1)
+        if isinstance(module_params['min index'], str):
+            labels = [chr(index) for index in indices]
+        else:
+            labels = [int(index) for index in indices]
+        return (labels, (indices - origin_index) * module_params['increment'])
+
     def get_continuous_offset(self, module_params, offset):
         """Return the physical offset for the provided module continuous preset position."""
         min = module_params['min']
@@ -649,6 +855,29 @@ class ModularRobotAxis(PresetRobotAxis):
         """Move to the position for the specified module."""
         await self.go_to_preset_position((module, position))
 
+    def compile_module(self, table, presets_tree, module, module_params):
+        """Add the positions of a module to a preset position lookup table."""
+        origin = (
+            self.get_module_mount_position(presets_tree, module) +
+            module_params['origin']
+        )
+        if module_params['type'] == 'indexed':
+            (labels, offsets) = self.get_indexed_offsets(module_params)
+            table.add_indexed_module(module, labels, origin + offsets)
+        elif module_params['type'] == 'continuous':
+            table.add_continuous_module(
+                module, origin, module_params['min'], module_params['max']
+            )
+        else:
+            raise NotImplementedError(
+                'Unknown module type {}!'.format(module_params['type'])
+            )
+
+    def _get_origin_position(self, module):
+        """Return the physical position of the origin of a continuous module."""
+        (origin, _, _) = self.preset_physical_position_table.continuous_modules[module]
+        return origin
+
     # Implement PresetRobotAxis
 
     def get_preset_position(self, presets_tree, preset_position):
@@ -659,6 +888,16 @@ class ModularRobotAxis(PresetRobotAxis):
             module_params = get_from_tree(presets_tree, preset_position[0])
             return self.get_module_position(presets_tree, module_params, preset_position)
 
+    def compile_preset_node(self, table, presets_tree, key, node):
+        """Add the preset positions of a preset position tree node to a lookup table."""
+        if (
+            len(key) == 1 and isinstance(node, dict) and
+            node.get('type') in ('indexed', 'continuous')
+        ):
+            self.compile_module(table, presets_tree, key[0], node)
+            return
+        super().compile_preset_node(table, presets_tree, key, node)
+
 
 class ConfigurableRobotAxis(ModularRobotAxis):
     """High-level controller mixin for axes with reconfigurable sets of modules."""
@@ -673,18 +912,48 @@ class ConfigurableRobotAxis(ModularRobotAxis):
 
     # Implement PresetRobotAxis
 
-    def load_preset_json(self, json_path=None):
-        """Load a preset positions tree from the provided JSON file path.
-
-        Default path: 'calibrations/{}_preset.json' where {} is replaced with the
-        axis name.
-        """
-        trees = super().load_preset_json(json_path)
+    def load_preset_trees(self, trees):
+        """Use the preset position trees and configurations loaded from a JSON file."""
+        super().load_preset_trees(trees)
         if self.configuration is None:
             self.configuration = trees['default configuration']
         self.configurations = trees['configurations']
         self.configuration_tree = trees['configurations'][self.configuration]
 
+    def compile_preset_tree(self, presets_tree):
+        """Compile a preset position tree and the configured modules into a lookup table.
+
+        Module types are only addressable through the names of the modules in
+        the active configuration.
+        """
+        table = super().compile_preset_tree(presets_tree)
+        if self.configuration_tree is None:
+            return table
+        for module_name in self.configuration_tree:
+            module_type = self.get_module_type(module_name)
+            if module_type in presets_tree:
+                self.compile_module(
+                    table, presets_tree, module_name, presets_tree[module_type]
+                )
+            elif presets_tree is self.preset_physical_position_tree:
+                raise KeyError(
+                    'Module {} has unknown module type {}!'
+                    .format(module_name, module_type)
+                )
+        return table
+
+    def compile_preset_node(self, table, presets_tree, key, node):
+        """Add the preset positions of a preset position tree node to a lookup table."""
+        if (
+            len(key) == 1 and isinstance(node, dict) and
+            node.get('type') in ('indexed', 'continuous')
+        ):
+            table.add_unusable(
+                key, 'Cannot use module type {} without a configured module!'
+            )
+            return
+        super().compile_preset_node(table, presets_tree, key, node)
+
     def save_preset_json(self, json_path=None):
         """Save a preset positions tree to the provided JSON file path.
 
@@ -0,0 +1,356 @@
+"""Calibration models between sensor positions and physical positions of axes."""
+
+# Standard imports
+import logging
+from abc import abstractmethod
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+# Local package imports
+from lhrhost.util.interfaces import InterfaceClass
+
+# External imports
+import numpy as np
+import scipy.stats as stats
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Sensor positions are 10-bit values
+SENSOR_RANGE = 1024
+
+# Type-checking names
+_Samples = Iterable[Tuple[float, float]]
+
+
+class CalibrationModel(object, metaclass=InterfaceClass):
+    """Model of physical positions as a function of sensor positions.
+
+    Conversions accept and return either scalars or NumPy arrays. Once fitted,
+    a model precomputes the physical position of every sensor position in the
+    sensor range, which is used to invert the model for conversions from
+    physical positions to sensor positions; the model must therefore be
+    monotonic over the sensor range.
+
+    Attributes:
+        physical_offset: a physical offset added to the model, e.g. to align
+            the physical origin to a sensor position.
+        sensor_table: the sensor positions of the lookup table.
+        physical_table: the physical position, without the physical offset,
+            of each sensor position of the lookup table.
+
+    """
+
+    name = None
+
+    def __init__(self):
+        """Initialize member variables."""
+        self.physical_offset = 0.0
+        self.sensor_table = np.arange(SENSOR_RANGE, dtype=np.float64)
+        self.physical_table = None
+        self._inverse_order = None
+
+    @property
+    def fitted(self) -> bool:
+        """Return whether the model has been fitted."""
+        return self.physical_table is not None
+
+    def clear(self) -> None:
+        """Discard the fit of the model, e.g. because its samples changed."""
+        self.physical_table = None
+        self._inverse_order = None
+        self.physical_offset = 0.0
+
+    def fit(self, samples: _Samples) -> Dict[str, Any]:
+        """Fit the model to (sensor position, physical position) samples.
+
+        Resets the physical offset. Returns the parameters of the fitted model.
+
+        Raises:
+            ValueError: the samples are too few to determine the model's
+                parameters, or the fitted model is not monotonic over the
+                sensor range.
+
+        """
+        samples = np.array([sample for sample in samples], dtype=np.float64)
+        if samples.ndim != 2 or len(samples) < 2:
+            raise ValueError('At least 2 calibration samples are needed!')
+        self._fit(samples[:, 0], samples[:, 1])
+        self.physical_offset = 0.0
+        physical_table = self._evaluate(self.sensor_table)
+        steps = np.diff(physical_table)
+        if np.all(steps > 0):
+            self._inverse_order = slice(None)
+        elif np.all(steps < 0):
+            self._inverse_order = slice(None, None, -1)
+        else:
+            raise ValueError(
+                'The fitted {} calibration is not monotonic over the sensor range!'
+                .format(self.name)
+            )
+        self.physical_table = physical_table
+        return self.parameters
+
+    def align(self, sensor_position: float, physical_position: float=0.0) -> None:
+        """Shift the model so that the sensor position has the physical position."""
+        self.physical_offset += (
+            physical_position - self.sensor_to_physical(sensor_position)
+        )
+
+    def sensor_to_physical(self, sensor_positions):
+        """Convert sensor positions to physical positions."""
+        physical_positions = (
+            self._evaluate(np.asarray(sensor_positions, dtype=np.float64)) +
+            self.physical_offset
+        )
+        return _unwrap(physical_positions)
+
+    def physical_to_sensor(self, physical_positions):
+        """Convert physical positions to sensor positions.
+
+        Positions outside the physical range of the sensor range are linearly
+        extrapolated from the ends of the lookup table.
+        """
+        physical_positions = (
+            np.asarray(physical_positions, dtype=np.float64) - self.physical_offset
+        )
+        return _unwrap(_interpolate(
+            physical_positions,
+            self.physical_table[self._inverse_order],
+            self.sensor_table[self._inverse_order]
+        ))
+
+    @property
+    @abstractmethod
+    def parameters(self) -> Dict[str, Any]:
+        """Return a JSON-exportable structure of the fitted model parameters."""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def from_parameters(cls, parameters: Dict[str, Any]) -> 'CalibrationModel':
+        """Return an unfitted model with the same options as the parameters."""
+        pass
+
+    @abstractmethod
+    def _fit(self, sensor_positions: np.ndarray, physical_positions: np.ndarray) -> None:
+        """Fit the model parameters to the samples."""
+        pass
+
+    @abstractmethod
+    def _evaluate(self, sensor_positions: np.ndarray) -> np.ndarray:
+        """Evaluate the model, without the physical offset."""
+        pass
+
+
+class LinearCalibration(CalibrationModel):
+    """Linear regression of physical positions on sensor positions.
+
+    Attributes:
+        slope: the physical units per sensor unit.
+        intercept: the physical position at sensor position 0.
+        rvalue: the correlation coefficient of the fitted samples.
+        stderr: the standard error of the slope.
+
+    """
+
+    name = 'linear'
+
+    def __init__(self):
+        """Initialize member variables."""
+        super().__init__()
+        self.slope = None
+        self._intercept = None
+        self.rvalue = None
+        self.stderr = None
+
+    @property
+    def intercept(self) -> float:
+        """Return the physical position at sensor position 0, including the offset."""
+        return self._intercept + self.physical_offset
+
+    # Implement CalibrationModel
+
+    @property
+    def parameters(self):
+        """Return a JSON-exportable structure of the fitted model parameters."""
+        return {
+            'slope': self.slope,
+            'intercept': self.intercept,
+            'rsquared': self.rvalue,
+            'stderr': self.stderr
+        }
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        """Return an unfitted model with the same options as the parameters."""
+        return cls()
+
+    def physical_to_sensor(self, physical_positions):
+        """Convert physical positions to sensor positions."""
+        return _unwrap(
+            (np.asarray(physical_positions, dtype=np.float64) - self.intercept) /
+            self.slope
+        )
+
+    def _fit(self, sensor_positions, physical_positions):
+        """Fit the model parameters to the samples."""
+        linear_regression = stats.linregress(sensor_positions, physical_positions)
+        self.slope = float(linear_regression[0])
+        self._intercept = float(linear_regression[1])
+        self.rvalue = float(linear_regression[2])
+        self.stderr = float(linear_regression[4])
+
+    def _evaluate(self, sensor_positions):
+        """Evaluate the model, without the physical offset."""
+        return self.slope * sensor_positions + self._intercept
+
+
+class PiecewiseLinearCalibration(CalibrationModel):
+    """Continuous piecewise-linear least-squares fit with fixed breakpoints.
+
+    Args:
+        breakpoints: the sensor positions at which the slope may change.
+            Default: quantiles of the samples' sensor positions which split
+            the samples into the number of segments.
+        segments: the number of segments, if breakpoints are not given.
+
+    """
+
+    name = 'piecewise linear'
+
+    def __init__(self, breakpoints: Optional[Sequence[float]]=None, segments: int=4):
+        """Initialize member variables."""
+        super().__init__()
+        self.segments = segments
+        self.breakpoints = None
+        self.coefficients = None
+        self._breakpoints = breakpoints
+
+    def _design_matrix(
+        self, sensor_positions: np.ndarray, breakpoints: Optional[np.ndarray]=None
+    ) -> np.ndarray:
+        """Return the hinge basis of the sensor positions, flattened.
+
+        Default: use the breakpoints of the fitted model.
+        """
+        if breakpoints is None:
+            breakpoints = self.breakpoints
+        sensor_positions = np.ravel(sensor_positions)
+        return np.column_stack(
+            [np.ones_like(sensor_positions), sensor_positions] +
+            [
+                np.maximum(sensor_positions - breakpoint, 0)
+                for breakpoint in breakpoints
+            ]
+        )
+
+    # Implement CalibrationModel
+
+    @property
+    def parameters(self):
+        """Return a JSON-exportable structure of the fitted model parameters."""
+        return {
+            'breakpoints': [float(breakpoint) for breakpoint in self.breakpoints],
+            'coefficients': [float(coefficient) for coefficient in self.coefficients]
+        }
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        """Return an unfitted model with the same options as the parameters."""
+        return cls(breakpoints=parameters['breakpoints'])
+
+    def _fit(self, sensor_positions, physical_positions):
+        """Fit the model parameters to the samples."""
+        if self._breakpoints is None:
+            quantiles = np.linspace(0, 1, self.segments + 1)[1:-1]
+            breakpoints = np.unique(np.quantile(sensor_positions, quantiles))
+        else:
+            breakpoints = np.asarray(self._breakpoints, dtype=np.float64)
+        design_matrix = self._design_matrix(sensor_positions, breakpoints)
+        (coefficients, _, rank, _) = np.linalg.lstsq(
+            design_matrix, physical_positions, rcond=None
+        )
+        if rank < design_matrix.shape[1]:
+            raise ValueError(
+                'The {} calibration with {} segments cannot be determined by {} '
+                'samples at {} distinct sensor positions!'.format(
+                    self.name, len(breakpoints) + 1, len(sensor_positions),
+                    len(np.unique(sensor_positions))
+                )
+            )
+        self.breakpoints = breakpoints
+        self.coefficients = coefficients
+
+    def _evaluate(self, sensor_positions):
+        """Evaluate the model, without the physical offset."""
+        physical_positions = self._design_matrix(sensor_positions) @ self.coefficients
+        return physical_positions.reshape(np.shape(sensor_positions))
+
+
+class PolynomialCalibration(CalibrationModel):
+    """Polynomial least-squares fit.
+
+    Args:
+        degree: the degree of the polynomial.
+
+    """
+
+    name = 'polynomial'
+
+    def __init__(self, degree: int=2):
+        """Initialize member variables."""
+        super().__init__()
+        self.degree = degree
+        self.coefficients = None
+
+    # Implement CalibrationModel
+
+    @property
+    def parameters(self):
+        """Return a JSON-exportable structure of the fitted model parameters."""
+        return {
+            'degree': self.degree,
+            'coefficients': [float(coefficient) for coefficient in self.coefficients]
+        }
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        """Return an unfitted model with the same options as the parameters."""
+        return cls(degree=parameters['degree'])
+
+    def _fit(self, sensor_positions, physical_positions):
+        """Fit the model parameters to the samples."""
+        if len(np.unique(sensor_positions)) <= self.degree:
+            raise ValueError(
+                'The degree {} {} calibration cannot be determined by samples at '
+                'fewer than {} distinct sensor positions!'
+                .format(self.degree, self.name, self.degree + 1)
+            )
+        self.coefficients = np.polyfit(sensor_positions, physical_positions, self.degree)
+
+    def _evaluate(self, sensor_positions):
+        """Evaluate the model, without the physical offset."""
+        return np.polyval(self.coefficients, sensor_positions)
+
+
+CALIBRATION_MODELS = {
+    model.name: model
+    for model in [LinearCalibration, PiecewiseLinearCalibration, PolynomialCalibration]
+}
+
+
+def _interpolate(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """Interpolate linearly in a table, extrapolating linearly beyond its ends."""
+    y = np.interp(x, xp, fp)
+    low_slope = (fp[1] - fp[0]) / (xp[1] - xp[0])
+    high_slope = (fp[-1] - fp[-2]) / (xp[-1] - xp[-2])
+    y = np.where(x < xp[0], fp[0] + (x - xp[0]) * low_slope, y)
+    return np.where(x > xp[-1], fp[-1] + (x - xp[-1]) * high_slope, y)
+
+
+def _unwrap(values: np.ndarray):
+    """Return a scalar array as a float, and any other array unchanged."""
+    if np.ndim(values):
+        return values
+    return float(values)
@@ -0,0 +1,238 @@
+"""Dry runs of liquid-handling robot routines, to estimate their duration."""
+
+# Standard imports
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional
+
+# Local package imports
+from lhrhost.robot.scheduling import AxisTimeModel
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class DryRunMove(NamedTuple):
+    """A move recorded during a dry run, with its estimated timing in seconds."""
+
+    step: Optional[str]
+    axis: str
+    start_position: float
+    target_position: float
+    start_time: float
+    duration: float
+
+
+class DryRun(object):
+    """Records the moves of a robot without sending them, and estimates durations.
+
+    While the dry run is active, every move of every axis of the robot is
+    recorded instead of being sent to the peripheral, and the axes report their
+    simulated positions. Each move takes a simulated duration given by its
+    axis's travel time model, on a virtual clock, so that moves which the
+    routine runs concurrently (e.g. in a MotionPlan) overlap in the estimate.
+    Preset positions of the axes are restored when the dry run ends.
+
+    Moves are attributed to the step named by the innermost active
+    :meth:`step` block, or to no step outside of any block.
+
+    Args:
+        robot: the robot whose moves are recorded.
+        time_models: the travel time model of each axis, keyed by axis name.
+            Default: models fitted from the moves measured by each axis.
+        initial_positions: the sensor position of each axis at the start of
+            the dry run, keyed by axis name. Default: the last received sensor
+            position of each axis. An axis with no known position starts at
+            its low position limit, or at sensor position 0 if its limits are
+            also unknown, e.g. when dry-running before connecting.
+        idle_rounds: the number of event loop iterations to wait for other
+            tasks to start their moves before advancing the virtual clock.
+
+    """
+
+    def __init__(
+        self, robot, time_models: Optional[Dict[str, AxisTimeModel]]=None,
+        initial_positions: Optional[Dict[str, float]]=None, idle_rounds: int=10
+    ):
+        """Initialize member variables."""
+        self.robot = robot
+        self.axes = [robot.p, robot.z, robot.y, robot.x]
+        if time_models is None:
+            time_models = {axis.name: axis.fit_time_model() for axis in self.axes}
+        self.time_models = time_models
+        self.idle_rounds = idle_rounds
+        self.positions: Dict[str, Optional[float]] = {}
+        if initial_positions is not None:
+            self.positions.update(initial_positions)
+        self.moves: List[DryRunMove] = []
+        self.current_step: Optional[str] = None
+        self.now: float = 0.0
+        self._preset_positions = {}
+        self._timers = []
+        self._timer_sequence = itertools.count()
+        self._advance_handle = None
+
+    # Simulated moves
+
+    @contextmanager
+    def step(self, name: str):
+        """Attribute the moves made in the block to the named step."""
+        previous_step = self.current_step
+        self.current_step = name
+        try:
+            yield self
+        finally:
+            self.current_step = previous_step
+
+    async def move(self, axis, target_position: float) -> float:
+        """Record a move of an axis and wait for its simulated duration.
+
+        Returns the target position as the final position.
+        """
+        start_position = self.positions[axis.name]
+        duration = self.time_models[axis.name].duration(
+            target_position - start_position
+        )
+        self.moves.append(DryRunMove(
+            self.current_step, axis.name, start_position, target_position,
+            self.now, duration
+        ))
+        self.positions[axis.name] = target_position
+        await self._sleep(duration)
+        return target_position
+
+    async def _sleep(self, duration: float) -> None:
+        """Wait until the virtual clock has advanced by the duration."""
+        if duration <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(
+            self._timers, (self.now + duration, next(self._timer_sequence), future)
+        )
+        self._schedule_advance()
+        await future
+
+    def _schedule_advance(self) -> None:
+        """Advance the virtual clock once the other tasks have started their moves."""
+        if self._advance_handle is None and self._timers:
+            self._advance_handle = asyncio.get_event_loop().call_soon(
+                self._advance, self.idle_rounds
+            )
+
+    def _advance(self, idle_rounds: int) -> None:
+        """Advance the virtual clock to the end of the earliest pending move."""
+        if idle_rounds > 0:
+            self._advance_handle = asyncio.get_event_loop().call_soon(
+                self._advance, idle_rounds - 1
+            )
+            return
+        self._advance_handle = None
+        (end_time, _, future) = heapq.heappop(self._timers)
+        self.now = max(self.now, end_time)
+        if not future.done():
+            future.set_result(None)
+        self._schedule_advance()
+
+    # Estimates
+
+    @property
+    def duration(self) -> float:
+        """Return the estimated duration in seconds of all recorded moves."""
+        return max(
+            [self.now] + [move.start_time + move.duration for move in self.moves]
+        )
+
+    def step_durations(self) -> Dict[Optional[str], float]:
+        """Return the estimated duration in seconds of each step, in order.
+
+        The duration of a step spans from the start of its first move to the
+        end of its last move.
+        """
+        spans = OrderedDict()
+        for move in self.moves:
+            (start, end) = spans.get(move.step, (move.start_time, move.start_time))
+            spans[move.step] = (
+                min(start, move.start_time), max(end, move.start_time + move.duration)
+            )
+        return OrderedDict(
+            (step, end - start) for (step, (start, end)) in spans.items()
+        )
+
+    def axis_durations(self) -> Dict[str, float]:
+        """Return the estimated time in seconds which each axis spends moving."""
+        durations = OrderedDict((axis.name, 0.0) for axis in self.axes)
+        for move in self.moves:
+            durations[move.axis] += move.duration
+        return durations
+
+    def step_axis_durations(self) -> Dict[Optional[str], Dict[str, float]]:
+        """Return the estimated time which each axis spends moving in each step."""
+        durations = OrderedDict()
+        for move in self.moves:
+            step_durations = durations.setdefault(move.step, OrderedDict())
+            step_durations[move.axis] = step_durations.get(move.axis, 0.0) + move.duration
+        return durations
+
+    def report(self) -> str:
+        """Return a human-readable breakdown of the estimated durations."""
+        lines = ['Estimated duration: {:.1f} s'.format(self.duration)]
+        lines.append('By step:')
+        step_axis_durations = self.step_axis_durations()
+        for (step, duration) in self.step_durations().items():
+            lines.append('  {}: {:.1f} s ({})'.format(
+                step if step is not None else '(no step)', duration,
+                ', '.join(
+                    '{}: {:.1f} s'.format(axis, axis_duration)
+                    for (axis, axis_duration) in step_axis_durations[step].items()
+                )
+            ))
+        lines.append('By axis:')
+        for (axis, duration) in self.axis_durations().items():
+            lines.append('  {}: {:.1f} s moving in {} moves'.format(
+                axis, duration, sum(1 for move in self.moves if move.axis == axis)
+            ))
+        return '\n'.join(lines)
+
+    # Activation
+
+    def start(self) -> None:
+        """Start recording the moves of the robot's axes instead of sending them."""
+        for axis in self.axes:
+            if self.positions.get(axis.name) is None:
+                self.positions[axis.name] = axis.last_sensor_position
+            if self.positions[axis.name] is None:
+                (low_position, _) = axis.last_position_limits
+                self.positions[axis.name] = (
+                    low_position if low_position is not None else 0
+                )
+                logger.info(
+                    'Position of the {} axis is unknown, so the dry run starts it '
+                    'at sensor position {}.'.format(axis.name, self.positions[axis.name])
+                )
+            self._preset_positions[axis.name] = getattr(
+                axis, 'current_preset_position', None
+            )
+            axis.dry_run = self
+
+    def stop(self) -> None:
+        """Stop recording the moves of the robot's axes."""
+        for axis in self.axes:
+            if axis.dry_run is self:
+                del axis.dry_run
+            if hasattr(axis, 'current_preset_position'):
+                axis.current_preset_position = self._preset_positions[axis.name]
+
+    async def __aenter__(self) -> 'DryRun':
+        """Start the dry run."""
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Stop the dry run."""
+        self.stop()
@@ -51,9 +51,13 @@ class Axis(ContinuousRobotAxis, PresetRobotAxis):
             'volumes': self.volume_tunings
         }, json_path)
 
+    def pre_intake_position(self, volume):
+        """Return the preset pre-intake position for intaking a precise volume."""
+        return ('pre-intake', int(volume * 1000))
+
     async def go_to_pre_intake(self, volume):
         """Move to the pre-intake position for dispensing precise volumes."""
-        await self.go_to_discrete_position(('pre-intake', int(volume * 1000)))
+        await self.go_to_preset_position(self.pre_intake_position(volume))
 
     async def intake(self, volume):
         """Intake the specified volume."""
@@ -0,0 +1,114 @@
+"""Concurrent planning of moves across the axes of a liquid-handling robot."""
+
+# Standard imports
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Dict, Iterable, List, Tuple
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class MotionPlan(object):
+    """Named axis moves with ordering constraints, run as concurrently as allowed.
+
+    Moves are added as not-yet-awaited coroutines, e.g. the result of
+    `robot.y.go_to_module_position('plate', 1)`, each with the names of the
+    previously added moves which must complete before it may start, e.g. so
+    that the z-axis is raised clear of all modules before any x/y travel. When
+    the plan is run, each move starts as soon as all of its prerequisites have
+    completed, so moves without a constraint between them run concurrently.
+
+    If a move fails, moves which have not yet started are discarded, moves in
+    progress are cancelled, and the failure is raised by :meth:`run`.
+
+    The plan can also be used as an asynchronous context manager, which runs
+    all added moves on exit.
+    """
+
+    def __init__(self):
+        """Initialize member variables."""
+        self._moves: Dict[str, Tuple[Awaitable, List[str]]] = OrderedDict()
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether a move with the name has been added."""
+        return name in self._moves
+
+    def __len__(self):
+        """Return the number of moves waiting to be run."""
+        return len(self._moves)
+
+    def add(self, name: str, move: Awaitable, after: Iterable[str]=()) -> str:
+        """Add a move which may only start after the named moves have completed.
+
+        Returns the name of the move. A move which cannot be added is discarded.
+        """
+        after = [prerequisite for prerequisite in after]
+        error = None
+        if name in self._moves:
+            error = 'Move {} is already in the motion plan!'.format(name)
+        for prerequisite in after:
+            if prerequisite not in self._moves:
+                error = 'Move {} must come after unknown move {}!'.format(
+                    name, prerequisite
+                )
+        if error is not None:
+            if asyncio.iscoroutine(move):
+                move.close()
+            raise ValueError(error)
+        self._moves[name] = (move, after)
+        return name
+
+    async def run(self) -> Dict[str, Any]:
+        """Run all added moves and wait for all of them to complete.
+
+        Returns the result of each move, keyed by name.
+        """
+        moves = self._moves
+        self._moves = OrderedDict()
+        tasks: Dict[str, asyncio.Future] = OrderedDict()
+        for (name, (move, after)) in moves.items():
+            tasks[name] = asyncio.ensure_future(self._run_move(
+                name, move, [tasks[prerequisite] for prerequisite in after]
+            ))
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return OrderedDict(zip(tasks.keys(), results))
+
+    async def _run_move(
+        self, name: str, move: Awaitable, prerequisites: List[asyncio.Future]
+    ) -> Any:
+        """Wait for the prerequisites of a move to complete, then run it."""
+        try:
+            if prerequisites:
+                await asyncio.gather(*prerequisites)
+        except BaseException:
+            if asyncio.iscoroutine(move):
+                move.close()
+            raise
+        logger.debug('Starting move {}...'.format(name))
+        return await move
+
+    def discard(self) -> None:
+        """Discard all added moves without running them."""
+        for (move, _) in self._moves.values():
+            if asyncio.iscoroutine(move):
+                move.close()
+        self._moves = OrderedDict()
+
+    async def __aenter__(self) -> 'MotionPlan':
+        """Start adding moves to the plan."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Run the plan, or discard its moves if an exception was raised."""
+        if exc_type is None:
+            await self.run()
+        else:
+            self.discard()
@@ -0,0 +1,147 @@
+"""Compiled lookup tables of the preset positions of robot axes."""
+
+# Standard imports
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+# External imports
+import numpy as np
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Type-checking names
+_PresetKey = Tuple[Any, ...]
+
+
+class PresetTable(object):
+    """Flat lookup table of preset positions, compiled from a preset positions tree.
+
+    Preset positions are keyed by the tuple of keys along their path in the
+    tree, e.g. ('96-well plate', 3); a string preset position such as
+    'high end' is keyed as ('high end',).
+
+    Attributes:
+        positions: the actual position of each usable discrete preset position.
+        unusable: the reason why each unusable preset position (e.g. implicit
+            or partially-specified positions) cannot be used.
+        module_positions: the indices and the array of actual positions of all
+            positions of each indexed module, in index order.
+        continuous_modules: the origin position and the (min, max) offset range
+            of each continuous module; max may be None for no upper bound.
+
+    """
+
+    def __init__(self):
+        """Initialize member variables."""
+        self.positions: Dict[_PresetKey, Any] = {}
+        self.unusable: Dict[_PresetKey, str] = {}
+        self.module_positions: Dict[str, Tuple[List[Any], np.ndarray]] = {}
+        self.continuous_modules: Dict[str, Tuple[float, float, Optional[float]]] = {}
+
+    @staticmethod
+    def key(preset_position) -> _PresetKey:
+        """Return the lookup key of a preset position."""
+        if isinstance(preset_position, str):
+            return (preset_position,)
+        return tuple(preset_position)
+
+    def __contains__(self, preset_position) -> bool:
+        """Return whether the table has an entry for the preset position.
+
+        The entry may be for an unusable preset position or a module position
+        with an out-of-range index or offset.
+        """
+        key = self.key(preset_position)
+        return (
+            key in self.positions or key in self.unusable or
+            (len(key) == 2 and (
+                key[0] in self.module_positions or key[0] in self.continuous_modules
+            ))
+        )
+
+    def get(self, preset_position, default=None):
+        """Return the actual position of a preset position, or the default if unknown.
+
+        Raises:
+            ValueError: the offset of a continuous module position is out of range.
+
+        """
+        key = self.key(preset_position)
+        position = self.positions.get(key)
+        if position is not None:
+            return position
+        module = self._continuous_module(key)
+        if module is not None:
+            return self._continuous_position(module, preset_position[1])
+        return default
+
+    def lookup(self, preset_position):
+        """Return the actual position of a preset position.
+
+        Raises:
+            KeyError: the preset position is unknown.
+            TypeError: the preset position is known but cannot be used.
+            IndexError: the index of an indexed module position is out of range.
+            ValueError: the offset of a continuous module position is out of range.
+
+        """
+        position = self.get(preset_position)
+        if position is not None:
+            return position
+        key = self.key(preset_position)
+        if key in self.unusable:
+            raise TypeError(self.unusable[key].format(preset_position))
+        if len(key) == 2 and key[0] in self.module_positions:
+            (indices, _) = self.module_positions[key[0]]
+            raise IndexError(
+                'Index {} is out of the range ({}, {})!'
+                .format(key[1], indices[0], indices[-1])
+            )
+        raise KeyError(preset_position)
+
+    # Compilation
+
+    def add_position(self, key: _PresetKey, position) -> None:
+        """Add a discrete preset position, unless the key is already used."""
+        if key not in self.positions:
+            self.positions[key] = position
+
+    def add_unusable(self, key: _PresetKey, reason: str) -> None:
+        """Add a preset position which cannot be used, with a format string reason."""
+        self.unusable[key] = reason
+
+    def add_indexed_module(
+        self, module: str, indices: List[Any], positions: np.ndarray
+    ) -> None:
+        """Add all positions of an indexed module."""
+        self.module_positions[module] = (indices, positions)
+        self.add_unusable((module,), 'Cannot use module {} without a module position!')
+        for (index, position) in zip(indices, positions):
+            self.add_position((module, index), float(position))
+
+    def add_continuous_module(
+        self, module: str, origin: float, min: float, max: Optional[float]
+    ) -> None:
+        """Add the range of positions of a continuous module."""
+        self.continuous_modules[module] = (origin, min, max)
+        self.add_unusable((module,), 'Cannot use module {} without a module position!')
+
+    # Continuous module positions
+
+    def _continuous_module(self, key: _PresetKey) -> Optional[str]:
+        """Return the continuous module of a preset key, if it has one."""
+        if len(key) == 2 and key[0] in self.continuous_modules:
+            return key[0]
+        return None
+
+    def _continuous_position(self, module: str, offset: float) -> float:
+        """Return the actual position at the offset in a continuous module."""
+        (origin, min, max) = self.continuous_modules[module]
+        if (offset < min) or (max is not None and offset > max):
+            raise ValueError(
+                'Offset {} is out of the range ({}, {})!'
+                .format(offset, min, max)
+            )
+        return origin + offset
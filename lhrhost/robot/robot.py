@@ -5,7 +5,13 @@ import asyncio
 import logging
 
 # Local package imports
+from lhrhost.protocol import ParameterCache, StateSynchronizer
+from lhrhost.protocol.protocol import DEFAULT_PIPELINE_WINDOW
+from lhrhost.protocol.linear_actuator.completion import EarlyCompletion
+from lhrhost.protocol.linear_actuator.telemetry import TelemetryStore
+from lhrhost.robot.dry_run import DryRun
 from lhrhost.robot.p_axis import Axis as PAxis
+from lhrhost.robot.planner import MotionPlan
 from lhrhost.robot.x_axis import Axis as XAxis
 from lhrhost.robot.y_axis import Axis as YAxis
 from lhrhost.robot.z_axis import Axis as ZAxis
@@ -28,13 +34,24 @@ class Robot(object):
         self.z = ZAxis()
         self.y = YAxis()
         self.x = XAxis()
+        self.parameter_cache = ParameterCache()
+        for axis in [self.p, self.z, self.y, self.x]:
+            axis.protocol.parameter_cache = self.parameter_cache
+        self.telemetry = TelemetryStore(protocols=[
+            self.p.protocol, self.z.protocol, self.y.protocol, self.x.protocol
+        ])
         self.prompt = Prompt(end='', flush=True)
 
     def register_messaging_stack(self, messaging_stack):
         """Associate a messaging stack with the robot.
 
-        The messaging stack is used for host-peripheral communication.
+        The messaging stack is used for host-peripheral communication, and its
+        connection synchronizer is used to clear the parameter cache whenever
+        the peripheral reconnects.
         """
+        self.parameter_cache.connection_synchronizer = (
+            messaging_stack.connection_synchronizer
+        )
         messaging_stack.register_response_receivers(
             self.p.protocol, self.z.protocol, self.y.protocol, self.x.protocol
         )
@@ -42,6 +59,27 @@ class Robot(object):
             self.p.protocol, self.z.protocol, self.y.protocol, self.x.protocol
         )
 
+    def enable_early_completion(self, **kwargs):
+        """Declare the moves of all axes complete as soon as they settle.
+
+        The EarlyCompletion criterion reads recent positions from the robot's
+        telemetry store; its other arguments are given as keyword arguments.
+        Returns the criterion.
+        """
+        early_completion = EarlyCompletion(telemetry=self.telemetry, **kwargs)
+        for axis in [self.p, self.z, self.y, self.x]:
+            axis.early_completion = early_completion
+        return early_completion
+
+    async def restore_tunings(self):
+        """Restore the controller tunings of all axes from before their moves."""
+        await asyncio.gather(
+            self.p.restore_tuning(),
+            self.z.restore_tuning(),
+            self.y.restore_tuning(),
+            self.x.restore_tuning()
+        )
+
     async def wait_until_initialized(self):
         """Wait until all axes are initialized."""
         await asyncio.gather(
@@ -51,12 +89,36 @@ class Robot(object):
             self.x.wait_until_initialized()
         )
 
-    async def synchronize_values(self):
-        """Request the values of all protocol channels."""
-        await self.p.synchronize_values()
-        await self.z.synchronize_values()
-        await self.y.synchronize_values()
-        await self.x.synchronize_values()
+    async def synchronize_values(
+        self, window=DEFAULT_PIPELINE_WINDOW, progress=None
+    ):
+        """Request the values of all protocol channels.
+
+        The channels of all axes are requested concurrently, with at most
+        window requests in flight. If specified, progress is called with the
+        number of completed requests and the total number of requests after
+        each request. Returns the time in seconds taken to synchronize each
+        axis, keyed by protocol name.
+        """
+        synchronizer = StateSynchronizer(window=window, progress=progress)
+        durations = await synchronizer.run(
+            self.p.protocol, self.z.protocol, self.y.protocol, self.x.protocol
+        )
+        logger.debug('Synchronized {} channels: {}'.format(
+            synchronizer.total, ', '.join(
+                '{} in {:.3f} s'.format(name, duration)
+                for (name, duration) in durations.items()
+            )
+        ))
+        return durations
+
+    def dry_run(self, time_models=None, initial_positions=None):
+        """Return a DryRun which estimates the duration of moves instead of sending them.
+
+        Use it as an asynchronous context manager around the routine, e.g.
+        `async with robot.dry_run() as dry_run:`, then print `dry_run.report()`.
+        """
+        return DryRun(self, time_models=time_models, initial_positions=initial_positions)
 
     async def load_calibrations(self):
         """Load calibration parameters from json files."""
@@ -83,11 +145,11 @@ class Robot(object):
 
     async def go_to_alignment_hole(self):
         """Move the pipettor head to the alignment hole."""
-        await self.z.go_to_high_end_position()
-        await asyncio.gather(
-            self.y.go_to_alignment_hole(), self.x.go_to_alignment_hole()
-        )
-        await self.z.go_to_alignment_hole()
+        async with MotionPlan() as plan:
+            plan.add('z clearance', self.z.go_to_high_end_position())
+            plan.add('y', self.y.go_to_alignment_hole(), after=['z clearance'])
+            plan.add('x', self.x.go_to_alignment_hole(), after=['z clearance'])
+            plan.add('z', self.z.go_to_alignment_hole(), after=['x', 'y'])
 
     async def align_manually(self):
         """Do a manual alignment of x/y positioning."""
@@ -99,24 +161,74 @@ class Robot(object):
         await asyncio.gather(self.x.set_alignment(), self.y.set_alignment())
         logger.info('Aligned to the zero position at the alignment hole.')
 
-    async def go_to_module_position(
-        self, module_name, x_position, y_position, z_position=None
+    async def go_to_z_height(self, module_type, height):
+        """Move the z-axis to the specified height.
+
+        Height should be a preset z-axis position or a physical z-axis position.
+        """
+        try:
+            await self.z.go_to_module_position(module_type, height)
+        except KeyError:
+            await self.z.go_to_physical_position(height)
+
+    def plan_module_position(
+        self, plan, module_name, x_position, y_position, z_position=None,
+        pre_intake_volume=None
     ):
-        """Move the pipettor head to the specified x/y position of the module."""
+        """Add moves to the specified x/y position of the module to a MotionPlan.
+
+        The z-axis is first raised clear of the modules, after which the x-axis,
+        the y-axis, and (if a pre-intake volume is specified) the pipettor move
+        concurrently. If a z position is specified, the z-axis is lowered to it
+        once the x-axis, the y-axis, and the pipettor have arrived, so that the
+        plunger never moves while the pipette tip is being lowered.
+        Returns the names of the last moves in the plan.
+        """
         module_type = self.x.get_module_type(module_name)
         if (
             self.x.current_preset_position is not None and
             self.x.at_module(module_name)
         ):
-            await self.z.go_to_module_position(module_type, 'far above')
+            z_clearance = self.z.go_to_module_position(module_type, 'far above')
         else:
-            await self.z.go_to_high_end_position()
-        await asyncio.gather(
-            self.x.go_to_module_position(module_name, x_position),
-            self.y.go_to_module_position(module_type, y_position)
+            z_clearance = self.z.go_to_high_end_position()
+        plan.add('z clearance', z_clearance)
+        plan.add(
+            'x', self.x.go_to_module_position(module_name, x_position),
+            after=['z clearance']
         )
+        plan.add(
+            'y', self.y.go_to_module_position(module_type, y_position),
+            after=['z clearance']
+        )
+        last_moves = ['x', 'y']
+        if pre_intake_volume is not None:
+            plan.add(
+                'p', self.p.go_to_pre_intake(pre_intake_volume),
+                after=['z clearance']
+            )
+            last_moves.append('p')
         if z_position is not None:
-            await self.z.go_to_module_position(module_type, 'far above')
+            plan.add(
+                'z', self.go_to_z_height(module_type, z_position), after=last_moves
+            )
+            last_moves.append('z')
+        return last_moves
+
+    async def go_to_module_position(
+        self, module_name, x_position, y_position, z_position=None,
+        pre_intake_volume=None
+    ):
+        """Move the pipettor head to the specified x/y position of the module.
+
+        If a pre-intake volume is specified, the pipettor is moved to its
+        pre-intake position for that volume during x/y travel.
+        """
+        async with MotionPlan() as plan:
+            self.plan_module_position(
+                plan, module_name, x_position, y_position, z_position=z_position,
+                pre_intake_volume=pre_intake_volume
+            )
 
     async def intake(self, module_name, volume, height=None):
         """Intake fluid at the specified height.
@@ -125,17 +237,16 @@ class Robot(object):
         """
         module_type = self.x.get_module_type(module_name)
         if height is not None:
-            try:
-                await self.z.go_to_module_position(module_type, height)
-            except KeyError:
-                await self.z.go_to_physical_position(height)
+            await self.go_to_z_height(module_type, height)
         await self.p.intake(volume)
 
     async def intake_precise(self, module_name, volume, height=None):
         """Intake fluid at the specified height.
 
         Height should be a preset z-axis position or a physical z-axis position.
-        Volume should be either 20, 30, 40, 50, or 100.
+        Volume should be either 20, 30, 40, 50, or 100. If the pipettor is
+        already at its pre-intake position for the volume, e.g. from
+        go_to_module_position, the pipette tip is lowered directly.
         """
         module_type = self.x.get_module_type(module_name)
         if height is None:
@@ -143,12 +254,13 @@ class Robot(object):
                 height = self.z.current_preset_position[1]
             else:
                 height = await self.z.physical_position
-        await self.z.go_to_module_position(module_type, 'above')
-        await self.p.go_to_pre_intake(volume)
-        try:
-            await self.z.go_to_module_position(module_type, height)
-        except KeyError:
-            await self.z.go_to_physical_position(height)
+        async with MotionPlan() as plan:
+            z_after = []
+            if self.p.current_preset_position != self.p.pre_intake_position(volume):
+                plan.add('z above', self.z.go_to_module_position(module_type, 'above'))
+                plan.add('p', self.p.go_to_pre_intake(volume), after=['z above'])
+                z_after = ['p']
+            plan.add('z', self.go_to_z_height(module_type, height), after=z_after)
         await self.p.intake(volume)
 
     async def dispense(self, module_name, volume=None, height=None):
@@ -159,8 +271,5 @@ class Robot(object):
         """
         module_type = self.x.get_module_type(module_name)
         if height is not None:
-            try:
-                await self.z.go_to_module_position(module_type, height)
-            except KeyError:
-                await self.z.go_to_physical_position(height)
+            await self.go_to_z_height(module_type, height)
         await self.p.dispense(volume)
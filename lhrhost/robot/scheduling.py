@@ -0,0 +1,230 @@
+"""Scheduling of liquid-handling robot routines by their estimated travel time."""
+
+# Standard imports
+import logging
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# External imports
+import numpy as np
+import scipy.stats as stats
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Type-checking names
+_MoveDurations = Iterable[Tuple[float, float]]
+
+
+# Travel time models
+
+class AxisTimeModel(object):
+    """Model of the duration of an axis move as a linear function of its distance.
+
+    A move over a nonzero sensor distance d takes overhead + d * seconds_per_unit
+    seconds, where the overhead includes the feedback controller's convergence
+    timeout and the round trips of the move's commands.
+
+    Args:
+        overhead: the duration in seconds of a move over a negligible distance.
+        seconds_per_unit: the duration in seconds per sensor unit of distance.
+
+    """
+
+    def __init__(self, overhead: float=0.2, seconds_per_unit: float=0.002):
+        """Initialize member variables."""
+        self.overhead = overhead
+        self.seconds_per_unit = seconds_per_unit
+        self.samples: int = 0
+
+    @classmethod
+    def fit(
+        cls, move_durations: _MoveDurations, default: Optional['AxisTimeModel']=None
+    ) -> 'AxisTimeModel':
+        """Fit a model to (sensor distance, seconds) pairs of measured moves.
+
+        Returns the default model (or a new default-parameter model) if fewer
+        than two moves with different distances were measured.
+        """
+        move_durations = [
+            (abs(distance), duration) for (distance, duration) in move_durations
+            if distance
+        ]
+        if len(set(distance for (distance, _) in move_durations)) < 2:
+            return default if default is not None else cls()
+        (distances, durations) = zip(*move_durations)
+        regression = stats.linregress(distances, durations)
+        model = cls(
+            overhead=max(regression[1], 0.0), seconds_per_unit=max(regression[0], 0.0)
+        )
+        model.samples = len(move_durations)
+        return model
+
+    def duration(self, distance: float) -> float:
+        """Return the estimated duration in seconds of a move over a sensor distance."""
+        if not distance:
+            return 0.0
+        return self.overhead + abs(distance) * self.seconds_per_unit
+
+    def durations(self, distances: np.ndarray) -> np.ndarray:
+        """Return the estimated durations of moves over an array of distances."""
+        distances = np.abs(distances)
+        return np.where(
+            distances > 0, self.overhead + distances * self.seconds_per_unit, 0.0
+        )
+
+    def __repr__(self):
+        """Represent the model."""
+        return 'AxisTimeModel(overhead={:.3f} s, {:.5f} s/unit, {} samples)'.format(
+            self.overhead, self.seconds_per_unit, self.samples
+        )
+
+
+# Well visit planning
+
+class WellStep(NamedTuple):
+    """An action to perform at a well of a module.
+
+    The well is the (x position, y position) of the well on the module, as
+    passed to Robot.go_to_module_position, and the action is a callable which
+    returns an awaitable, e.g. `functools.partial(robot.dispense, 'plate', 0.1)`.
+    After is a tuple of the indices of steps which must be performed first.
+    """
+
+    module: str
+    well: Tuple[Any, Any]
+    action: Callable
+    after: Tuple[int, ...] = ()
+
+
+class WellVisitPlanner(object):
+    """Orders well visits to minimize the estimated travel time of the robot.
+
+    The x-axis and y-axis travel concurrently between wells, so the travel time
+    between two wells is the longer of the two axes' estimated move durations.
+    Steps are ordered greedily by nearest next well among the steps whose
+    prerequisites are done, and the order is then improved by reversing
+    segments of it wherever that shortens the total travel time without
+    violating any prerequisites.
+
+    Args:
+        robot: the robot which visits the wells.
+        time_models: the travel time model of each axis, keyed by axis name.
+            Default: models fitted from the moves measured by each axis.
+
+    """
+
+    def __init__(self, robot, time_models: Optional[Dict[str, AxisTimeModel]]=None):
+        """Initialize member variables."""
+        self.robot = robot
+        if time_models is None:
+            time_models = {
+                'x': robot.x.fit_time_model(), 'y': robot.y.fit_time_model()
+            }
+        self.time_models = time_models
+
+    def well_sensor_positions(self, step: WellStep) -> Tuple[float, float]:
+        """Return the x-axis and y-axis sensor positions of a step's well."""
+        module_type = self.robot.x.get_module_type(step.module)
+        (x_position, y_position) = step.well
+        return (
+            self.robot.x.preset_to_sensor((step.module, x_position)),
+            self.robot.y.preset_to_sensor((module_type, y_position))
+        )
+
+    def travel_times(self, steps: List[WellStep]) -> np.ndarray:
+        """Return the matrix of estimated travel times between the steps' wells."""
+        positions = np.array([self.well_sensor_positions(step) for step in steps])
+        x_distances = positions[:, 0][:, np.newaxis] - positions[:, 0][np.newaxis, :]
+        y_distances = positions[:, 1][:, np.newaxis] - positions[:, 1][np.newaxis, :]
+        return np.maximum(
+            self.time_models['x'].durations(x_distances),
+            self.time_models['y'].durations(y_distances)
+        )
+
+    def order(self, steps: List[WellStep]) -> List[int]:
+        """Return the indices of the steps in an order with short travel time.
+
+        The first step is one without prerequisites which comes first in the
+        list of steps, so that the route starts where the routine expects.
+
+        Raises:
+            ValueError: the prerequisites of the steps are circular.
+
+        """
+        if not steps:
+            return []
+        travel_times = self.travel_times(steps)
+        order = self._order_greedy(steps, travel_times)
+        self._improve_order(steps, travel_times, order)
+        return order
+
+    def travel_time(self, steps: List[WellStep], order: List[int]) -> float:
+        """Return the estimated travel time to visit the steps' wells in order."""
+        travel_times = self.travel_times(steps)
+        return float(sum(
+            travel_times[previous, next] for (previous, next) in zip(order, order[1:])
+        ))
+
+    def _order_greedy(self, steps: List[WellStep], travel_times: np.ndarray) -> List[int]:
+        """Order the steps by nearest available next step."""
+        remaining = set(range(len(steps)))
+        done = set()
+        order = []
+        while remaining:
+            available = [
+                index for index in sorted(remaining)
+                if all(prerequisite in done for prerequisite in steps[index].after)
+            ]
+            if not available:
+                raise ValueError('Well steps have circular prerequisites!')
+            if order:
+                next_index = min(
+                    available, key=lambda index: travel_times[order[-1], index]
+                )
+            else:
+                next_index = available[0]
+            order.append(next_index)
+            done.add(next_index)
+            remaining.remove(next_index)
+        return order
+
+    def _improve_order(
+        self, steps: List[WellStep], travel_times: np.ndarray, order: List[int]
+    ) -> None:
+        """Reverse segments of the order which shorten travel, in place."""
+        improved = True
+        while improved:
+            improved = False
+            for start in range(1, len(order) - 1):
+                for end in range(start + 1, len(order)):
+                    before = travel_times[order[start - 1], order[start]]
+                    after = 0.0
+                    if end + 1 < len(order):
+                        before += travel_times[order[end], order[end + 1]]
+                        after += travel_times[order[start], order[end + 1]]
+                    after += travel_times[order[start - 1], order[end]]
+                    if after + 1e-9 >= before:
+                        continue
+                    segment = set(order[start:end + 1])
+                    if any(
+                        prerequisite in segment
+                        for index in segment for prerequisite in steps[index].after
+                    ):
+                        continue
+                    order[start:end + 1] = reversed(order[start:end + 1])
+                    improved = True
+
+    async def run(self, steps: List[WellStep]) -> List[int]:
+        """Visit the steps' wells in an optimized order and perform their actions.
+
+        Returns the order in which the steps were performed.
+        """
+        order = self.order(steps)
+        logger.debug('Visiting wells in order {}.'.format(order))
+        for index in order:
+            step = steps[index]
+            (x_position, y_position) = step.well
+            await self.robot.go_to_module_position(step.module, x_position, y_position)
+            await step.action()
+        return order
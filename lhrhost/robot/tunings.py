@@ -0,0 +1,185 @@
+"""Indexing of localized controller tunings of robot axes."""
+
+# Standard imports
+import bisect
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+# Local package imports
+from lhrhost.protocol import CommandPipeline
+
+# External imports
+from async_generator import asynccontextmanager
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Type-checking names
+_Tuning = Dict[str, Any]
+
+
+class TuningIndex(object):
+    """Interval index of controller tunings localized to ranges of target positions.
+
+    Each tuning applies to the target sensor positions in its half-open range
+    [tuning['min'], tuning['max']). Ranges must be nonempty and may not
+    overlap, so that every target position has at most one tuning, which is
+    found by bisection.
+
+    Args:
+        tunings: the localized tunings, in any order.
+
+    Raises:
+        ValueError: a tuning's range is empty, or the ranges of two tunings
+            overlap.
+
+    """
+
+    def __init__(self, tunings: Iterable[_Tuning]=()):
+        """Initialize member variables."""
+        self.tunings = sorted(tunings, key=lambda tuning: tuning['min'])
+        self._mins = [tuning['min'] for tuning in self.tunings]
+        self._maxes = [tuning['max'] for tuning in self.tunings]
+        for (min, max) in zip(self._mins, self._maxes):
+            if min >= max:
+                raise ValueError(
+                    'Tuning for sensor positions [{}, {}) has an empty range!'
+                    .format(min, max)
+                )
+        for (previous, next) in zip(self.tunings, self.tunings[1:]):
+            if next['min'] < previous['max']:
+                raise ValueError(
+                    'Tunings for sensor positions [{}, {}) and [{}, {}) overlap!'
+                    .format(previous['min'], previous['max'], next['min'], next['max'])
+                )
+
+    def __len__(self):
+        """Return the number of localized tunings."""
+        return len(self.tunings)
+
+    def lookup(self, sensor_position) -> Optional[_Tuning]:
+        """Return the tuning for the target sensor position, or None if unspecified."""
+        index = bisect.bisect_right(self._mins, sensor_position) - 1
+        if index >= 0 and sensor_position < self._maxes[index]:
+            return self.tunings[index]
+        return None
+
+
+class TuningState(object):
+    """Tracks the controller tuning applied to an axis's peripheral.
+
+    A tuning is applied before a move by sending only the PID gains and motor
+    limits which differ from the peripheral's values, and it stays applied
+    after the move, so that consecutive moves only switch tunings when the
+    next target position needs a different tuning. Applying the active tuning
+    again sends nothing, unless the peripheral's values have changed since it
+    was applied, e.g. because the peripheral was reset. The peripheral's values
+    from before the first applied tuning are kept as the baseline, which is
+    restored when requested or when the outermost tuning scope exits.
+    Nothing is sent while the axis is in a dry run.
+
+    Args:
+        axis: the RobotAxis whose tuning is tracked.
+
+    Attributes:
+        active: the most recently applied tuning, or None if the baseline is
+            in effect.
+        pinned: the tuning to use for all moves in the innermost scope which
+            specified one, or None.
+        scopes: the number of open tuning scopes.
+        switches: the number of times a tuning or the baseline was sent.
+
+    """
+
+    def __init__(self, axis):
+        """Initialize member variables."""
+        self.axis = axis
+        self.active: Optional[_Tuning] = None
+        self.pinned: Optional[_Tuning] = None
+        self.scopes: int = 0
+        self.switches: int = 0
+        self._baseline = None
+        self._applied_values = None
+
+    async def apply(self, tuning: _Tuning) -> None:
+        """Switch the peripheral to the tuning, sending only changed values."""
+        if self.axis.dry_run is not None:
+            return
+        if tuning == self.active and self._peripheral_values() == self._applied_values:
+            return
+        if self._baseline is None:
+            self._baseline = self._peripheral_values()
+        motor_limits = tuning['limits']['motor']
+        async with CommandPipeline() as pipeline:
+            await self.axis.set_pid_gains(
+                kp=tuning['pid']['kp'], kd=tuning['pid']['kd'], pipeline=pipeline
+            )
+            await self.axis.set_motor_limits(
+                forwards_max=motor_limits['forwards']['max'],
+                forwards_min=motor_limits['forwards']['min'],
+                backwards_max=motor_limits['backwards']['max'],
+                backwards_min=motor_limits['backwards']['min'],
+                pipeline=pipeline
+            )
+            if len(pipeline):
+                self.switches += 1
+        self.active = tuning
+        self._applied_values = self._peripheral_values()
+
+    async def restore(self) -> None:
+        """Switch the peripheral back to its baseline values, if a tuning was applied."""
+        if self.axis.dry_run is not None or self._baseline is None:
+            return
+        (gains, limits) = self._baseline
+        async with CommandPipeline() as pipeline:
+            await self.axis.set_pid_gains(*gains, floating_point=False, pipeline=pipeline)
+            await self.axis.set_motor_limits(*limits, pipeline=pipeline)
+            if len(pipeline):
+                self.switches += 1
+        self._baseline = None
+        self.active = None
+        self._applied_values = None
+
+    @asynccontextmanager
+    async def scope(self, tuning: Optional[_Tuning]=None):
+        """Keep tunings applied across the moves in the block.
+
+        If a tuning is given, it is applied immediately and used for all moves
+        in the block instead of the tunings localized to their targets.
+        """
+        previous_pinned = self.pinned
+        if tuning is not None:
+            self.pinned = tuning
+        self.scopes += 1
+        try:
+            if tuning is not None:
+                await self.apply(tuning)
+            yield self
+        finally:
+            self.scopes -= 1
+            self.pinned = previous_pinned
+            if not self.scopes:
+                await self.restore()
+
+    def _peripheral_values(self):
+        """Return the PID gains and motor limits last received from the peripheral."""
+        feedback_controller = self.axis.protocol.feedback_controller
+        pid = feedback_controller.pid
+        motor_limits = feedback_controller.limits.motor
+
+        def negate(value):
+            return -value if value is not None else None
+
+        return (
+            (
+                pid.kp.last_response_payload, pid.kd.last_response_payload,
+                pid.ki.last_response_payload
+            ),
+            (
+                motor_limits.forwards.high.last_response_payload,
+                motor_limits.forwards.low.last_response_payload,
+                negate(motor_limits.backwards.high.last_response_payload),
+                negate(motor_limits.backwards.low.last_response_payload)
+            )
+        )
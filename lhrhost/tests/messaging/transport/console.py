@@ -67,7 +67,7 @@ def main(console_class):
         description='Send and receive transport-layer data with a command-line console.'
     )
     parser.add_argument(
-        'transport', choices=['ascii', 'firmata'],
+        'transport', choices=['ascii', 'firmata', 'virtual'],
         help='Transport-layer implementation.'
     )
     args = parser.parse_args()
@@ -75,6 +75,8 @@ def main(console_class):
         from lhrhost.messaging.transport.ascii import transport_loop
     elif args.transport == 'firmata':
         from lhrhost.messaging.transport.firmata import transport_loop
+    elif args.transport == 'virtual':
+        from lhrhost.messaging.transport.virtual import transport_loop
     else:
         raise NotImplementedError(
             'Unknown transport layer implementation: {}'.format(transport_loop)
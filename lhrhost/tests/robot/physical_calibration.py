@@ -11,6 +11,7 @@ from lhrhost.messaging import (
     MessagingStack,
     add_argparser_transport_selector, parse_argparser_transport_selector
 )
+from lhrhost.robot.calibration import CALIBRATION_MODELS
 from lhrhost.tests.messaging.transport.batch import (
     BatchExecutionManager, LOGGING_CONFIG
 )
@@ -25,8 +26,9 @@ logging.config.dictConfig(LOGGING_CONFIG)
 class Batch():
     """Actor-based batch execution."""
 
-    def __init__(self, transport_loop, axis):
+    def __init__(self, transport_loop, axis, model='linear'):
         """Initialize member variables."""
+        self.model = model
         self.messaging_stack = MessagingStack(transport_loop)
         if axis == 'p':
             from lhrhost.robot.p_axis import Axis
@@ -77,16 +79,20 @@ class Batch():
             calibration_samples.append((sensor_position, physical_position))
 
         print(
-            'Performing linear regression with {} samples...'
-            .format(len(calibration_samples))
+            'Fitting {} calibration with {} samples...'
+            .format(self.model, len(calibration_samples))
         )
         for calibration_sample in calibration_samples:
             self.axis.add_calibration_sample(*calibration_sample)
-        linear_regression = self.axis.fit_calibration_linear()
-        print(
-            'Linreg slope: {:.4f}; intercept: {:.4f}; R-value: {:.4f}; stderr: {:.4f}'
-            .format(*linear_regression)
-        )
+        if self.model == 'linear':
+            linear_regression = self.axis.fit_calibration_linear()
+            print(
+                'Linreg slope: {:.4f}; intercept: {:.4f}; R-value: {:.4f}; stderr: {:.4f}'
+                .format(*linear_regression)
+            )
+        else:
+            parameters = self.axis.fit_calibration(CALIBRATION_MODELS[self.model]())
+            print('Calibration parameters: {}'.format(parameters))
 
         output_path = await self.prompt.string(
             'Save calibration data to path:',
@@ -108,9 +114,13 @@ def main():
         'axis', choices=['p', 'z', 'y', 'x'],
         help='Linear actuator axis.'
     )
+    parser.add_argument(
+        '--model', choices=sorted(CALIBRATION_MODELS.keys()), default='linear',
+        help='Calibration model to fit.'
+    )
     args = parser.parse_args()
     transport_loop = parse_argparser_transport_selector(args)
-    batch = Batch(transport_loop, args.axis)
+    batch = Batch(transport_loop, args.axis, args.model)
     batch.messaging_stack.run()
 
 
@@ -3,6 +3,7 @@
 # Standard imports
 import argparse
 import asyncio
+import functools
 import logging
 
 # Local package imports
@@ -11,6 +12,7 @@ from lhrhost.messaging import (
     add_argparser_transport_selector, parse_argparser_transport_selector
 )
 from lhrhost.robot import Robot
+from lhrhost.robot.scheduling import WellStep, WellVisitPlanner
 from lhrhost.tests.messaging.transport.batch import (
     BatchExecutionManager, LOGGING_CONFIG
 )
@@ -77,18 +79,23 @@ class Batch:
         await self.robot.intake('cuvettes', volume=volume, height='high')
 
     async def distribute_water(self, columns, rows, volume):
-        """Distribute water to wells."""
-        for column in columns:
-            for row in rows:
-                await self.robot.go_to_module_position('plate', column, row)
-                await self.robot.dispense('plate', volume=volume, height='mid')
+        """Distribute water to wells, in the order with the shortest travel."""
+        dispense = functools.partial(
+            self.robot.dispense, 'plate', volume=volume, height='mid'
+        )
+        steps = [
+            WellStep('plate', (column, row), dispense)
+            for column in columns for row in rows
+        ]
+        await WellVisitPlanner(self.robot).run(steps)
 
     async def dilute(self, column, row, height, volume, mix_cycles):
         """Dilute food coloring in a well."""
         await self.robot.go_to_module_position('plate', column, row)
-        for i in range(mix_cycles):
-            await self.robot.dispense('plate', height=height)
-            await self.robot.intake('plate', volume=volume, height=height)
+        async with self.robot.z.tuning(), self.robot.p.tuning():
+            for i in range(mix_cycles):
+                await self.robot.dispense('plate', height=height)
+                await self.robot.intake('plate', volume=volume, height=height)
 
     async def dispense_waste(self):
         """Dispense any leftover liquid in the pipettor."""
@@ -0,0 +1 @@
+"""Various tests for virtual peripheral modules."""
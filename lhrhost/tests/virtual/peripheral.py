@@ -0,0 +1,47 @@
+"""Shows some basic examples for virtual.VirtualPeripheral."""
+
+# Standard imports
+import asyncio
+
+# Local package imports
+from lhrhost.messaging.transport import SerializedMessagePrinter
+from lhrhost.virtual import VirtualPeripheral
+
+
+async def send(peripheral, serialized_message):
+    """Send a message to the peripheral and run one update of the simulation."""
+    print(serialized_message)
+    await peripheral.on_serialized_message(serialized_message)
+    peripheral.update()
+    await peripheral.flush()
+
+
+async def main():
+    """Run some tests of VirtualPeripheral."""
+    peripheral = VirtualPeripheral(
+        time_scale=0, serialized_message_receivers=[
+            SerializedMessagePrinter(prefix='\t')
+        ]
+    )
+    peripheral.connect()
+    await peripheral.flush()
+    messages = [
+        '<v>()', '<e>(42)', '<e>()',
+        '<z>()', '<zp>()', '<zm>()', '<zfpp>()', '<zfpp>(1200)', '<zflmfh>()',
+        '<zpnc>(0)', '<zpni>(100)', '<zpnn>(3)', '<zpn>(2)',
+        '<zf>(500)'
+    ]
+    for message in messages:
+        await send(peripheral, message)
+    while peripheral.axes['z'].state == 2:
+        peripheral.update()
+        await peripheral.flush()
+    assert abs(peripheral.axes['z'].position - 500) < 20
+    assert peripheral.axes['z'].kp == 1200
+    await send(peripheral, '<r>(1)')
+    assert peripheral.reset_requested
+
+
+if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
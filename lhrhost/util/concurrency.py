@@ -1,7 +1,10 @@
 """Various utilities for concurrency."""
 
 # Standard imports
+import asyncio
 from abc import abstractmethod
+from collections import deque
+from typing import Any, Deque
 
 # Local package imports
 from lhrhost.util.interfaces import InterfaceClass
@@ -21,3 +24,86 @@ class Concurrent(object, metaclass=InterfaceClass):
     def stop(self):
         """Stop concurrent work without blocking on completion of work."""
         pass
+
+
+# Bounded streams
+
+DROP_OLDEST = 'drop oldest'
+DROP_NEWEST = 'drop newest'
+BLOCK = 'block'
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class BoundedStream(object):
+    """Asynchronous iterator over items put into a bounded queue.
+
+    When the queue is full, a new item is handled according to the overflow
+    policy: DROP_OLDEST discards the oldest queued item to make room,
+    DROP_NEWEST discards the new item, and BLOCK makes the producer wait until
+    the consumer makes room. Iteration stops once the stream is closed and
+    every queued item has been consumed.
+
+    Args:
+        max_size: the maximum number of queued items.
+        overflow: the overflow policy, one of OVERFLOW_POLICIES.
+
+    Attributes:
+        dropped (int): the number of items discarded because the queue was full.
+
+    """
+
+    def __init__(self, max_size: int=256, overflow: str=DROP_OLDEST):
+        """Initialize member variables."""
+        if max_size < 1:
+            raise ValueError('Stream size must be at least 1!')
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Unknown overflow policy {}!'.format(overflow))
+        self.max_size = max_size
+        self.overflow = overflow
+        self.dropped: int = 0
+        self.closed: bool = False
+        self._items: Deque[Any] = deque()
+        self._item_available = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._space_available.set()
+
+    def __len__(self):
+        """Return the number of queued items."""
+        return len(self._items)
+
+    async def put(self, item: Any) -> None:
+        """Queue an item for the consumer, following the overflow policy if full."""
+        if self.overflow == BLOCK:
+            while len(self._items) >= self.max_size and not self.closed:
+                self._space_available.clear()
+                await self._space_available.wait()
+        if self.closed:
+            return
+        if len(self._items) >= self.max_size:
+            self.dropped += 1
+            if self.overflow == DROP_NEWEST:
+                return
+            self._items.popleft()
+        self._items.append(item)
+        self._item_available.set()
+
+    def close(self) -> None:
+        """Stop accepting items, and end iteration once queued items are consumed."""
+        self.closed = True
+        self._item_available.set()
+        self._space_available.set()
+
+    def __aiter__(self):
+        """Return the asynchronous iterator."""
+        return self
+
+    async def __anext__(self) -> Any:
+        """Wait for and return the next queued item."""
+        while not self._items:
+            if self.closed:
+                raise StopAsyncIteration
+            self._item_available.clear()
+            await self._item_available.wait()
+        item = self._items.popleft()
+        self._space_available.set()
+        return item
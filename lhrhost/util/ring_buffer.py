@@ -0,0 +1,142 @@
+"""Lock-free ring buffer of records in memory shared between processes."""
+
+# Standard imports
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from typing import List, Optional
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Memory layout
+HEADER = struct.Struct('<QQ')  # write index, read index
+WRITE_INDEX_OFFSET = 0
+READ_INDEX_OFFSET = 8
+INDEX = struct.Struct('<Q')
+RECORD_LENGTH = struct.Struct('<H')
+SHARED_MEMORY_DIR = '/dev/shm'
+
+
+class SharedRingBuffer(object):
+    """Single-producer, single-consumer ring buffer of length-prefixed records.
+
+    The buffer is a memory-mapped file, so that a producer and a consumer in
+    different processes can open the same buffer by its path. The write index is
+    only ever updated by the producer, and the read index only by the consumer;
+    each index counts the bytes ever written or read, so no lock is needed.
+
+    Args:
+        path: the path of the buffer's file. Default: create a new file, which
+            is deleted by :meth:`close`.
+        capacity: the size of the buffer in bytes, if a new file is created.
+
+    Attributes:
+        path (str): the path of the buffer's file, for opening the buffer from
+            another process.
+        capacity (int): the size of the buffer in bytes.
+        overflows (int): the number of records which did not fit in the buffer.
+
+    """
+
+    def __init__(self, path: Optional[str]=None, capacity: int=65536):
+        """Initialize member variables."""
+        self._owner = path is None
+        if self._owner:
+            (fd, path) = tempfile.mkstemp(
+                prefix='lhrhost-ring-',
+                dir=SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+            )
+            os.ftruncate(fd, HEADER.size + capacity)
+        else:
+            fd = os.open(path, os.O_RDWR)
+            capacity = os.fstat(fd).st_size - HEADER.size
+        self.path: str = path
+        self.capacity: int = capacity
+        self.overflows: int = 0
+        self._memory = mmap.mmap(fd, HEADER.size + capacity)
+        os.close(fd)
+
+    def __getstate__(self):
+        """Return the path of the buffer, so that the buffer can be reopened."""
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        """Reopen the buffer at the pickled path."""
+        self.__init__(path=state['path'])
+
+    def close(self) -> None:
+        """Unmap the buffer, deleting its file if this buffer created it."""
+        if self._memory is None:
+            return
+        self._memory.close()
+        self._memory = None
+        if self._owner:
+            os.unlink(self.path)
+
+    @property
+    def write_index(self) -> int:
+        """Return the number of bytes ever written."""
+        return INDEX.unpack_from(self._memory, WRITE_INDEX_OFFSET)[0]
+
+    @property
+    def read_index(self) -> int:
+        """Return the number of bytes ever read."""
+        return INDEX.unpack_from(self._memory, READ_INDEX_OFFSET)[0]
+
+    @property
+    def size(self) -> int:
+        """Return the number of bytes waiting to be read."""
+        return self.write_index - self.read_index
+
+    def _copy_in(self, index: int, data: bytes) -> None:
+        """Copy data into the buffer at an index, wrapping around its end."""
+        start = HEADER.size + index % self.capacity
+        first = min(len(data), HEADER.size + self.capacity - start)
+        self._memory[start:start + first] = data[:first]
+        if first < len(data):
+            self._memory[HEADER.size:HEADER.size + len(data) - first] = data[first:]
+
+    def _copy_out(self, index: int, length: int) -> bytes:
+        """Copy data out of the buffer at an index, wrapping around its end."""
+        start = HEADER.size + index % self.capacity
+        first = min(length, HEADER.size + self.capacity - start)
+        data = self._memory[start:start + first]
+        if first < length:
+            data += self._memory[HEADER.size:HEADER.size + length - first]
+        return data
+
+    def write(self, record: bytes) -> bool:
+        """Append a record to the buffer, returning whether it fit.
+
+        Only the producer may call this.
+        """
+        write_index = self.write_index
+        framed_length = RECORD_LENGTH.size + len(record)
+        if write_index + framed_length - self.read_index > self.capacity:
+            self.overflows += 1
+            return False
+        self._copy_in(write_index, RECORD_LENGTH.pack(len(record)) + record)
+        INDEX.pack_into(self._memory, WRITE_INDEX_OFFSET, write_index + framed_length)
+        return True
+
+    def read_all(self) -> List[bytes]:
+        """Remove and return all records in the buffer.
+
+        Only the consumer may call this.
+        """
+        records = []
+        read_index = self.read_index
+        write_index = self.write_index
+        while read_index < write_index:
+            (length,) = RECORD_LENGTH.unpack(
+                self._copy_out(read_index, RECORD_LENGTH.size)
+            )
+            read_index += RECORD_LENGTH.size
+            records.append(self._copy_out(read_index, length))
+            read_index += length
+        INDEX.pack_into(self._memory, READ_INDEX_OFFSET, read_index)
+        return records
@@ -0,0 +1,116 @@
+"""Preallocated ring buffers of timestamped samples."""
+
+# Standard imports
+import logging
+from typing import Optional, Tuple
+
+# External imports
+import numpy as np
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Type-checking names
+_Window = Tuple[np.ndarray, np.ndarray]
+
+
+class TelemetryBuffer(object):
+    """Fixed-capacity ring buffer of timestamps and values in NumPy arrays.
+
+    Each sample is written twice, at its slot and at its slot plus the
+    capacity, so that the most recent samples always occupy a contiguous
+    range of the arrays. Windows of samples are therefore returned as views
+    into the arrays, in chronological order, without copying; a view is only
+    valid until the buffer wraps around it, so copy it to keep it longer.
+    Appending never allocates.
+
+    Args:
+        capacity: the maximum number of samples kept.
+
+    Attributes:
+        capacity (int): the maximum number of samples kept.
+        count (int): the number of samples ever appended.
+
+    """
+
+    def __init__(self, capacity: int=4096):
+        """Initialize member variables."""
+        if capacity < 1:
+            raise ValueError('Telemetry buffer capacity must be at least 1!')
+        self.capacity = capacity
+        self.count: int = 0
+        self._times = np.zeros(2 * capacity, dtype=np.float64)
+        self._values = np.zeros(2 * capacity, dtype=np.float64)
+
+    def __len__(self):
+        """Return the number of samples kept."""
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample, overwriting the oldest sample if the buffer is full."""
+        slot = self.count % self.capacity
+        self._times[slot] = timestamp
+        self._times[slot + self.capacity] = timestamp
+        self._values[slot] = value
+        self._values[slot + self.capacity] = value
+        self.count += 1
+
+    def clear(self) -> None:
+        """Discard all samples."""
+        self.count = 0
+
+    # Windowed views
+
+    def last(self, n: Optional[int]=None) -> _Window:
+        """Return views of the timestamps and values of the last n samples.
+
+        Default: all kept samples.
+        """
+        length = len(self)
+        if n is None or n > length:
+            n = length
+        end = self.count % self.capacity + self.capacity
+        return (self._times[end - n:end], self._values[end - n:end])
+
+    def between(self, start: float, end: Optional[float]=None) -> _Window:
+        """Return views of the samples with timestamps in [start, end).
+
+        Assumes samples were appended with nondecreasing timestamps.
+        """
+        (times, values) = self.last()
+        first = np.searchsorted(times, start, side='left')
+        last = len(times) if end is None else np.searchsorted(times, end, side='left')
+        return (times[first:last], values[first:last])
+
+    # Vectorized queries
+
+    @property
+    def last_sample(self) -> Optional[Tuple[float, float]]:
+        """Return the timestamp and value of the most recent sample, if any."""
+        if not self.count:
+            return None
+        slot = (self.count - 1) % self.capacity
+        return (float(self._times[slot]), float(self._values[slot]))
+
+    def mean(self, n: Optional[int]=None) -> Optional[float]:
+        """Return the mean of the last n values, or None if there are none."""
+        (_, values) = self.last(n)
+        if not len(values):
+            return None
+        return float(values.mean())
+
+    def slope(self, n: Optional[int]=None) -> Optional[float]:
+        """Return the least-squares rate of change of the last n values, per second.
+
+        Returns None if fewer than two samples, or only one distinct timestamp,
+        are available.
+        """
+        (times, values) = self.last(n)
+        if len(times) < 2:
+            return None
+        centered_times = times - times.mean()
+        variance = np.dot(centered_times, centered_times)
+        if variance == 0:
+            return None
+        return float(np.dot(centered_times, values - values.mean()) / variance)
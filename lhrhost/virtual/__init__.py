@@ -0,0 +1,7 @@
+"""Simulated peripherals for running the host without any connected hardware.
+
+The simulated peripherals speak the same messaging protocol as the Arduino
+firmware in `src/Protocol`, so that the host stack can be tested and benchmarked
+without a real robot.
+"""
+from lhrhost.virtual.peripheral import VirtualPeripheral
@@ -0,0 +1,77 @@
+"""Simulation of the core subset of the peripheral's protocol.
+
+Mirrors `src/Protocol/Core.tpp`.
+"""
+
+# Standard imports
+import logging
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Protocol parameters
+VERSION = (1, 1, 0)
+
+
+class Core(object):
+    """Simulated handler for Reset, Version, and Echo messages."""
+
+    def __init__(self, peripheral, version=VERSION):
+        """Initialize member variables."""
+        self.peripheral = peripheral
+        self.version = version
+        self.echo_value = 0
+
+    def on_connect(self):
+        """Send the messages which the firmware sends upon connection."""
+        self.send_all_version_messages()
+
+    def on_message(self, message):
+        """Handle a message if it is on a core channel."""
+        channel = message.channel
+        if channel == 'r':
+            self.handle_reset_command(message)
+        elif channel.startswith('v') and len(channel) <= 2:
+            self.handle_version_command(message)
+        elif channel == 'e':
+            self.handle_echo_command(message)
+
+    # Version
+
+    def send_version_message(self, version_position):
+        """Send the version component at the specified position."""
+        try:
+            position = int(version_position)
+        except ValueError:
+            return
+        if position < 0 or position >= len(self.version):
+            return
+        self.peripheral.send('v{}'.format(position), self.version[position])
+
+    def send_all_version_messages(self):
+        """Send every version component."""
+        for position in range(len(self.version)):
+            self.send_version_message(position)
+
+    # Message handlers
+
+    def handle_reset_command(self, message):
+        """Handle a Reset message."""
+        reset = message.payload == 1
+        self.peripheral.send('r', int(reset))
+        if reset:
+            self.peripheral.request_reset()
+
+    def handle_version_command(self, message):
+        """Handle a Version message."""
+        if len(message.channel) == 1:
+            self.send_all_version_messages()
+        else:
+            self.send_version_message(message.channel[1])
+
+    def handle_echo_command(self, message):
+        """Handle an Echo message."""
+        if message.payload is not None:
+            self.echo_value = message.payload
+        self.peripheral.send('e', self.echo_value)
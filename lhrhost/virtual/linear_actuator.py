@@ -0,0 +1,501 @@
+"""Simulation of the linear actuator subset of the peripheral's protocol.
+
+Mirrors `src/Protocol/LinearActuatorAxis.tpp`, with a simple kinematic model of
+the actuator in place of the real motor and position sensor: the actuator moves
+at a velocity proportional to its motor duty cycle, and its position feedback
+controller is purely proportional.
+"""
+
+# Standard imports
+import logging
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Protocol parameters
+FIXED_POINT_SCALING = 100
+
+# Notifier states
+NOTIFIER_SILENT = 0
+NOTIFIER_ITERATION_INTERVALS = 1
+NOTIFIER_TIME_INTERVALS = 2
+
+# Linear actuator states
+DIRECT_MOTOR_DUTY_IDLE = 0
+DIRECT_MOTOR_DUTY_CONTROL = 1
+POSITION_FEEDBACK_CONTROL = 2
+STALL_TIMEOUT_STOPPED = -1
+CONVERGENCE_TIMEOUT_STOPPED = -2
+TIMER_TIMEOUT_STOPPED = -3
+
+# Default parameters, from src/StandardLiquidHandlingRobot.h
+AXIS_PARAMS = {
+    'p': {
+        'min_position': 35, 'max_position': 1005,
+        'min_duty': -255, 'max_duty': 255,
+        'kp': 32.5, 'kd': 0.4, 'ki': 0, 'sample_interval': 10,
+        'brake_lower_threshold': -150, 'brake_upper_threshold': 150,
+        'motor_polarity': -1,
+        'convergence_timeout': 150, 'stall_timeout': 150, 'timer_timeout': 2000,
+        'initial_position': 35
+    },
+    'z': {
+        'min_position': 20, 'max_position': 970,
+        'min_duty': -120, 'max_duty': 200,
+        'kp': 10, 'kd': 0.08, 'ki': 0, 'sample_interval': 10,
+        'brake_lower_threshold': -50, 'brake_upper_threshold': 110,
+        'motor_polarity': 1,
+        'convergence_timeout': 150, 'stall_timeout': 150, 'timer_timeout': 2000,
+        'initial_position': 970
+    },
+    'y': {
+        'min_position': 0, 'max_position': 1008,
+        'min_duty': -90, 'max_duty': 90,
+        'kp': 30, 'kd': 2, 'ki': 0, 'sample_interval': 10,
+        'brake_lower_threshold': -80, 'brake_upper_threshold': 80,
+        'motor_polarity': -1,
+        'convergence_timeout': 150, 'stall_timeout': 150, 'timer_timeout': 5000,
+        'initial_position': 0
+    },
+    'x': {
+        'min_position': 0, 'max_position': 1445,
+        'min_duty': -120, 'max_duty': 120,
+        'kp': 40, 'kd': 1.5, 'ki': 0, 'sample_interval': 10,
+        'brake_lower_threshold': -110, 'brake_upper_threshold': 110,
+        'motor_polarity': -1,
+        'convergence_timeout': 150, 'stall_timeout': 150, 'timer_timeout': 10000,
+        'initial_position': 0
+    }
+}
+
+
+class Notifier(object):
+    """Simulated notifier which periodically sends the value of a signal."""
+
+    def __init__(self, axis, signal_channel, get_signal):
+        """Initialize member variables."""
+        self.axis = axis
+        self.signal_channel = signal_channel
+        self.get_signal = get_signal
+        self.state = NOTIFIER_SILENT
+        self.change_only = True
+        self.number = -1
+        self.interval = 1
+        self._prev_signal = 0
+        self._iteration = 0
+        self._last_notify_time = 0
+
+    @property
+    def channel(self):
+        """Return the channel of the notified signal."""
+        return '{}{}'.format(self.axis.axis_channel, self.signal_channel)
+
+    def on_message(self, message, channel_remainder):
+        """Handle a message on the notifier's Notify channel or its children."""
+        payload = message.payload
+        if channel_remainder == '':  # parsed as: _*n
+            if payload == NOTIFIER_SILENT:
+                self.state = NOTIFIER_SILENT
+            elif payload in (NOTIFIER_ITERATION_INTERVALS, NOTIFIER_TIME_INTERVALS):
+                self.state = payload
+                if self.change_only:
+                    self._prev_signal = self.get_signal() - 1
+            self.axis.send_response(message, self.state)
+        elif channel_remainder == 'i':  # parsed as: _*ni
+            if payload is not None and payload > 0:
+                self.interval = payload
+            self.axis.send_response(message, self.interval)
+        elif channel_remainder == 'c':  # parsed as: _*nc
+            if payload == 1:
+                self.change_only = True
+            elif payload == 0:
+                self.change_only = False
+            self.axis.send_response(message, int(self.change_only))
+        elif channel_remainder == 'n':  # parsed as: _*nn
+            if payload is not None:
+                self.number = payload
+            self.axis.send_response(message, self.number)
+
+    def update(self, millis):
+        """Send a notification if one is due."""
+        if self.state == NOTIFIER_ITERATION_INTERVALS:
+            self._iteration = (self._iteration + 1) % self.interval
+            if self._iteration != 0:
+                return
+        elif self.state == NOTIFIER_TIME_INTERVALS:
+            if millis - self._last_notify_time < self.interval:
+                return
+            self._last_notify_time = millis
+        else:
+            return
+
+        signal = self.get_signal()
+        if self.change_only and signal == self._prev_signal:
+            return
+        self._prev_signal = signal
+
+        if self.number == 0:
+            self.number = -1
+            self.axis.peripheral.send('{}nn'.format(self.channel), self.number)
+            self.state = NOTIFIER_SILENT
+            self.axis.peripheral.send('{}n'.format(self.channel), self.state)
+            return
+        self.notify()
+        if self.number > 0:
+            self.number -= 1
+
+    def notify(self):
+        """Send the value of the signal."""
+        self.axis.peripheral.send(self.channel, self.get_signal())
+
+
+class LinearActuatorAxis(object):
+    """Simulated linear actuator axis with position feedback control."""
+
+    def __init__(
+        self, peripheral, axis_channel,
+        min_position=0, max_position=1023, min_duty=-255, max_duty=255,
+        kp=10, kd=0, ki=0, sample_interval=10,
+        brake_lower_threshold=-100, brake_upper_threshold=100, motor_polarity=1,
+        convergence_timeout=150, stall_timeout=150, timer_timeout=0,
+        initial_position=None, max_speed=1.0
+    ):
+        """Initialize member variables.
+
+        Args:
+            max_speed: the speed of the actuator at full motor duty, in sensor
+                position units per millisecond.
+        """
+        self.peripheral = peripheral
+        self.axis_channel = axis_channel
+        # Physical model
+        self.travel_low = min_position
+        self.travel_high = max_position
+        self.max_speed = max_speed
+        self._position = float(
+            initial_position if initial_position is not None else min_position
+        )
+        # Feedback controller parameters
+        self.position_limit_low = min_position
+        self.position_limit_high = max_position
+        self.duty_limit_low = min_duty
+        self.duty_limit_high = max_duty
+        self.brake_lower_threshold = brake_lower_threshold
+        self.brake_upper_threshold = brake_upper_threshold
+        self.kp = int(kp * FIXED_POINT_SCALING)
+        self.kd = int(kd * FIXED_POINT_SCALING)
+        self.ki = int(ki * FIXED_POINT_SCALING)
+        self.sample_interval = sample_interval
+        self.setpoint = int(self._position)
+        # Motor parameters
+        self.motor_polarity = motor_polarity
+        self.duty = 0
+        # Stopping conditions
+        self.convergence_timeout = convergence_timeout
+        self.stall_timeout = stall_timeout
+        self.timer_timeout = timer_timeout
+        # State
+        self.state = DIRECT_MOTOR_DUTY_IDLE
+        self.allow_notifications = False
+        self._state_changed_at = 0
+        self._setpoint_changed_at = 0
+        self._braking_since = None
+        self._moving_since = None
+        self._position_changed_at = 0
+        # Notifiers
+        self.position_notifier = Notifier(self, 'p', lambda: self.position)
+        self.motor_notifier = Notifier(self, 'm', lambda: self.duty)
+
+    @property
+    def position(self):
+        """Return the current sensor position, as the firmware would report it."""
+        return int(round(self._position))
+
+    def send_response(self, message, payload):
+        """Respond on the channel of the received message."""
+        self.peripheral.send(message.channel, payload)
+
+    def on_connect(self):
+        """Send the messages which the firmware sends upon connection."""
+        self.allow_notifications = True
+        self.notify_state()
+        self.notify_position()
+        self.notify_motor()
+
+    # Notifications
+
+    def notify_state(self):
+        """Send the state of the axis."""
+        if self.allow_notifications:
+            self.peripheral.send(self.axis_channel, self.state)
+
+    def notify_position(self):
+        """Send the position of the axis."""
+        if self.allow_notifications:
+            self.peripheral.send('{}p'.format(self.axis_channel), self.position)
+
+    def notify_smoothed_position(self):
+        """Send the smoothed position of the axis."""
+        if self.allow_notifications:
+            self.peripheral.send('{}s'.format(self.axis_channel), self.position)
+
+    def notify_motor(self):
+        """Send the motor duty of the axis."""
+        if self.allow_notifications:
+            self.peripheral.send('{}m'.format(self.axis_channel), self.duty)
+
+    def notify_feedback_controller_setpoint(self):
+        """Send the feedback controller setpoint of the axis."""
+        if self.allow_notifications:
+            self.peripheral.send('{}f'.format(self.axis_channel), self.setpoint)
+
+    # Control
+
+    def _set_state(self, state, millis):
+        self.state = state
+        self._state_changed_at = millis
+
+    def start_position_feedback_control(self, setpoint, millis):
+        """Start moving to the setpoint."""
+        self.setpoint = min(
+            max(setpoint, self.position_limit_low), self.position_limit_high
+        )
+        self._setpoint_changed_at = millis
+        self._braking_since = None
+        self._moving_since = None
+        self._set_state(POSITION_FEEDBACK_CONTROL, millis)
+        self.notify_feedback_controller_setpoint()
+        self.notify_state()
+
+    def start_direct_motor_duty_control(self, duty, millis):
+        """Start running the motor at the specified duty."""
+        self._set_state(
+            DIRECT_MOTOR_DUTY_IDLE if duty == 0 else DIRECT_MOTOR_DUTY_CONTROL, millis
+        )
+        self.duty = min(max(duty, -255), 255)
+        self.notify_motor()
+        self.notify_state()
+
+    def end_control(self, next_state, millis):
+        """Stop the motor and report the final state."""
+        self.duty = 0
+        self.notify_position()
+        if self.state == DIRECT_MOTOR_DUTY_CONTROL:
+            self.notify_motor()
+        elif self.state == POSITION_FEEDBACK_CONTROL:
+            self.notify_feedback_controller_setpoint()
+        self._set_state(next_state, millis)
+        self.notify_state()
+
+    def _settled(self, since, timeout, millis):
+        return since is not None and millis - since >= timeout
+
+    def converged(self, millis):
+        """Return whether the feedback controller has converged."""
+        return (
+            self.convergence_timeout > 0 and
+            self.state == POSITION_FEEDBACK_CONTROL and
+            self._settled(self._state_changed_at, self.convergence_timeout, millis) and
+            self._settled(self._setpoint_changed_at, self.convergence_timeout, millis) and
+            self._settled(self._braking_since, self.convergence_timeout, millis)
+        )
+
+    def stalled(self, millis):
+        """Return whether the motor is running without moving the actuator."""
+        if self.stall_timeout <= 0:
+            return False
+        if not self._settled(self._state_changed_at, self.stall_timeout, millis):
+            return False
+        if self.state == DIRECT_MOTOR_DUTY_CONTROL:
+            running = self.duty != 0
+        elif self.state == POSITION_FEEDBACK_CONTROL:
+            running = (
+                self._settled(self._setpoint_changed_at, self.stall_timeout, millis) and
+                self._settled(self._moving_since, self.stall_timeout, millis)
+            )
+        else:
+            running = False
+        return running and self._settled(
+            self._position_changed_at, self.stall_timeout, millis
+        )
+
+    def timed(self, millis):
+        """Return whether the control timer has run out."""
+        return (
+            self.timer_timeout > 0 and
+            self._settled(self._state_changed_at, self.timer_timeout, millis)
+        )
+
+    def _update_feedback_controller(self, millis):
+        """Compute the motor duty from the position error."""
+        output = self.kp * (self.setpoint - self._position) / FIXED_POINT_SCALING
+        if self.brake_lower_threshold < output < self.brake_upper_threshold:
+            self.duty = 0
+            if self._braking_since is None:
+                self._braking_since = millis
+            self._moving_since = None
+        else:
+            self.duty = int(min(max(output, self.duty_limit_low), self.duty_limit_high))
+            if self._moving_since is None:
+                self._moving_since = millis
+            self._braking_since = None
+
+    def update(self, millis, interval):
+        """Advance the simulation of the axis by the specified interval."""
+        if self.state == POSITION_FEEDBACK_CONTROL:
+            self._update_feedback_controller(millis)
+        elif self.state != DIRECT_MOTOR_DUTY_CONTROL:
+            self.duty = 0
+        previous_position = self.position
+        self._position += self.duty / 255 * self.max_speed * interval
+        self._position = min(max(self._position, self.travel_low), self.travel_high)
+        if self.position != previous_position:
+            self._position_changed_at = millis
+
+        self.position_notifier.update(millis)
+        self.motor_notifier.update(millis)
+
+        if self.state == DIRECT_MOTOR_DUTY_CONTROL:
+            if self.stalled(millis):
+                self.end_control(STALL_TIMEOUT_STOPPED, millis)
+            elif self.timed(millis):
+                self.end_control(TIMER_TIMEOUT_STOPPED, millis)
+        elif self.state == POSITION_FEEDBACK_CONTROL:
+            if self.converged(millis):
+                self.end_control(CONVERGENCE_TIMEOUT_STOPPED, millis)
+            elif self.stalled(millis):
+                self.end_control(STALL_TIMEOUT_STOPPED, millis)
+            elif self.timed(millis):
+                self.end_control(TIMER_TIMEOUT_STOPPED, millis)
+
+    # Message handlers
+
+    def on_message(self, message, millis):
+        """Handle a message if it is on the axis's channel."""
+        channel = message.channel
+        if not channel.startswith(self.axis_channel):
+            return
+        remainder = channel[len(self.axis_channel):]
+        if remainder == '':  # parsed as: _
+            self.send_response(message, self.state)
+        elif remainder.startswith('p'):
+            self.on_position_message(message, remainder[1:])
+        elif remainder.startswith('s'):
+            self.on_smoothed_position_message(message, remainder[1:])
+        elif remainder.startswith('m'):
+            self.on_motor_message(message, remainder[1:], millis)
+        elif remainder.startswith('f'):
+            self.on_feedback_controller_message(message, remainder[1:], millis)
+
+    def on_position_message(self, message, remainder):
+        """Handle a message on the LinearActuator/Position channel or its children."""
+        if remainder == '':  # parsed as: _p
+            self.notify_position()
+        elif remainder.startswith('n'):  # parsed as: _pn
+            self.position_notifier.on_message(message, remainder[1:])
+
+    def on_smoothed_position_message(self, message, remainder):
+        """Handle a message on the LA/SmoothedPosition channel or its children."""
+        if remainder == '':  # parsed as: _s
+            self.notify_smoothed_position()
+
+    def on_motor_message(self, message, remainder, millis):
+        """Handle a message on the LinearActuator/Motor channel or its children."""
+        payload = message.payload
+        if remainder == '':  # parsed as: _m
+            if payload is not None:
+                self.start_direct_motor_duty_control(payload, millis)
+            else:
+                self.notify_motor()
+        elif remainder.startswith('n'):  # parsed as: _mn
+            self.motor_notifier.on_message(message, remainder[1:])
+        elif remainder == 's':  # parsed as: _ms
+            if payload is not None and payload >= 0:
+                self.stall_timeout = payload
+            self.send_response(message, self.stall_timeout)
+        elif remainder == 't':  # parsed as: _mt
+            if payload is not None and payload >= 0:
+                self.timer_timeout = payload
+            self.send_response(message, self.timer_timeout)
+        elif remainder == 'p':  # parsed as: _mp
+            if payload in (-1, 1):
+                self.motor_polarity = payload
+            self.send_response(message, self.motor_polarity)
+
+    def on_feedback_controller_message(self, message, remainder, millis):
+        """Handle a message on the LA/FeedbackController channel or its children."""
+        payload = message.payload
+        if remainder == '':  # parsed as: _f
+            if payload is not None:
+                self.start_position_feedback_control(payload, millis)
+            else:
+                self.notify_feedback_controller_setpoint()
+        elif remainder == 'c':  # parsed as: _fc
+            if payload is not None and payload >= 0:
+                self.convergence_timeout = payload
+            self.send_response(message, self.convergence_timeout)
+        elif remainder.startswith('l'):  # parsed as: _fl
+            self.on_feedback_controller_limits_message(message, remainder[1:])
+        elif remainder.startswith('p'):  # parsed as: _fp
+            self.on_feedback_controller_pid_message(message, remainder[1:])
+
+    def on_feedback_controller_limits_message(self, message, remainder):
+        """Handle a message on the LA/FC/Limits channel or its children."""
+        payload = message.payload
+        if remainder == 'pl':  # parsed as: _flpl
+            if payload is not None and payload <= self.position_limit_high:
+                self.position_limit_low = payload
+            self.send_response(message, self.position_limit_low)
+        elif remainder == 'ph':  # parsed as: _flph
+            if payload is not None and payload >= self.position_limit_low:
+                self.position_limit_high = payload
+            self.send_response(message, self.position_limit_high)
+        elif remainder == 'mfh':  # parsed as: _flmfh
+            if (
+                payload is not None and
+                self.brake_upper_threshold <= payload <= 255
+            ):
+                self.duty_limit_high = payload
+            self.send_response(message, self.duty_limit_high)
+        elif remainder == 'mfl':  # parsed as: _flmfl
+            if (
+                payload is not None and
+                self.brake_lower_threshold <= payload <= self.duty_limit_high
+            ):
+                self.brake_upper_threshold = payload
+            self.send_response(message, self.brake_upper_threshold)
+        elif remainder == 'mbl':  # parsed as: _flmbl
+            if (
+                payload is not None and
+                self.duty_limit_low <= payload <= self.brake_upper_threshold
+            ):
+                self.brake_lower_threshold = payload
+            self.send_response(message, self.brake_lower_threshold)
+        elif remainder == 'mbh':  # parsed as: _flmbh
+            if (
+                payload is not None and
+                -255 <= payload <= self.brake_lower_threshold
+            ):
+                self.duty_limit_low = payload
+            self.send_response(message, self.duty_limit_low)
+
+    def on_feedback_controller_pid_message(self, message, remainder):
+        """Handle a message on the LA/FC/PID channel or its children."""
+        payload = message.payload
+        if remainder == 'p':  # parsed as: _fpp
+            if payload is not None:
+                self.kp = payload
+            self.send_response(message, self.kp)
+        elif remainder == 'd':  # parsed as: _fpd
+            if payload is not None:
+                self.kd = payload
+            self.send_response(message, self.kd)
+        elif remainder == 'i':  # parsed as: _fpi
+            if payload is not None:
+                self.ki = payload
+            self.send_response(message, self.ki)
+        elif remainder == 's':  # parsed as: _fps
+            if payload is not None and payload > 0:
+                self.sample_interval = payload
+            self.send_response(message, self.sample_interval)
@@ -0,0 +1,141 @@
+"""Simulated peripheral with the standard set of robot axes.
+
+Mirrors the firmware sketches in `examples/*/pzyxRobot`.
+"""
+
+# Standard imports
+import asyncio
+import logging
+from collections import deque
+from typing import Iterable, List, Optional
+
+# Local package imports
+from lhrhost.messaging.presentation import (
+    BasicTranslator, InvalidSerializationError, Message
+)
+from lhrhost.messaging.transport import SerializedMessageReceiver
+from lhrhost.virtual.core import Core
+from lhrhost.virtual.linear_actuator import AXIS_PARAMS, LinearActuatorAxis
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Type-checking names
+_SerializedMessageReceivers = Iterable[SerializedMessageReceiver]
+
+
+class VirtualPeripheral(SerializedMessageReceiver):
+    """Simulated peripheral which handles serialized messages like the firmware.
+
+    Serialized messages from the host are received with
+    :meth:`on_serialized_message` and handled on the next update of the
+    simulation; serialized messages from the peripheral are forwarded to
+    :attr:`serialized_message_receivers`.
+
+    Args:
+        axes: the channels of the linear actuator axes to simulate.
+        update_interval: the simulated duration of each update, in ms.
+        time_scale: the real duration of each simulated second, in seconds.
+            A time scale of 1 runs the simulation in real time; a time scale of
+            0 runs the simulation as fast as possible.
+        axis_params: a dict, keyed by axis channel, of parameter overrides for
+            :class:`lhrhost.virtual.linear_actuator.LinearActuatorAxis`.
+
+    """
+
+    def __init__(
+        self, axes: str='pzyx', update_interval: float=10, time_scale: float=1.0,
+        axis_params: Optional[dict]=None,
+        serialized_message_receivers: Optional[_SerializedMessageReceivers]=None
+    ):
+        """Initialize member variables."""
+        self.serialized_message_receivers: List[SerializedMessageReceiver] = []
+        if serialized_message_receivers:
+            self.serialized_message_receivers = [
+                receiver for receiver in serialized_message_receivers
+            ]
+        self.translator = BasicTranslator()
+        self.update_interval = update_interval
+        self.time_scale = time_scale
+        self._axes = axes
+        self._axis_params = axis_params if axis_params is not None else {}
+        self._received = deque()
+        self._outbox = []
+        self.reset()
+
+    def reset(self) -> None:
+        """Restore the power-on state of the peripheral."""
+        self.millis = 0
+        self.connected = False
+        self.reset_requested = False
+        self._received.clear()
+        self._outbox = []
+        self.core = Core(self)
+        self.axes = {}
+        for axis_channel in self._axes:
+            params = dict(AXIS_PARAMS.get(axis_channel, {}))
+            params.update(self._axis_params.get(axis_channel, {}))
+            self.axes[axis_channel] = LinearActuatorAxis(self, axis_channel, **params)
+
+    def connect(self) -> None:
+        """Send the messages which the firmware sends upon connection."""
+        self.connected = True
+        self.core.on_connect()
+        for axis in self.axes.values():
+            axis.on_connect()
+
+    def request_reset(self) -> None:
+        """Schedule a hard reset after the current update."""
+        self.reset_requested = True
+
+    def send(self, channel: str, payload: Optional[int]=None) -> None:
+        """Queue a message to be sent at the end of the current update."""
+        self._outbox.append(self.translator.serialize(Message(channel, payload)))
+
+    def update(self) -> None:
+        """Advance the simulation by one update interval."""
+        while self._received:
+            serialized_message = self._received.popleft()
+            try:
+                message = self.translator.deserialize(serialized_message)
+            except InvalidSerializationError:
+                logger.warning(
+                    'Ignoring malformed message {}'.format(serialized_message)
+                )
+                continue
+            self.core.on_message(message)
+            for axis in self.axes.values():
+                axis.on_message(message, self.millis)
+        self.millis += self.update_interval
+        for axis in self.axes.values():
+            axis.update(self.millis, self.update_interval)
+
+    async def flush(self) -> None:
+        """Send all queued messages to the receivers."""
+        (outbox, self._outbox) = (self._outbox, [])
+        for serialized_message in outbox:
+            await asyncio.gather(*[
+                receiver.on_serialized_message(serialized_message)
+                for receiver in self.serialized_message_receivers
+            ])
+
+    async def run(self) -> None:
+        """Endlessly run the simulation.
+
+        Raises ConnectionResetError after the peripheral is reset, the way a
+        real peripheral drops its connection.
+        """
+        while True:
+            await self.flush()
+            if self.reset_requested:
+                self.reset()
+                raise ConnectionResetError
+            await asyncio.sleep(self.update_interval / 1000 * self.time_scale)
+            self.update()
+
+    # Implement SerializedMessageReceiver
+
+    async def on_serialized_message(self, serialized_message: str) -> None:
+        """Receive a serialized message from the host."""
+        self._received.append(serialized_message)
@@ -0,0 +1,187 @@
+"""Exposure of a simulated peripheral as a serial device on a pseudoterminal.
+
+This allows the ASCII transport layer, including its serial I/O, to be run
+against a simulated peripheral: pass the pseudoterminal's port to
+:class:`lhrhost.messaging.transport.ascii.TransportConnectionManager`.
+"""
+
+# Standard imports
+import argparse
+import asyncio
+import logging
+import os
+import tty
+from typing import Optional
+
+# Local package imports
+from lhrhost.messaging.transport import HANDSHAKE_RX_CHAR, SerializedMessageReceiver
+from lhrhost.messaging.transport.framing import BINARY_FRAMING_REQUEST, BinaryFraming
+from lhrhost.virtual.peripheral import VirtualPeripheral
+
+# Logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Protocol parameters
+LINE_SUFFIX = b'\n'
+PRINTLN_SUFFIX = '\r\n'
+
+
+class PseudoTerminal(SerializedMessageReceiver):
+    """Serves a simulated peripheral over the ASCII transport protocol on a pty.
+
+    Args:
+        peripheral: the simulated peripheral to serve. Default: a new
+            :class:`lhrhost.virtual.VirtualPeripheral` constructed from
+            `peripheral_kwargs`.
+        handshake_interval: interval in seconds between handshake characters
+            sent while waiting for the host to respond.
+        binary_framing: whether to accept requests from the host for binary
+            framing of messages.
+
+    """
+
+    def __init__(
+        self, peripheral: Optional[VirtualPeripheral]=None,
+        handshake_interval: float=0.2, binary_framing: bool=True, loop=None,
+        **peripheral_kwargs
+    ):
+        """Initialize member variables."""
+        self.peripheral: VirtualPeripheral = (
+            peripheral if peripheral is not None
+            else VirtualPeripheral(**peripheral_kwargs)
+        )
+        self.handshake_interval = handshake_interval
+        self.binary_framing_supported = binary_framing
+        self.binary_framing: Optional[BinaryFraming] = None
+        self.loop: asyncio.AbstractEventLoop = (
+            loop if loop is not None else asyncio.get_event_loop()
+        )
+        self.port: Optional[str] = None
+        self._master_fd = None
+        self._slave_fd = None
+        self._buffer = bytearray()
+        self._data_received = asyncio.Event()
+
+    def open(self) -> str:
+        """Open the pseudoterminal and return the port of its serial device."""
+        (self._master_fd, self._slave_fd) = os.openpty()
+        tty.setraw(self._slave_fd)
+        self.port = os.ttyname(self._slave_fd)
+        self.loop.add_reader(self._master_fd, self._on_readable)
+        logger.info('Serving virtual peripheral on {}'.format(self.port))
+        return self.port
+
+    def close(self) -> None:
+        """Close the pseudoterminal."""
+        if self._master_fd is None:
+            return
+        self.loop.remove_reader(self._master_fd)
+        os.close(self._master_fd)
+        os.close(self._slave_fd)
+        self._master_fd = None
+        self._slave_fd = None
+        self.port = None
+
+    def _on_readable(self) -> None:
+        """Buffer data written by the host."""
+        self._buffer.extend(os.read(self._master_fd, 4096))
+        self._data_received.set()
+
+    def _write(self, data: str) -> None:
+        """Write data to the host."""
+        os.write(self._master_fd, data.encode('utf-8'))
+
+    async def _read_line(self) -> bytes:
+        """Return the next line written by the host."""
+        while LINE_SUFFIX not in self._buffer:
+            self._data_received.clear()
+            await self._data_received.wait()
+        (line, _, remainder) = self._buffer.partition(LINE_SUFFIX)
+        self._buffer = bytearray(remainder)
+        return bytes(line)
+
+    async def _establish_handshake(self) -> None:
+        """Perform the peripheral's side of the ASCII transport handshake."""
+        self._buffer.clear()
+        self.binary_framing = None
+        while not self._buffer:
+            self._write(HANDSHAKE_RX_CHAR + PRINTLN_SUFFIX)
+            await asyncio.sleep(self.handshake_interval)
+        line = (await self._read_line()).strip().decode()
+        if self.binary_framing_supported and line == BINARY_FRAMING_REQUEST:
+            self._write(BINARY_FRAMING_REQUEST + PRINTLN_SUFFIX)
+            self.binary_framing = BinaryFraming()
+        else:
+            self._write(PRINTLN_SUFFIX)
+        logger.debug('Completed handshake!')
+
+    async def _receive_lines(self) -> None:
+        """Endlessly forward messages from the host to the peripheral."""
+        while self.binary_framing is not None:
+            for serialized_message in self.binary_framing.decode(self._buffer):
+                await self.peripheral.on_serialized_message(serialized_message)
+            self._data_received.clear()
+            await self._data_received.wait()
+        while True:
+            line = (await self._read_line()).strip()
+            if line:
+                await self.peripheral.on_serialized_message(line.decode())
+
+    async def serve(self) -> None:
+        """Endlessly serve the peripheral, reconnecting whenever it is reset."""
+        if self._master_fd is None:
+            self.open()
+        self.peripheral.serialized_message_receivers = [self]
+        while True:
+            await self._establish_handshake()
+            self.peripheral.connect()
+            receive_task = self.loop.create_task(self._receive_lines())
+            try:
+                await self.peripheral.run()
+            except ConnectionResetError:
+                logger.info('Virtual peripheral was reset!')
+            finally:
+                receive_task.cancel()
+
+    # Implement SerializedMessageReceiver
+
+    async def on_serialized_message(self, serialized_message: str) -> None:
+        """Write a serialized message from the peripheral to the host."""
+        if self.binary_framing is not None:
+            os.write(self._master_fd, self.binary_framing.encode(serialized_message))
+        else:
+            self._write(serialized_message + LINE_SUFFIX.decode())
+
+
+def main():
+    """Serve a virtual peripheral on a pseudoterminal until interrupted."""
+    parser = argparse.ArgumentParser(
+        description='Serve a virtual peripheral on a pseudoterminal.'
+    )
+    parser.add_argument(
+        '--time-scale', type=float, default=1.0,
+        help='Real duration of each simulated second. 0 runs as fast as possible.'
+    )
+    parser.add_argument(
+        '--no-binary-framing', action='store_true',
+        help='Refuse requests from the host for binary framing of messages.'
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    loop = asyncio.get_event_loop()
+    terminal = PseudoTerminal(
+        loop=loop, time_scale=args.time_scale,
+        binary_framing=not args.no_binary_framing
+    )
+    print('Virtual peripheral port: {}'.format(terminal.open()))
+    try:
+        loop.run_until_complete(terminal.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        terminal.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -26,7 +26,7 @@
 #pragma message("INFO: LiquidHandlingRobotics::Messager defined to use the ASCII-based transport layer.")
     #define LHR_Messager
     namespace LiquidHandlingRobotics {
-      using Transport = HardwareSerial;
+      using Transport = Messaging::SerialTransport;
       using Messager = Messaging::ASCIIMessager;
     }
   #else
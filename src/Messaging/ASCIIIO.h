@@ -2,6 +2,7 @@
 #define LHR_Messaging_ASCIIIO_h
 
 #include "Messages.h"
+#include "BinaryFraming.h"
 
 #ifdef ARDUINO_AVR_LEONARDO
   #define SerialGlobal Serial1
@@ -14,13 +15,46 @@ namespace LiquidHandlingRobotics { namespace Messaging {
 namespace ASCIIIO {
   const long kDataRate = 115200;
   const char kHandshakeChar = '~';
+#ifdef DISABLE_LOGGING
+  const bool kBinaryFramingSupported = true;
+#else
+  const bool kBinaryFramingSupported = false; // log output would corrupt binary frames
+#endif
 
-  void waitForHandshake(HardwareSerial& serial = SerialGlobal, unsigned long waitDelay = 500);
+  // Returns whether binary framing was requested by the host and accepted
+  bool waitForHandshake(
+      HardwareSerial& serial = SerialGlobal, unsigned long waitDelay = 500,
+      bool binaryFramingSupported = kBinaryFramingSupported
+  );
 }
 
-using ASCIIMessageSender = MessageSender<HardwareSerial>;
-using ASCIIMessageParser = MessageParser<HardwareSerial>;
-using ASCIIMessager = Messager<HardwareSerial>;
+// Serial transport, with ASCII lines or negotiated binary framing of messages
+
+class SerialTransport : public Print {
+  public:
+    SerialTransport(HardwareSerial &serial);
+
+    HardwareSerial &serial;
+    bool binaryFraming = false;
+
+    void setBinaryFraming(bool enabled);
+
+    // Implement Stream-like interface
+    void begin(long dataRate);
+    int available();
+    int read();
+    int peek();
+    virtual size_t write(uint8_t nextChar);
+    using Print::write;
+
+  private:
+    FrameEncoder encoder;
+    FrameDecoder decoder;
+};
+
+using ASCIIMessageSender = MessageSender<SerialTransport>;
+using ASCIIMessageParser = MessageParser<SerialTransport>;
+using ASCIIMessager = Messager<SerialTransport>;
 
 } }
 
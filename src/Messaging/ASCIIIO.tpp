@@ -9,8 +9,13 @@ namespace LiquidHandlingRobotics { namespace Messaging {
 
 namespace ASCIIIO {
 
-void waitForHandshake(HardwareSerial &serial, unsigned long waitDelay) {
+bool waitForHandshake(
+    HardwareSerial &serial, unsigned long waitDelay, bool binaryFramingSupported
+) {
   elapsedMillis timer;
+  char response[sizeof(BinaryFraming::kRequest)];
+  uint8_t responseLength = 0;
+  bool binaryFraming = false;
 
   // Wait for serial to become ready
   while (!serial) wdt_reset();
@@ -23,54 +28,120 @@ void waitForHandshake(HardwareSerial &serial, unsigned long waitDelay) {
   }
 
   // Wait for (and read) input until a newline is received
-  while (serial.available() > 0) {
-    if (serial.read() == '\n') break;
+  timer = 0;
+  while (timer < waitDelay) {
+    wdt_reset();
+    if (serial.available() < 1) continue;
+    char current = serial.read();
+    if (current == '\n') break;
+    if (current == '\r') continue;
+    if (responseLength < sizeof(response) - 1) response[responseLength] = current;
+    ++responseLength;
+  }
+  response[min(responseLength, sizeof(response) - 1)] = '\0';
+
+  // Accept a request for binary framing, or send a newline response
+  if (
+      binaryFramingSupported && responseLength == strlen(BinaryFraming::kRequest) &&
+      strcmp(response, BinaryFraming::kRequest) == 0
+  ) {
+    serial.println(BinaryFraming::kRequest);
+    binaryFraming = true;
+  } else {
+    serial.println();
   }
-
-  // Send a newline response
-  serial.println();
 
   // Wait a bit longer
   timer = 0;
   while (timer < waitDelay) wdt_reset();
+
+  return binaryFraming;
+}
+
+SerialTransport serialTransport(SerialGlobal);
+
 }
 
+// SerialTransport
+
+SerialTransport::SerialTransport(HardwareSerial &serial) :
+  serial(serial), encoder(serial)
+{}
+
+void SerialTransport::setBinaryFraming(bool enabled) {
+  binaryFraming = enabled;
+  encoder.reset();
+}
+
+void SerialTransport::begin(long dataRate) {
+  serial.begin(dataRate);
+}
+
+int SerialTransport::available() {
+  if (!binaryFraming) return serial.available();
+
+  while (decoder.available() == 0 && serial.available() > 0) {
+    if (decoder.onByte(serial.read())) break;
+  }
+  return decoder.available();
+}
+
+int SerialTransport::read() {
+  if (!binaryFraming) return serial.read();
+
+  if (available() == 0) return -1;
+  return decoder.read();
+}
+
+int SerialTransport::peek() {
+  if (!binaryFraming) return serial.peek();
+
+  if (available() == 0) return -1;
+  return decoder.peek();
+}
+
+size_t SerialTransport::write(uint8_t nextChar) {
+  if (!binaryFraming) return serial.write(nextChar);
+
+  encoder.onChar(nextChar);
+  return 1;
 }
 
 // ASCIIMessageSender
 
 template<>
-MessageSender<HardwareSerial>::MessageSender() :
-  transport(SerialGlobal)
+MessageSender<SerialTransport>::MessageSender() :
+  transport(ASCIIIO::serialTransport)
 {}
 
 template<>
-void MessageSender<HardwareSerial>::setup() {}
+void MessageSender<SerialTransport>::setup() {}
 
 template<>
-void MessageSender<HardwareSerial>::sendMessageStart() {}
+void MessageSender<SerialTransport>::sendMessageStart() {}
 
 template<>
-void MessageSender<HardwareSerial>::sendMessageEnd() {
+void MessageSender<SerialTransport>::sendMessageEnd() {
   transport.write('\n');
 }
 
 // ASCIIMessageParser
 
 template<>
-MessageParser<HardwareSerial>::MessageParser() :
-  MessageParser(SerialGlobal)
+MessageParser<SerialTransport>::MessageParser() :
+  MessageParser(ASCIIIO::serialTransport)
 {}
 
 // ASCIIMessager
 
 template<>
-Messager<HardwareSerial>::Messager() :
-  sender(SerialGlobal), parser(SerialGlobal), transport(SerialGlobal)
+Messager<SerialTransport>::Messager() :
+  sender(ASCIIIO::serialTransport), parser(ASCIIIO::serialTransport),
+  transport(ASCIIIO::serialTransport)
 {}
 
 template<>
-void Messager<HardwareSerial>::setup() {
+void Messager<SerialTransport>::setup() {
   using namespace Messaging::ASCIIIO;
 
   if (setupCompleted) return;
@@ -84,10 +155,11 @@ void Messager<HardwareSerial>::setup() {
 }
 
 template<>
-void Messager<HardwareSerial>::establishConnection() {
+void Messager<SerialTransport>::establishConnection() {
   using namespace Messaging::ASCIIIO;
 
-  waitForHandshake(transport);
+  transport.setBinaryFraming(false);
+  transport.setBinaryFraming(waitForHandshake(transport.serial));
 }
 
 } }
@@ -0,0 +1,85 @@
+#ifndef LHR_Messaging_BinaryFraming_h
+#define LHR_Messaging_BinaryFraming_h
+
+#include <avr/pgmspace.h>
+
+#include "Messages.h"
+
+namespace LiquidHandlingRobotics { namespace Messaging {
+
+// Binary framing of messages, as specified in lhrhost.messaging.transport.framing:
+// length | channel ID | [channel name] | [payload] | CRC
+
+namespace BinaryFraming {
+  const char kRequest[] = "b1";
+  const uint8_t kMaxFrameLength = 2 + 1 + kChannelMaxLength + 5;
+  const uint8_t kLiteralChannelId = 0;
+  const uint8_t kCoreChannelsLength = 6;
+  const uint8_t kAxisChannelsLength = 27;
+  const uint8_t kChannelEntryLength = 6;
+  const char kAxisChannels[] = "pzyx";
+
+  uint8_t crc8(const uint8_t *data, uint8_t length);
+  uint8_t channelId(const char *channel);
+  bool channelName(uint8_t channelId, char *channel);
+  uint8_t encodeVarint(unsigned long value, uint8_t *buffer);
+  bool decodeVarint(
+      const uint8_t *data, uint8_t length, uint8_t &index, unsigned long &value
+  );
+  unsigned long zigzagEncode(long value);
+  long zigzagDecode(unsigned long value);
+}
+
+// Converts the ASCII serialization of a sent message into a binary frame
+
+class FrameEncoder {
+  public:
+    FrameEncoder(Print &output);
+
+    void onChar(char current);
+    void reset();
+
+  private:
+    Print &output;
+
+    char channel[kChannelMaxLength + 1];
+    uint8_t channelLength = 0;
+    bool parsingChannel = false;
+    bool parsingPayload = false;
+    bool hasPayload = false;
+    bool negative = false;
+    long payload = 0;
+
+    void sendFrame();
+};
+
+// Converts received binary frames into the ASCII serialization of their messages
+
+class FrameDecoder {
+  public:
+    bool onByte(uint8_t current); // returns whether a message can be read
+
+    uint8_t available() const;
+    char read();
+    char peek() const;
+
+  private:
+    uint8_t frame[BinaryFraming::kMaxFrameLength + 2];
+    uint8_t frameLength = 0;
+
+    // <channel>(-payload), where the payload has at most 11 chars
+    char message[kChannelMaxLength + 15];
+    uint8_t messageLength = 0;
+    uint8_t messagePosition = 0;
+
+    bool decode();
+    bool decodeMessage(uint8_t length);
+    void discard(uint8_t length);
+};
+
+} }
+
+#include "BinaryFraming.tpp"
+
+#endif
+
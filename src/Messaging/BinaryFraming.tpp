@@ -0,0 +1,269 @@
+#ifndef LHR_Messaging_BinaryFraming_tpp
+#define LHR_Messaging_BinaryFraming_tpp
+
+namespace LiquidHandlingRobotics { namespace Messaging {
+
+namespace BinaryFraming {
+
+// Channel IDs must match CHANNELS in lhrhost.messaging.transport.framing
+const char kCoreChannels[kCoreChannelsLength][kChannelEntryLength] PROGMEM = {
+  "e", "r", "v", "v0", "v1", "v2"
+};
+const char kAxisChannelSuffixes[kAxisChannelsLength][kChannelEntryLength] PROGMEM = {
+  "", "p", "pn", "pni", "pnc", "pnn", "s",
+  "m", "mn", "mni", "mnc", "mnn", "ms", "mt", "mp",
+  "f", "fc", "flpl", "flph", "flmfh", "flmfl", "flmbl", "flmbh",
+  "fpp", "fpd", "fpi", "fps"
+};
+
+uint8_t crc8(const uint8_t *data, uint8_t length) {
+  uint8_t crc = 0;
+  for (uint8_t i = 0; i < length; ++i) {
+    crc ^= data[i];
+    for (uint8_t bit = 0; bit < 8; ++bit) {
+      crc = (crc & 0x80) ? ((crc << 1) ^ 0x07) : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+uint8_t channelId(const char *channel) {
+  for (uint8_t i = 0; i < kCoreChannelsLength; ++i) {
+    if (strcmp_P(channel, kCoreChannels[i]) == 0) return i + 1;
+  }
+  if (channel[0] == '\0') return kLiteralChannelId;
+  const char *axis = strchr(kAxisChannels, channel[0]);
+  if (axis == nullptr) return kLiteralChannelId;
+  for (uint8_t i = 0; i < kAxisChannelsLength; ++i) {
+    if (strcmp_P(channel + 1, kAxisChannelSuffixes[i]) == 0) {
+      return 1 + kCoreChannelsLength + (axis - kAxisChannels) * kAxisChannelsLength + i;
+    }
+  }
+  return kLiteralChannelId;
+}
+
+bool channelName(uint8_t channelId, char *channel) {
+  if (channelId == kLiteralChannelId) return false;
+  uint8_t index = channelId - 1;
+  if (index < kCoreChannelsLength) {
+    strcpy_P(channel, kCoreChannels[index]);
+    return true;
+  }
+  index -= kCoreChannelsLength;
+  if (index >= strlen(kAxisChannels) * kAxisChannelsLength) return false;
+  channel[0] = kAxisChannels[index / kAxisChannelsLength];
+  strcpy_P(channel + 1, kAxisChannelSuffixes[index % kAxisChannelsLength]);
+  return true;
+}
+
+uint8_t encodeVarint(unsigned long value, uint8_t *buffer) {
+  uint8_t length = 0;
+  while (value > 0x7f) {
+    buffer[length] = (value & 0x7f) | 0x80;
+    ++length;
+    value >>= 7;
+  }
+  buffer[length] = value;
+  return length + 1;
+}
+
+bool decodeVarint(
+    const uint8_t *data, uint8_t length, uint8_t &index, unsigned long &value
+) {
+  value = 0;
+  for (uint8_t shift = 0; index < length && shift < 32; shift += 7) {
+    uint8_t current = data[index];
+    ++index;
+    value |= static_cast<unsigned long>(current & 0x7f) << shift;
+    if (!(current & 0x80)) return true;
+  }
+  return false;
+}
+
+unsigned long zigzagEncode(long value) {
+  if (value >= 0) return static_cast<unsigned long>(value) << 1;
+  return (static_cast<unsigned long>(-value) << 1) - 1;
+}
+
+long zigzagDecode(unsigned long value) {
+  if (!(value & 1)) return static_cast<long>(value >> 1);
+  return -static_cast<long>((value + 1) >> 1);
+}
+
+}
+
+// FrameEncoder
+
+FrameEncoder::FrameEncoder(Print &output) :
+  output(output)
+{
+  reset();
+}
+
+void FrameEncoder::onChar(char current) {
+  if (current == kChannelStartDelimiter) {
+    reset();
+    parsingChannel = true;
+  } else if (current == kChannelEndDelimiter) {
+    parsingChannel = false;
+  } else if (current == kPayloadStartDelimiter) {
+    parsingPayload = true;
+  } else if (current == kPayloadEndDelimiter) {
+    parsingPayload = false;
+  } else if (current == '\n') {
+    sendFrame();
+    reset();
+  } else if (parsingChannel) {
+    if (channelLength < kChannelMaxLength) {
+      channel[channelLength] = current;
+      ++channelLength;
+      channel[channelLength] = '\0';
+    }
+  } else if (parsingPayload) {
+    if (current == '-' && !hasPayload) {
+      negative = true;
+    } else if (isDigit(current)) {
+      payload = payload * 10 + (current - '0');
+      hasPayload = true;
+    }
+  }
+}
+
+void FrameEncoder::reset() {
+  channel[0] = '\0';
+  channelLength = 0;
+  parsingChannel = false;
+  parsingPayload = false;
+  hasPayload = false;
+  negative = false;
+  payload = 0;
+}
+
+void FrameEncoder::sendFrame() {
+  using namespace BinaryFraming;
+
+  if (channelLength == 0) return;
+
+  uint8_t body[kMaxFrameLength];
+  uint8_t channelId = BinaryFraming::channelId(channel);
+  uint8_t length = encodeVarint(channelId, body);
+  if (channelId == kLiteralChannelId) {
+    body[length] = channelLength;
+    ++length;
+    memcpy(body + length, channel, channelLength);
+    length += channelLength;
+  }
+  if (hasPayload) {
+    length += encodeVarint(zigzagEncode(negative ? -payload : payload), body + length);
+  }
+  output.write(length);
+  output.write(body, length);
+  output.write(crc8(body, length));
+}
+
+// FrameDecoder
+
+bool FrameDecoder::onByte(uint8_t current) {
+  if (frameLength < sizeof(frame)) {
+    frame[frameLength] = current;
+    ++frameLength;
+  }
+  return decode();
+}
+
+uint8_t FrameDecoder::available() const {
+  return messageLength - messagePosition;
+}
+
+char FrameDecoder::read() {
+  if (available() == 0) return -1;
+
+  char current = peek();
+  ++messagePosition;
+  return current;
+}
+
+char FrameDecoder::peek() const {
+  if (available() == 0) return -1;
+
+  return message[messagePosition];
+}
+
+bool FrameDecoder::decode() {
+  using namespace BinaryFraming;
+
+  while (frameLength > 0 && available() == 0) {
+    uint8_t length = frame[0];
+    if (length == 0 || length > kMaxFrameLength) {
+      Log.warning(F("Discarding a corrupted byte of a binary frame!" CR));
+      discard(1);
+      continue;
+    }
+    if (frameLength < length + 2) return false;
+    if (crc8(frame + 1, length) != frame[length + 1]) {
+      Log.warning(F("Discarding a corrupted byte of a binary frame!" CR));
+      discard(1);
+      continue;
+    }
+    if (!decodeMessage(length)) {
+      Log.warning(F("Discarding a malformed binary frame!" CR));
+    }
+    discard(length + 2);
+  }
+  return available() > 0;
+}
+
+bool FrameDecoder::decodeMessage(uint8_t length) {
+  using namespace BinaryFraming;
+
+  const uint8_t *body = frame + 1;
+  uint8_t index = 0;
+  unsigned long value;
+  char channel[kChannelMaxLength + 1];
+
+  if (!decodeVarint(body, length, index, value) || value > 0xff) return false;
+  if (value == kLiteralChannelId) {
+    if (index >= length) return false;
+    uint8_t channelLength = body[index];
+    ++index;
+    if (channelLength > kChannelMaxLength || index + channelLength > length) return false;
+    memcpy(channel, body + index, channelLength);
+    channel[channelLength] = '\0';
+    index += channelLength;
+  } else if (!channelName(value, channel)) {
+    return false;
+  }
+
+  messageLength = 0;
+  messagePosition = 0;
+  message[messageLength] = kChannelStartDelimiter;
+  ++messageLength;
+  strcpy(message + messageLength, channel);
+  messageLength += strlen(channel);
+  message[messageLength] = kChannelEndDelimiter;
+  ++messageLength;
+  message[messageLength] = kPayloadStartDelimiter;
+  ++messageLength;
+  if (index < length) {
+    if (!decodeVarint(body, length, index, value) || index != length) {
+      messageLength = 0;
+      return false;
+    }
+    ltoa(zigzagDecode(value), message + messageLength, 10);
+    messageLength += strlen(message + messageLength);
+  }
+  message[messageLength] = kPayloadEndDelimiter;
+  ++messageLength;
+  return true;
+}
+
+void FrameDecoder::discard(uint8_t length) {
+  if (length > frameLength) length = frameLength;
+  memmove(frame, frame + length, frameLength - length);
+  frameLength -= length;
+}
+
+} }
+
+#endif
+